@@ -0,0 +1,174 @@
+import json
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIG ---
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_MAP = os.path.join(ROOT, 'config', 'sources_map.json')
+STATES_FILE = os.path.join(ROOT, 'config', 'states.json')
+
+TAX_FILE = 'tax_foundation_2025.xlsx'
+TAX_COLUMNS = ['State', 'Single_Rate', 'Single_Bracket', 'Married_Rate', 'Married_Bracket',
+               'Std_Ded_Single', 'Std_Ded_Married']
+
+# Tax Foundation abbreviations in sheet order (see geo_resolver.STATE_ALIASES)
+TAX_STATES = ['Ala.', 'Alaska', 'Ariz.', 'Ark.', 'Calif.', 'Colo.', 'Conn.', 'Del.', 'Fla.',
+              'Ga.', 'Hawaii', 'Idaho', 'Ill.', 'Ind.', 'Iowa', 'Kans.', 'Ky.', 'La.', 'Maine',
+              'Md.', 'Mass.', 'Mich.', 'Minn.', 'Miss.', 'Mo.', 'Mont.', 'Nebr.', 'Nev.', 'N.H.',
+              'N.J.', 'N.M.', 'N.Y.', 'N.C.', 'N.D.', 'Ohio', 'Okla.', 'Ore.', 'Pa.', 'R.I.',
+              'S.C.', 'S.D.', 'Tenn.', 'Tex.', 'Utah', 'Vt.', 'Va.', 'Wash.', 'W.Va.', 'Wis.',
+              'Wyo.', 'D.C.']
+NO_INCOME_TAX = {'Alaska', 'Fla.', 'Nev.', 'S.D.', 'Tenn.', 'Tex.', 'Wash.', 'Wyo.'}
+
+# Excel's hard row limit per worksheet
+EXCEL_MAX_ROWS = 1_048_575
+
+SCALES = (1, 100, 10_000)
+
+# --- HELPERS ---
+
+def load_config():
+    with open(SOURCE_MAP, 'r') as f:
+        source_map = json.load(f)
+    with open(STATES_FILE, 'r') as f:
+        states = json.load(f)
+    return source_map, states
+
+def plan_files(source_map):
+    """
+    Groups the map's entries by raw file:
+    {file: {"state_col", "value_cols", "filter_col", "year"}}.
+    Files whose entries filter on a column are generated long-format.
+    """
+    files = {}
+    for config in source_map.values():
+        spec = files.setdefault(config['file'], {
+            "state_col": config['state_col'], "value_cols": [], "filter_col": None, "year": None
+        })
+        spec["value_cols"].append(config['value_col'])
+        if config.get('filter'):
+            spec["filter_col"] = config['filter']['col']
+            spec["year"] = int(config['filter']['val'])
+    return files
+
+def money_strings(values):
+    """'$1,234.56' text, as the USDA and Tax Foundation exports write it."""
+    return np.array([f"${v:,.2f}" for v in values.tolist()], dtype=object)
+
+# --- GENERATORS ---
+
+def wide_csv(path, spec, states, scale, rng):
+    """
+    doxo-style wide report: one row per state code (plus 'USA') with a
+    column per bill. At scale N every geography repeats N times; the last
+    copy is the one ingest keeps, so results stay complete.
+    """
+    geos = np.array(list(states) + ['USA'], dtype=object)
+    rows = len(geos) * scale
+    df = pd.DataFrame({spec["state_col"]: np.tile(geos, scale)})
+    df['City'] = 'Synthetic'
+    for col in spec["value_cols"]:
+        vals = rng.integers(40, 2500, rows).astype(float)
+        # A few blanks, but never in the final copy of a row
+        if scale > 1:
+            vals[rng.random(rows) < 0.02] = np.nan
+            vals[-len(geos):] = rng.integers(40, 2500, len(geos))
+        df[col] = vals
+    df.to_csv(path, index=False)
+    return rows
+
+def long_csv(path, spec, states, scale, rng):
+    """
+    USDA-style long report: one row per (state name, year), values as
+    '$1,234.56' text in one column and plain numbers in the others.
+    At scale N the file spans 3 * N years ending at the mapped year.
+    """
+    names = np.array(list(states.values()) + ['United States'], dtype=object)
+    years = np.arange(spec["year"] - 3 * scale + 1, spec["year"] + 1)
+    rows = len(names) * len(years)
+    df = pd.DataFrame({
+        spec["state_col"]: np.tile(names, len(years)),
+        spec["filter_col"]: np.repeat(years, len(names))
+    })
+    for i, col in enumerate(spec["value_cols"]):
+        vals = rng.uniform(2000, 9000, rows).round(2)
+        df[col] = money_strings(vals) if i == 0 else vals
+    df.to_csv(path, index=False)
+    return rows
+
+def tax_block(name, rng):
+    """Rows for one state in the Tax Foundation layout (name on the first row only)."""
+    if name in NO_INCOME_TAX:
+        return [[name, 'none', 'none', 'none', 'none', 'n.a.', 'n.a.']]
+    n = int(rng.integers(1, 10))
+    floors = np.concatenate([[0], np.cumsum(rng.integers(1000, 50000, n - 1))]).tolist()
+    rows = []
+    for i, floor in enumerate(floors):
+        rate = round(0.01 * (i + 1), 4)
+        rows.append([
+            name if i == 0 else None,
+            f"{rate * 100:.2f}%", f"${floor:,}",
+            f"{rate * 100:.2f}%", floor * 2,
+            f"${int(rng.integers(1, 15)) * 1000:,}" if i == 0 else None,
+            int(rng.integers(2, 30)) * 1000 if i == 0 else None
+        ])
+    return rows
+
+def tax_workbook(path, scale, rng):
+    """
+    Tax Foundation-style workbook: a sparse State column over bracket rows.
+    At scale N the state blocks repeat N times (ingest keeps the last
+    block per state), capped at Excel's row limit.
+    """
+    rows = []
+    for _ in range(scale):
+        block = [r for name in TAX_STATES for r in tax_block(name, rng)]
+        if len(rows) + len(block) >= EXCEL_MAX_ROWS:
+            print(f"⚠️ Tax workbook capped at {len(rows):,} rows (Excel limit).")
+            break
+        rows.extend(block)
+    rows.append(['Footnotes', None, None, None, None, None, None])
+    pd.DataFrame(rows, columns=TAX_COLUMNS).to_excel(path, index=False)
+    return len(rows)
+
+# --- PUBLIC API ---
+
+def build_workspace(root, scale, seed=0):
+    """
+    Lays out a self-contained project tree under `root` that the ingest
+    scripts can run in (cwd = root): config/ (the repo's map and states)
+    plus synthetic raw_data/ at the given scale. Every mapped key gets a
+    value for every state and the nation, so ingest never prompts.
+    Returns {file: row count}.
+    """
+    source_map, states = load_config()
+    rng = np.random.default_rng(seed)
+    for sub in ('config', 'raw_data', 'data'):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+    with open(os.path.join(root, 'config', 'sources_map.json'), 'w') as f:
+        json.dump(source_map, f, indent=4)
+    with open(os.path.join(root, 'config', 'states.json'), 'w') as f:
+        json.dump(states, f, indent=4)
+
+    counts = {}
+    for name, spec in plan_files(source_map).items():
+        path = os.path.join(root, 'raw_data', name)
+        if spec["filter_col"]:
+            counts[name] = long_csv(path, spec, states, scale, rng)
+        else:
+            counts[name] = wide_csv(path, spec, states, scale, rng)
+    counts[TAX_FILE] = tax_workbook(os.path.join(root, 'raw_data', TAX_FILE), scale, rng)
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates synthetic raw_data/ files shaped like the real sources.")
+    parser.add_argument('out', help="Workspace directory to create.")
+    parser.add_argument('--scale', type=int, default=1, help=f"Size multiplier (suite uses {SCALES}).")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    counts = build_workspace(args.out, args.scale, args.seed)
+    for name, rows in counts.items():
+        print(f"✅ {name}: {rows:,} rows")
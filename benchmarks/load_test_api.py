@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- CONFIG ---
+STATES = ['CA', 'TX', 'NY', 'FL', 'WA', 'IL', 'PA', 'OH', 'MA', 'US']
+# Share of each request kind in the mix
+MIX = {"tax": 0.6, "budget": 0.35, "batch": 0.05}
+BATCH_SIZE = 50
+# Incomes are drawn from this many distinct values, so repeats hit the LRU cache
+DISTINCT_INCOMES = 500
+
+# --- REQUESTS ---
+
+def make_requests(n, seed):
+    """Pre-encodes a reproducible mix of single /tax GETs, /budget POSTs and batch POSTs."""
+    rng = random.Random(seed)
+    incomes = [rng.randrange(20_000, 400_000, 500) for _ in range(DISTINCT_INCOMES)]
+
+    def user():
+        return {
+            "income": rng.choice(incomes), "income_frequency": "annual",
+            "state": rng.choice(STATES), "filing_status": rng.choice(['single', 'married']),
+            "housing_type": "rent", "housing_cost": rng.randrange(800, 3500, 50),
+            "medical_premium": 150, "medical_oop_max": 5000,
+            "bills": [{"name": "Electricity", "key": "electricity", "amount": rng.randrange(60, 250), "frequency": "monthly"},
+                      {"name": "Car Ins", "amount": 600, "frequency": "biannual"}]
+        }
+
+    def encode(method, target, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        return (f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=n)
+    out = []
+    for kind in kinds:
+        u = user()
+        if kind == 'tax':
+            out.append(encode('GET', f"/tax?income={u['income']}&state={u['state']}&filing_status={u['filing_status']}"))
+        elif kind == 'budget':
+            out.append(encode('POST', '/budget', u))
+        else:
+            out.append(encode('POST', '/budget', [user() for _ in range(BATCH_SIZE)]))
+    return out
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+async def run_connection(host, port, requests, latencies, errors):
+    """Sends `requests` one after another over a single keep-alive connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for raw in requests:
+        t0 = time.perf_counter()
+        writer.write(raw)
+        status = await read_response(reader)
+        latencies.append(time.perf_counter() - t0)
+        if status != 200:
+            errors.append(status)
+    writer.close()
+
+def client_process(host, port, connections, requests_per_conn, seed, queue):
+    """One client process: `connections` concurrent connections from one event loop."""
+    async def run():
+        latencies, errors = [], []
+        batches = [make_requests(requests_per_conn, seed * 1000 + i) for i in range(connections)]
+        t0 = time.perf_counter()
+        await asyncio.gather(*(run_connection(host, port, b, latencies, errors) for b in batches))
+        return latencies, errors, time.perf_counter() - t0
+    queue.put(asyncio.run(run()))
+
+# --- SERVER ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_local_server(port):
+    """Runs scripts/budget_api.py from the repo root in its own process (its own core)."""
+    proc = subprocess.Popen([sys.executable, os.path.join('scripts', 'budget_api.py'), '--port', str(port)],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("budget_api.py did not start within 10s")
+
+# --- PUBLIC API ---
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+def run_load_test(host, port, clients=2, connections=16, requests=20000, seed=1):
+    """
+    Splits `requests` across `clients` processes x `connections` each and
+    returns throughput and latency percentiles (ms).
+    """
+    per_conn = max(1, requests // (clients * connections))
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client_process, args=(host, port, connections, per_conn, seed + i, queue))
+             for i in range(clients)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    latencies = sorted(x for r in results for x in r[0])
+    errors = [e for r in results for e in r[1]]
+    wall = max(r[2] for r in results)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(wall, 3),
+        "requests_per_sec": round(len(latencies) / wall, 1),
+        "latency_ms": {p: round(percentile(latencies, p) * 1000, 3) for p in (50, 90, 99)},
+        "mix": MIX,
+        "batch_size": BATCH_SIZE
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-tests scripts/budget_api.py with a mix of single and batch requests.")
+    parser.add_argument('--url', default=None,
+                        help="host:port of a running server (default: start one on a free local port).")
+    parser.add_argument('--requests', type=int, default=20000, help="Total requests (default: 20,000).")
+    parser.add_argument('--clients', type=int, default=2, help="Client processes (default: 2).")
+    parser.add_argument('--connections', type=int, default=16,
+                        help="Keep-alive connections per client process (default: 16).")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the request mix.")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        host, port = args.url.rsplit(':', 1)
+        port = int(port)
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = start_local_server(port)
+    try:
+        result = run_load_test(host, port, args.clients, args.connections, args.requests, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["errors"] else 0)
@@ -0,0 +1,205 @@
+import builtins
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import build_workspace, TAX_FILE, SCALES  # noqa: E402
+
+# --- CONFIG ---
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+RESULTS_FILE = '.cache/benchmarks/latest.json'
+DEFAULT_SCALES = (1, 100)
+
+# A timing regresses when it is this much slower than baseline...
+TOLERANCE = 0.25
+# ...and slower by at least this many seconds (ignores timer noise)
+MIN_DELTA = 0.05
+
+# name -> (module, run_ingest kwargs, primed), run in this order.
+# Cold runs bypass the parse cache and manifest; the warm run repeats an
+# incremental build after one untimed run has filled both. Taxes go first
+# so ingest_data's save stage includes the state shards.
+SCENARIOS = {
+    "ingest_tax": ("ingest_tax", {"use_cache": False}, False),
+    "ingest_data": ("ingest_data", {"jobs": 1, "incremental": False, "use_cache": False, "gap_mode": "fail"}, False),
+    "ingest_data_warm": ("ingest_data", {"jobs": 1, "incremental": True, "use_cache": True, "gap_mode": "fail"}, True),
+}
+
+# Functions (by name, anywhere under scripts/) timed from one profiled run.
+# These include cProfile overhead, so compare them only with each other.
+FUNCTIONS = {
+    "ingest_data": ["ingest_sources", "read_source", "read_csv_rows", "stream_source", "process_rows",
+                    "process_dataframe", "normalize_state_column", "monthly_value_column", "apply_historical_audits",
+                    "write_output", "write_shards"],
+    "ingest_tax": ["read_sheet", "parse_tax_sheet", "resolve_state_blocks", "build_brackets",
+                   "add_compiled_tables", "write_output", "write_shards"],
+}
+
+# --- HELPERS ---
+
+def refuse_input(prompt=''):
+    raise RuntimeError(f"Benchmark run tried to prompt for input: {prompt!r}")
+
+@contextlib.contextmanager
+def quiet_run():
+    """Silences ingest output and fails fast instead of blocking on input()."""
+    original = builtins.input
+    builtins.input = refuse_input
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original
+
+def function_times(profiler, names):
+    """Cumulative seconds per function name, from functions defined under scripts/."""
+    scripts_dir = os.path.join(ROOT, 'scripts')
+    out = {}
+    for (path, _, func), (_, _, _, cumtime, _) in pstats.Stats(profiler).stats.items():
+        if func in names and os.path.abspath(path).startswith(scripts_dir):
+            out[func] = round(out.get(func, 0) + cumtime, 4)
+    return out
+
+def run_scenario(name, rows, repeat):
+    """
+    Times one scenario end to end (best of `repeat`), keeps the stage
+    breakdown from that run's report, then profiles a single extra run for
+    the per-function breakdown. cwd must be the workspace.
+    """
+    module_name, kwargs, primed = SCENARIOS[name]
+    # Importing is side-effect free; run_ingest reads config/ and raw_data/
+    # relative to the cwd (states.json once per workspace path)
+    module = __import__(module_name)
+    report_path = os.path.join('.cache', 'reports', f"{name}.json")
+
+    with quiet_run():
+        if primed:
+            module.run_ingest(**kwargs)
+        best, stages = None, None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            if module.run_ingest(report_path=report_path, **kwargs) is False:
+                raise RuntimeError(f"{name} stopped early; see {os.path.abspath(report_path)}")
+            seconds = time.perf_counter() - t0
+            if best is None or seconds < best:
+                with open(report_path, 'r') as f:
+                    best, stages = seconds, json.load(f)["stages"]
+
+        profiler = cProfile.Profile()
+        profiler.runcall(module.run_ingest, report_path=report_path, **kwargs)
+
+    return {
+        "seconds": round(best, 4),
+        "rows": rows,
+        "rows_per_sec": round(rows / best, 1) if best > 0 else None,
+        "stages": {k: v["seconds"] for k, v in stages.items()},
+        "functions": function_times(profiler, FUNCTIONS[module_name])
+    }
+
+def run_scale(scale, repeat, keep_dir=None):
+    """Generates a workspace at `scale` and runs every scenario in it."""
+    workdir = keep_dir or tempfile.mkdtemp(prefix=f'budget_bench_{scale}x_')
+    print(f"\n--- {scale:,}x ---")
+    t0 = time.perf_counter()
+    counts = build_workspace(workdir, scale)
+    print(f"   Generated {sum(counts.values()):,} rows in {time.perf_counter() - t0:.1f}s ({workdir})")
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = {}
+        for name in SCENARIOS:
+            rows = counts[TAX_FILE] if name == 'ingest_tax' else sum(
+                n for f, n in counts.items() if f != TAX_FILE)
+            results[name] = run_scenario(name, rows, repeat)
+            print(f"   {name}: {results[name]['seconds']:.3f}s ({results[name]['rows_per_sec'] or 0:,.0f} rows/s)")
+        return results
+    finally:
+        os.chdir(cwd)
+        if keep_dir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Lists timings (end to end and per function) slower than baseline by
+    more than `tolerance` and MIN_DELTA seconds, for scales and scenarios
+    present in both.
+    """
+    regressions = []
+    for scale, scenarios in results.items():
+        for name, now in scenarios.items():
+            base = baseline.get(scale, {}).get(name)
+            if base is None:
+                continue
+            pairs = [("total", now["seconds"], base["seconds"])]
+            pairs += [(f, t, base["functions"][f]) for f, t in now["functions"].items()
+                      if f in base["functions"]]
+            for label, t, b in pairs:
+                if t > b * (1 + tolerance) and t - b >= MIN_DELTA:
+                    regressions.append(f"{scale}x {name} {label}: {b:.3f}s -> {t:.3f}s ({t / b - 1:+.0%})")
+    return regressions
+
+def save_json(data, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+# --- PUBLIC API ---
+
+def run_suite(scales=DEFAULT_SCALES, repeat=3, keep_dir=None):
+    """Runs every scenario at every scale. Returns {"machine", "results": {scale: {...}}}."""
+    results = {}
+    for scale in scales:
+        keep = os.path.join(keep_dir, f"{scale}x") if keep_dir else None
+        results[str(scale)] = run_scale(scale, repeat, keep)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "repeat": repeat,
+        "results": results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the ingest scripts on synthetic data at several scales.")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help=f"Scale multipliers to run (default: {DEFAULT_SCALES}; the full set is {SCALES}).")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per scenario; the best is kept.")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline results to compare against.")
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run.")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Allowed slowdown vs baseline before a timing counts as a regression.")
+    parser.add_argument('--keep', default=None, help="Keep the generated workspaces under this directory.")
+    parser.add_argument('--out', default=RESULTS_FILE, help="Where to write this run's results.")
+    args = parser.parse_args()
+
+    suite = run_suite(args.scales, args.repeat, args.keep)
+    save_json(suite, args.out)
+    print(f"\n✅ Results written to {args.out}")
+
+    if args.save_baseline:
+        save_json(suite, args.baseline)
+        print(f"📌 Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(suite["results"], baseline["results"], args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions vs {args.baseline}.")
+    else:
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline to create one.")
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import build_workspace  # noqa: E402
+
+# --- CONFIG ---
+RESULTS_FILE = '.cache/benchmarks/startup.json'
+INGEST = os.path.join(ROOT, 'scripts', 'ingest_data.py')
+
+# name -> ingest_data.py arguments, run in this order in a fresh interpreter.
+# The full runs skip the parse cache and manifest so every source is read.
+COMMANDS = {
+    "help": ['--help'],
+    "ingest_csv": ['--full', '--no-cache', '--gaps', 'skip', '--reader', 'csv'],
+    "ingest_auto": ['--full', '--no-cache', '--gaps', 'skip', '--reader', 'auto'],
+    "ingest_pandas": ['--full', '--no-cache', '--gaps', 'skip', '--reader', 'pandas'],
+}
+
+# Appended to each run: reports whether pandas was really loaded (a lazy
+# module that was never touched is still a placeholder)
+PROBE = ("import sys, atexit\n"
+         "atexit.register(lambda: sys.stderr.write('PANDAS=%s\\n' % "
+         "(type(sys.modules.get('pandas')).__name__ == 'module')))\n")
+
+# --- HELPERS ---
+
+def run_once(args, cwd):
+    """Wall seconds for one cold `ingest_data.py args` run, and whether it loaded pandas."""
+    code = PROBE + f"sys.path.insert(0, {os.path.dirname(INGEST)!r})\n"
+    code += f"import runpy; sys.argv = {[INGEST] + args!r}; runpy.run_path({INGEST!r}, run_name='__main__')"
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"ingest_data.py {' '.join(args)} failed:\n{proc.stdout}{proc.stderr}")
+    return seconds, 'PANDAS=True' in proc.stderr
+
+def run_suite(repeat=5, scale=1):
+    """
+    Median wall time per command over `repeat` cold runs in a scale-N
+    synthetic workspace, plus the interpreter's own start-up for reference.
+    Returns {"repeat", "scale", "results": {name: {"seconds", "pandas"}}}.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='startup_') as root:
+        build_workspace(root, scale)
+        bare = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], check=True)
+            bare.append(time.perf_counter() - start)
+        results["python"] = {"seconds": round(statistics.median(bare), 4), "pandas": False}
+        for name, args in COMMANDS.items():
+            runs = [run_once(args, root) for _ in range(repeat)]
+            results[name] = {"seconds": round(statistics.median(s for s, _ in runs), 4),
+                             "pandas": any(p for _, p in runs)}
+    return {"repeat": repeat, "scale": scale, "results": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times cold ingest_data.py start-up and small-file runs per reader.")
+    parser.add_argument('--repeat', type=int, default=5, help="Cold runs per command; the median is kept.")
+    parser.add_argument('--scale', type=int, default=1, help="Synthetic workspace size (see generate_data.py).")
+    parser.add_argument('--out', default=RESULTS_FILE, help="Where to write the results.")
+    args = parser.parse_args()
+
+    suite = run_suite(args.repeat, args.scale)
+    for name, res in suite["results"].items():
+        loaded = "pandas loaded" if res["pandas"] else "no pandas"
+        print(f"   {name:<14} {res['seconds'] * 1000:8.1f} ms  ({loaded})")
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(suite, f, indent=2)
+    print(f"\n✅ Results written to {args.out}")
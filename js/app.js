@@ -1,16 +1,40 @@
-import { calculateBudget, normalizeToMonthly } from './calc.js';
+import { calculateBudget, createCalculator, normalizeToMonthly } from './calc.js';
 import { renderBillRow, renderViz, createFreqSelect } from './components.js';
 import { FREQUENCIES, KNOWN_BILLS, APP_META } from './config.js';
+import {
+    expandTaxData, expandGeoData, fetchCore, fetchStateShard, fetchReleaseManifest, fetchRelease,
+    fetchAffordability, rankStates
+} from './data.js';
 
 // --- STATE ---
 const APP_STATE = { 
     taxData: null, 
     geoData: null, 
+    stateIndex: {},   // code -> name, for every state with data
+    sharded: false,   // true when state data is lazy-loaded per shard
     bills: [],
     introMode: false,
     introStateName: ''
 };
 
+// Dashboard recalculation (see requestCalc)
+const CALC = {
+    worker: null,      // js/calc_worker.js, when the browser runs module workers
+    inline: null,      // Same engine on the main thread otherwise
+    inFlight: false,
+    pending: null,     // Latest inputs not yet sent; newer ones replace older
+    seq: 0,
+    rowStatus: new Map() // bill id -> highlight currently on its row
+};
+
+// State ranking from the precomputed affordability matrix (renderRanking)
+const RANKING = {
+    matrix: null,
+    grossAnnual: null, // From the latest rendered result
+    shown: ''          // Inputs the box currently reflects
+};
+const RANKING_TOP = 5;
+
 const STORAGE_KEY = 'budget_os_data_v1';
 const PREF_KEY = 'budget_os_remember_pref';
 
@@ -35,7 +59,8 @@ const UI = {
         status: document.getElementById('out-status-msg'),
         insights: document.getElementById('insight-box'),
         grossTxt: document.getElementById('txt-gross'),
-        vizContainer: document.getElementById('viz-container')
+        vizContainer: document.getElementById('viz-container'),
+        ranking: document.getElementById('ranking-box')
     },
     billList: document.getElementById('bill-list'),
     btnAddBill: document.getElementById('btn-add-bill'),
@@ -54,13 +79,8 @@ async function init() {
     populateDatalist();
 
     try {
-        // 2. Fetch Data
-        const [taxRes, geoRes] = await Promise.all([
-            fetch('./data/tax_tables.json'),
-            fetch('./data/geo_stats.json')
-        ]);
-        APP_STATE.taxData = await taxRes.json();
-        APP_STATE.geoData = await geoRes.json();
+        // 2. Fetch Data (core + state shards, else versioned releases, else full files)
+        await loadData();
 
         populateStateSelect();
 
@@ -71,15 +91,18 @@ async function init() {
         let loaded = false;
         if (shouldRemember) {
             loaded = loadState(); // Try to load user data
+            if (loaded) await ensureStateData(UI.inputs.state.value);
         }
 
         // 4. Fallback to Random Profile if not remembering OR no save found
         if (!loaded) {
-            loadRandomProfile();
+            await loadRandomProfile();
         }
         
         attachEventListeners();
+        startCalc();
         updateDashboard();
+        loadRanking();
         
         setTimeout(triggerGlobalBenchmark, 100);
 
@@ -143,10 +166,70 @@ function exportCSV() {
 }
 
 // --- DATA LOGIC ---
-function loadRandomProfile() {
-    const codes = Object.keys(APP_STATE.geoData.states);
+async function loadData() {
+    const manifest = await fetchReleaseManifest().catch(() => null);
+
+    // Core now, each state's shard when it is picked (hashed copies when published)
+    const core = await fetchCore(manifest && manifest.shards).catch(() => null);
+    if (core) {
+        APP_STATE.sharded = true;
+        APP_STATE.stateIndex = core.stateIndex;
+        APP_STATE.taxData = core.taxData;
+        APP_STATE.geoData = core.geoData;
+        return;
+    }
+
+    // No shards: full releases, which a returning browser updates with deltas only
+    if (manifest) {
+        const [taxData, geoData] = await Promise.all([
+            fetchRelease(manifest, 'tax_tables', expandTaxData),
+            fetchRelease(manifest, 'geo_stats', expandGeoData)
+        ]).catch(() => [null, null]);
+        if (taxData && geoData) {
+            APP_STATE.taxData = taxData;
+            APP_STATE.geoData = geoData;
+            setStateIndex();
+            return;
+        }
+    }
+
+    const [taxRes, geoRes] = await Promise.all([
+        fetch('./data/tax_tables.json'),
+        fetch('./data/geo_stats.json')
+    ]);
+    // Either the pretty build output or the compact (columnar) one
+    APP_STATE.taxData = expandTaxData(await taxRes.json());
+    APP_STATE.geoData = expandGeoData(await geoRes.json());
+    setStateIndex();
+}
+
+function setStateIndex() {
+    APP_STATE.stateIndex = {};
+    Object.entries(APP_STATE.geoData.states).forEach(([code, s]) => { APP_STATE.stateIndex[code] = s.name; });
+}
+
+/**
+ * Makes sure a state's stats and tax block are loaded (sharded builds only).
+ * On failure the state just falls back to national averages.
+ */
+async function ensureStateData(code) {
+    if (!APP_STATE.sharded || !(code in APP_STATE.stateIndex) || APP_STATE.geoData.states[code]) return;
+    try {
+        const shard = await fetchStateShard(code);
+        if (shard.geo) APP_STATE.geoData.states[code] = shard.geo;
+        if (shard.tax) APP_STATE.taxData.states[code] = shard.tax;
+        if (CALC.worker) CALC.worker.postMessage({ type: 'state', code, geo: shard.geo, tax: shard.tax });
+        if (CALC.inline) CALC.inline.reset();
+    } catch (err) {
+        console.error("Shard Error:", err);
+    }
+}
+
+async function loadRandomProfile() {
+    const codes = Object.keys(APP_STATE.stateIndex);
     const rndCode = codes[Math.floor(Math.random() * codes.length)];
-    const stateData = APP_STATE.geoData.states[rndCode];
+    await ensureStateData(rndCode);
+    const stateData = APP_STATE.geoData.states[rndCode] || APP_STATE.geoData.national;
     
     UI.inputs.housingCost.value = stateData.housing_rent ? parseFloat(stateData.housing_rent.toFixed(2)) : 0;
     UI.inputs.medPrem.value = stateData.health_insurance ? parseFloat(stateData.health_insurance.toFixed(2)) : 0;
@@ -173,7 +256,7 @@ function loadRandomProfile() {
 
     UI.inputs.state.value = 'US';
     APP_STATE.introMode = true;
-    APP_STATE.introStateName = stateData.name;
+    APP_STATE.introStateName = APP_STATE.stateIndex[rndCode];
 }
 
 function gatherUserInputs() {
@@ -197,12 +280,12 @@ function gatherUserInputs() {
 }
 
 function populateStateSelect() {
-    const states = APP_STATE.geoData.states;
+    const states = APP_STATE.stateIndex;
     const select = UI.inputs.state;
     Object.keys(states).sort().forEach(code => {
         const option = document.createElement('option');
         option.value = code;
-        option.textContent = `${states[code].name} (${code})`;
+        option.textContent = `${states[code]} (${code})`;
         select.appendChild(option);
     });
 }
@@ -221,16 +304,13 @@ function addBill(data = null, disableIntroFlag = true) {
             document.getElementById(`row-${id}`).remove();
             updateDashboard();
         },
-        (rowEl, geoKey, val) => { 
+        () => { 
             if(disableIntroFlag) disableIntro(); 
-            updateDashboard();
-            if (rowEl) benchmarkRow(rowEl, geoKey, val); 
+            updateDashboard(); // Row highlights come back with the result
         }
     );
     
     UI.billList.prepend(row);
-    
-    if (data && data.key) benchmarkRow(row, data.key, data.amount);
 }
 
 function disableIntro() {
@@ -286,18 +366,6 @@ function loadState() {
 }
 
 // --- BENCHMARKING & UPDATE ---
-function benchmarkRow(rowEl, geoKey, val) {
-    rowEl.classList.remove('row-good', 'row-warn');
-    if (!geoKey) return; 
-    const loc = UI.inputs.state.value;
-    const stats = loc === 'US' ? APP_STATE.geoData.national : (APP_STATE.geoData.states[loc] || APP_STATE.geoData.national);
-    const avg = stats[geoKey];
-    if (avg) {
-        if (val < avg * 0.9) rowEl.classList.add('row-good');
-        else if (val > avg * 1.1) rowEl.classList.add('row-warn');
-    }
-}
-
 function benchmarkInput(inputEl, geoKey, val) {
     const loc = UI.inputs.state.value;
     const stats = loc === 'US' ? APP_STATE.geoData.national : (APP_STATE.geoData.states[loc] || APP_STATE.geoData.national);
@@ -313,19 +381,85 @@ function triggerGlobalBenchmark() {
     const housingKey = UI.inputs.housingType.value === 'own' ? 'housing_mortgage' : 'housing_rent';
     benchmarkInput(UI.inputs.housingCost, housingKey, parseFloat(UI.inputs.housingCost.value));
     benchmarkInput(UI.inputs.medPrem, 'health_insurance', parseFloat(UI.inputs.medPrem.value));
-    APP_STATE.bills.forEach(b => {
-        const row = document.getElementById(`row-${b.id}`);
-        const match = KNOWN_BILLS.find(k => k.label === b.name);
-        const key = b.key || (match ? match.key : null);
-        if (row && key) benchmarkRow(row, key, b.amount);
-    });
+    // Bill rows are highlighted from each result's bill_status (renderDashboard)
+}
+
+// --- CALC WORKER ---
+// Calculations run in js/calc_worker.js with memoized taxes and benchmarks.
+// One request is in flight at a time: inputs arriving meanwhile overwrite
+// CALC.pending, and a reply that is already stale is dropped unrendered.
+function startCalc() {
+    try {
+        CALC.worker = new Worker(new URL('./calc_worker.js', import.meta.url), { type: 'module' });
+        CALC.worker.onmessage = ({ data }) => onCalcResult(data);
+        CALC.worker.onerror = (err) => {
+            console.error("Calc Worker Error:", err);
+            stopCalcWorker();
+        };
+        CALC.worker.postMessage({ type: 'data', taxData: APP_STATE.taxData, geoData: APP_STATE.geoData });
+    } catch (err) {
+        stopCalcWorker();
+    }
+}
+
+// Falls back to calculating on the main thread and redoes the latest request
+function stopCalcWorker() {
+    if (CALC.worker) CALC.worker.terminate();
+    CALC.worker = null;
+    CALC.inFlight = false;
+    CALC.pending = null;
+    CALC.inline = createCalculator(APP_STATE.taxData, APP_STATE.geoData);
+    updateDashboard();
+}
+
+function requestCalc(user) {
+    if (!CALC.worker) {
+        renderDashboard(CALC.inline.calculate(user));
+        return;
+    }
+    CALC.pending = user;
+    if (!CALC.inFlight) sendPendingCalc();
+}
+
+function sendPendingCalc() {
+    const user = CALC.pending;
+    CALC.pending = null;
+    CALC.inFlight = true;
+    CALC.worker.postMessage({ type: 'calc', id: ++CALC.seq, user });
+}
+
+function onCalcResult({ id, res, error }) {
+    if (id !== CALC.seq) return; // From a worker we already replaced
+    CALC.inFlight = false;
+    if (CALC.pending) {
+        sendPendingCalc(); // Newer inputs are waiting; skip rendering this one
+        return;
+    }
+    if (error) {
+        console.error("Calc Error:", error);
+        return;
+    }
+    renderDashboard(res);
 }
 
 function updateDashboard() {
-    if (!APP_STATE.taxData) return;
-    const user = gatherUserInputs();
-    const res = calculateBudget(user, APP_STATE.taxData, APP_STATE.geoData);
+    if (!APP_STATE.taxData || !(CALC.worker || CALC.inline)) return;
+    requestCalc(gatherUserInputs());
+}
+
+function renderBillStatus(billStatus) {
+    CALC.rowStatus.forEach((_, id) => { if (!(id in billStatus)) CALC.rowStatus.delete(id); });
+    Object.entries(billStatus).forEach(([id, status]) => {
+        if (CALC.rowStatus.get(id) === status) return;
+        const row = document.getElementById(`row-${id}`);
+        if (!row) return;
+        row.classList.remove('row-good', 'row-warn');
+        if (status) row.classList.add(`row-${status}`);
+        CALC.rowStatus.set(id, status);
+    });
+}
 
+function renderDashboard(res) {
     const fmt = new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' });
     UI.outputs.discretionary.textContent = fmt.format(res.spending.discretionary);
     UI.outputs.totalFixed.textContent = fmt.format(res.spending.total_fixed); 
@@ -348,11 +482,67 @@ function updateDashboard() {
     });
 
     renderViz(UI.outputs.vizContainer, res, res.income.gross_monthly);
+    renderBillStatus(res.bill_status);
+    RANKING.grossAnnual = res.income.gross_monthly * 12;
+    renderRanking();
     
     // Save (if toggle checked)
     saveState();
 }
 
+// --- STATE RANKING ---
+// Built by scripts/build_affordability.py; nothing is recalculated here.
+// Missing matrix (not built) just leaves the box hidden.
+async function loadRanking() {
+    RANKING.matrix = await fetchAffordability();
+    renderRanking();
+}
+
+function rankingRow(rank, name, discretionary, current, fmt) {
+    const row = document.createElement('div');
+    row.className = current ? 'ranking-row rank-current' : 'ranking-row';
+    const label = document.createElement('span');
+    label.textContent = `${rank}. ${name}`;
+    const value = document.createElement('span');
+    value.textContent = `${fmt.format(discretionary)}/mo`;
+    row.append(label, value);
+    return row;
+}
+
+function renderRanking() {
+    const { matrix, grossAnnual } = RANKING;
+    if (!matrix || grossAnnual === null) return;
+    const filing = UI.inputs.filing.value;
+    const housing = UI.inputs.housingType.value;
+    const current = UI.inputs.state.value;
+    const shown = `${Math.round(grossAnnual)}|${filing}|${housing}|${current}`;
+    if (shown === RANKING.shown) return; // Bill edits don't change the ranking
+    RANKING.shown = shown;
+
+    const fmt = new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD', maximumFractionDigits: 0 });
+    const ranked = rankStates(matrix, grossAnnual, filing, housing);
+    const box = UI.outputs.ranking;
+    box.innerHTML = '';
+
+    const header = document.createElement('div');
+    header.className = 'viz-header';
+    header.innerHTML = '<span>LEFT OVER BY STATE</span><span>typical housing & bills</span>';
+    box.appendChild(header);
+
+    ranked.slice(0, RANKING_TOP).forEach((r, i) => {
+        box.appendChild(rankingRow(i + 1, r.name, r.discretionary, r.code === current, fmt));
+    });
+    const pos = ranked.findIndex(r => r.code === current);
+    if (pos >= RANKING_TOP) {
+        const gap = document.createElement('div');
+        gap.className = 'ranking-gap';
+        gap.textContent = '⋯';
+        box.appendChild(gap);
+        box.appendChild(rankingRow(pos + 1, ranked[pos].name, ranked[pos].discretionary, true, fmt));
+    }
+    box.hidden = false;
+}
+
 function attachEventListeners() {
     const handleInput = () => { disableIntro(); updateDashboard(); };
 
@@ -372,7 +562,12 @@ function attachEventListeners() {
     });
 
     UI.inputs.housingType.addEventListener('change', () => { disableIntro(); updateDashboard(); triggerGlobalBenchmark(); });
-    UI.inputs.state.addEventListener('change', () => { disableIntro(); updateDashboard(); triggerGlobalBenchmark(); });
+    UI.inputs.state.addEventListener('change', async () => {
+        await ensureStateData(UI.inputs.state.value); // Lazy-load (cached) shard
+        disableIntro();
+        updateDashboard();
+        triggerGlobalBenchmark();
+    });
     
     UI.inputs.incomeFreq.addEventListener('change', handleInput);
     UI.inputs.housingFreq.addEventListener('change', handleInput);
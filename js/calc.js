@@ -1,4 +1,4 @@
-import { FREQUENCIES } from './config.js';
+import { FREQUENCIES, KNOWN_BILLS } from './config.js';
 
 export function normalizeToMonthly(amount, freqKey) {
     if (!amount || isNaN(amount)) return 0;
@@ -19,14 +19,39 @@ function calculateProgressiveTax(taxableIncome, brackets) {
     return tax;
 }
 
+/**
+ * Same result as calculateProgressiveTax, from the precompiled table that
+ * ingest_tax.py emits: caps/rates arrays plus cum, the tax owed at each cap.
+ * One binary search for the bracket, one multiply for the partial part.
+ */
+function lookupProgressiveTax(taxableIncome, table) {
+    const { caps, rates, cum } = table;
+    if (!caps.length || !(taxableIncome > 0)) return 0;
+
+    // First bracket whose cap is >= income
+    let lo = 0, hi = caps.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (caps[mid] < taxableIncome) lo = mid + 1; else hi = mid;
+    }
+    if (lo === caps.length) return cum[lo - 1];
+    if (lo === 0) return taxableIncome * rates[0];
+    return cum[lo - 1] + (taxableIncome - caps[lo - 1]) * rates[lo];
+}
+
+function progressiveTax(taxableIncome, jurisdiction, status) {
+    const table = jurisdiction.compiled && jurisdiction.compiled[status];
+    if (table) return lookupProgressiveTax(taxableIncome, table);
+    return calculateProgressiveTax(taxableIncome, jurisdiction.brackets[status] || []);
+}
+
 export function calculateFederal(grossAnnual, filingStatus, taxData) {
     const fedData = taxData.federal;
     const status = (filingStatus === 'married') ? 'married' : 'single';
     const deduction = fedData.standard_deduction[status];
     const fica = grossAnnual * fedData.fica_rate;
     const taxableIncome = Math.max(0, grossAnnual - deduction);
-    const brackets = fedData.brackets[status];
-    const fedTax = calculateProgressiveTax(taxableIncome, brackets);
+    const fedTax = progressiveTax(taxableIncome, fedData, status);
     return { fica_annual: fica, fed_annual: fedTax, total_annual: fica + fedTax };
 }
 
@@ -41,13 +66,10 @@ export function calculateState(grossAnnual, stateCode, taxData, filingStatus = '
     const status = filingStatus === 'married' ? 'married' : 'single';
     
     const deduction = state.deductions[status] || 0;
-    const brackets = state.brackets[status] || [];
-
     const taxable = Math.max(0, grossAnnual - deduction);
-    
-    // Use the internal helper function
-    // Note: ensure calculateProgressiveTax is available in scope (it is in the file)
-    return calculateProgressiveTax(taxable, brackets);
+
+    // Precompiled lookup when present, bracket walk otherwise
+    return progressiveTax(taxable, state, status);
 }
 
 export function calculateSafeMedical(monthlyPremium, oopMax) {
@@ -55,14 +77,45 @@ export function calculateSafeMedical(monthlyPremium, oopMax) {
     return monthlyPremium + monthlyRisk;
 }
 
-export function calculateBudget(userInput, taxData, geoData) {
-    const grossMonthly = normalizeToMonthly(userInput.income, userInput.income_frequency);
-    const grossAnnual = grossMonthly * 12;
+// (userVal - avg) / avg, or null when there is no average to compare with
+function benchmarkDiff(avg, userVal) {
+    return avg > 0 ? (userVal - avg) / avg : null;
+}
 
-    const fedResult = calculateFederal(grossAnnual, userInput.filing_status, taxData);
-    const stateTaxAnnual = calculateState(grossAnnual, userInput.state, taxData, userInput.filing_status);
-    const totalTaxMonthly = (fedResult.total_annual + stateTaxAnnual) / 12;
+/**
+ * The dashboard's bill row highlight: 'good' more than 10% under the
+ * average, 'warn' more than 10% over. Like the original row check, this
+ * compares the amount as entered (not its monthly equivalent).
+ */
+export function billHighlight(avg, amount) {
+    if (!avg) return null;
+    if (amount < avg * 0.9) return 'good';
+    if (amount > avg * 1.1) return 'warn';
+    return null;
+}
 
+function monthlyTax(grossAnnual, state, filingStatus, taxData) {
+    const fedResult = calculateFederal(grossAnnual, filingStatus, taxData);
+    const stateTaxAnnual = calculateState(grossAnnual, state, taxData, filingStatus);
+    return (fedResult.total_annual + stateTaxAnnual) / 12;
+}
+
+export function calculateBudget(userInput, taxData, geoData) {
+    const grossAnnual = normalizeToMonthly(userInput.income, userInput.income_frequency) * 12;
+    const stateStats = geoData.states[userInput.state] || geoData.national;
+    return assembleBudget(
+        userInput,
+        monthlyTax(grossAnnual, userInput.state, userInput.filing_status, taxData),
+        (geoKey, userVal) => benchmarkDiff(stateStats[geoKey], userVal)
+    );
+}
+
+/**
+ * Everything after the tax step. `diffFor(geoKey, monthly)` compares a
+ * monthly amount with the state average (see benchmarkDiff).
+ */
+function assembleBudget(userInput, totalTaxMonthly, diffFor) {
+    const grossMonthly = normalizeToMonthly(userInput.income, userInput.income_frequency);
     const netMonthly = grossMonthly - totalTaxMonthly;
 
     let totalBills = 0;
@@ -101,14 +154,13 @@ export function calculateBudget(userInput, taxData, geoData) {
     }
 
     // 3. INSIGHTS GENERATION
-    const stateStats = geoData.states[userInput.state] || geoData.national;
     const insights = [];
 
     // Helper for generating insight objects
     const checkStat = (label, userVal, geoKey) => {
-        const avg = stateStats[geoKey] || 0;
-        if (userVal > 0 && avg > 0) {
-            const diff = (userVal - avg) / avg;
+        if (userVal > 0) {
+            const diff = diffFor(geoKey, userVal);
+            if (diff === null) return;
             const pct = Math.round(Math.abs(diff) * 100);
             if (diff > 0.15) {
                 insights.push({ type: 'warn', msg: `${label} is ${pct}% above avg.` });
@@ -146,4 +198,65 @@ export function calculateBudget(userInput, taxData, geoData) {
         },
         insights: insights
     };
-}
\ No newline at end of file
+}
+// --- MEMOIZED CALCULATOR ---
+
+/**
+ * calculateBudget for the dashboard, which recalculates on every keystroke.
+ * Taxes are memoized by (gross, state, filing) and each benchmark by
+ * (key, state, monthly amount), so editing one bill only redoes that bill
+ * and the totals. Results equal calculateBudget's, plus `bill_status`:
+ * { bill id: 'good' | 'warn' | null }, the row highlight (billHighlight).
+ * Call reset() after taxData or geoData change in place.
+ */
+export function createCalculator(taxData, geoData, maxEntries = 10000) {
+    const taxMemo = new Map();
+    // scope ('US' or state) -> geoKey -> monthly -> diff; nested so lookups build no strings
+    let benchMemo = new Map();
+    const labelKeys = new Map(KNOWN_BILLS.map(k => [k.label, k.key]));
+
+    const benchFor = (scope, stats) => {
+        if (!benchMemo.has(scope)) benchMemo.set(scope, new Map());
+        const byKey = benchMemo.get(scope);
+        return (geoKey, monthly) => {
+            let byAmount = byKey.get(geoKey);
+            if (!byAmount) byKey.set(geoKey, byAmount = new Map());
+            let diff = byAmount.get(monthly);
+            if (diff === undefined) {
+                if (byAmount.size >= maxEntries) byAmount.clear();
+                diff = benchmarkDiff(stats[geoKey], monthly);
+                byAmount.set(monthly, diff);
+            }
+            return diff;
+        };
+    };
+
+    return {
+        calculate(userInput) {
+            const grossAnnual = normalizeToMonthly(userInput.income, userInput.income_frequency) * 12;
+            const { state, filing_status: filing } = userInput;
+            const taxKey = `${grossAnnual}|${state}|${filing}`;
+            let totalTaxMonthly = taxMemo.get(taxKey);
+            if (totalTaxMonthly === undefined) {
+                if (taxMemo.size >= maxEntries) taxMemo.clear();
+                totalTaxMonthly = monthlyTax(grossAnnual, state, filing, taxData);
+                taxMemo.set(taxKey, totalTaxMonthly);
+            }
+
+            const known = geoData.states[state];
+            const stats = known || geoData.national;
+            const res = assembleBudget(userInput, totalTaxMonthly, benchFor(known ? state : 'US', stats));
+
+            res.bill_status = {};
+            userInput.bills.forEach(bill => {
+                const key = bill.key || labelKeys.get(bill.name);
+                res.bill_status[bill.id] = key ? billHighlight(stats[key], bill.amount) : null;
+            });
+            return res;
+        },
+        reset() {
+            taxMemo.clear();
+            benchMemo = new Map();
+        }
+    };
+}
@@ -0,0 +1,35 @@
+/**
+ * Runs the calc engine off the main thread for the dashboard (js/app.js).
+ * In:  { type: 'data', taxData, geoData }      full tables, once
+ *      { type: 'state', code, geo, tax }       a lazy-loaded state shard
+ *      { type: 'calc', id, user }              calculateBudget inputs
+ * Out: { id, res } or { id, error }
+ * 'state' and 'calc' messages that arrive before 'data' are queued.
+ */
+import { createCalculator } from './calc.js';
+
+let tables = null;
+let calculator = null;
+const early = [];
+
+function handle(msg) {
+    if (msg.type === 'data') {
+        tables = { taxData: msg.taxData, geoData: msg.geoData };
+        calculator = createCalculator(tables.taxData, tables.geoData);
+        early.splice(0).forEach(handle);
+    } else if (!calculator) {
+        early.push(msg);
+    } else if (msg.type === 'state') {
+        if (msg.geo) tables.geoData.states[msg.code] = msg.geo;
+        if (msg.tax) tables.taxData.states[msg.code] = msg.tax;
+        calculator.reset();
+    } else if (msg.type === 'calc') {
+        try {
+            self.postMessage({ id: msg.id, res: calculator.calculate(msg.user) });
+        } catch (err) {
+            self.postMessage({ id: msg.id, error: String(err) });
+        }
+    }
+}
+
+self.onmessage = ({ data: msg }) => handle(msg);
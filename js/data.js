@@ -0,0 +1,288 @@
+/**
+ * Loaders for the data/ build outputs.
+ * `--compact` builds write columnar JSON (see scripts/output_formats.py);
+ * these expand it back into the nested shape the rest of the app uses.
+ * Pretty (nested) files pass through unchanged.
+ */
+const COMPACT_FORMAT = 'columnar';
+
+function expandJurisdiction(packed) {
+    const jur = { ...packed, brackets: {}, compiled: {} };
+    for (const [status, table] of Object.entries(packed.brackets || {})) {
+        jur.brackets[status] = table.caps.map((cap, i) => ({ cap, rate: table.rates[i] }));
+        if (table.cum) jur.compiled[status] = table;
+    }
+    return jur;
+}
+
+export function expandTaxData(data) {
+    if (data.format !== COMPACT_FORMAT) return data;
+    const states = {};
+    for (const [code, packed] of Object.entries(data.states || {})) {
+        states[code] = expandJurisdiction(packed);
+    }
+    return { federal: expandJurisdiction(data.federal), states };
+}
+
+export function expandGeoData(data) {
+    if (data.format !== COMPACT_FORMAT) return data;
+    const toStats = (row, stats = {}) => {
+        data.keys.forEach((key, i) => { if (row[i] !== null) stats[key] = row[i]; });
+        return stats;
+    };
+    const states = {};
+    data.codes.forEach((code, i) => {
+        const name = data.names[i];
+        states[code] = toStats(data.values[i], name !== null ? { name } : {});
+    });
+    return { metadata: data.metadata, national: toStats(data.national), states };
+}
+
+// --- INTEGRITY ---
+
+/** Hex SHA-256 of `bytes`, or null where WebCrypto is unavailable (plain-http origins). */
+export async function sha256Hex(bytes) {
+    if (!globalThis.crypto || !crypto.subtle) return null;
+    const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', bytes));
+    return Array.from(digest, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+/**
+ * Fetches a content-hashed file and parses it, rejecting when its bytes
+ * don't hash to `sha256`. Hashed URLs never change, so the HTTP cache may
+ * serve them without revalidating.
+ */
+async function fetchVerified(url, sha256) {
+    const res = await fetch(url, { cache: 'force-cache' });
+    if (!res.ok) throw new Error(`${url}: HTTP ${res.status}`);
+    const bytes = await res.arrayBuffer();
+    const actual = await sha256Hex(bytes);
+    if (actual !== null && actual !== sha256) throw new Error(`${url}: hash mismatch`);
+    return JSON.parse(new TextDecoder().decode(bytes));
+}
+
+/**
+ * Sorted keys, no whitespace: the form data_sha256 in the release manifest
+ * is computed on (mirrors canonical_json in scripts/releases.py).
+ */
+function canonicalJSON(value) {
+    if (Array.isArray(value)) return `[${value.map(canonicalJSON).join(',')}]`;
+    if (value && typeof value === 'object') {
+        const items = Object.keys(value).sort().map(k => `${JSON.stringify(k)}:${canonicalJSON(value[k])}`);
+        return `{${items.join(',')}}`;
+    }
+    return JSON.stringify(value);
+}
+
+/** data_sha256 of a nested document, or null where WebCrypto is unavailable. */
+export function dataHash(data) {
+    return sha256Hex(new TextEncoder().encode(canonicalJSON(data)));
+}
+
+// --- STATE SHARDS ---
+// The ingest scripts also write data/shards/core.json (national stats,
+// federal tax, state index) and one <CODE>.json per state, and publish
+// hashed copies of them (the manifest's "shards" entry, see
+// scripts/releases.py). Only the shards that changed get new URLs.
+const SHARD_DIR = './data/shards';
+const shardCache = new Map();
+let shardRelease = null;
+
+/**
+ * A shard by name ('core' or a state code): the published hashed copy
+ * when the manifest lists one, else (not published here, or corrupt) the
+ * plain file in data/shards/.
+ */
+async function fetchShardFile(name) {
+    const ref = shardRelease && (name === 'core' ? shardRelease.core : shardRelease.states[name]);
+    if (ref) {
+        try {
+            return await fetchVerified(`${RELEASE_DIR}/${ref.file}`, ref.sha256);
+        } catch (err) {
+            // Fall through to the unhashed shard
+        }
+    }
+    const res = await fetch(`${SHARD_DIR}/${name}.json`);
+    if (!res.ok) throw new Error(`Shard ${name}: HTTP ${res.status}`);
+    return res.json();
+}
+
+/**
+ * Fetches the core file; `release` is the manifest's "shards" entry, if
+ * any, and is also used for the state shards. Resolves to null when the
+ * build has no shards, so callers can fall back to the full files.
+ */
+export async function fetchCore(release = null) {
+    shardRelease = release;
+    const core = await fetchShardFile('core').catch(() => null);
+    if (!core) return null;
+    const compact = core.format === COMPACT_FORMAT;
+    return {
+        stateIndex: core.states,
+        taxData: { federal: compact ? expandJurisdiction(core.federal) : core.federal, states: {} },
+        geoData: { metadata: core.metadata, national: core.national, states: {} }
+    };
+}
+
+/**
+ * Fetches a state's shard once per session; concurrent and later calls
+ * share the same promise. Resolves to { geo, tax } (either may be null).
+ */
+export function fetchStateShard(code) {
+    if (!shardCache.has(code)) {
+        const pending = fetchShardFile(code)
+            .then(shard => {
+                if (shard.format === COMPACT_FORMAT && shard.tax) shard.tax = expandJurisdiction(shard.tax);
+                return shard;
+            })
+            .catch(err => {
+                shardCache.delete(code); // Let a later change retry
+                throw err;
+            });
+        shardCache.set(code, pending);
+    }
+    return shardCache.get(code);
+}
+
+// --- AFFORDABILITY MATRIX ---
+// scripts/build_affordability.py precomputes every state's budget over an
+// income x filing x housing grid (data/affordability.json).
+let affordabilityPending = null;
+
+/** Fetches the matrix once per session. Resolves to null when it was not built. */
+export function fetchAffordability() {
+    if (!affordabilityPending) {
+        affordabilityPending = fetch('./data/affordability.json')
+            .then(res => (res.ok ? res.json() : null))
+            .catch(() => null);
+    }
+    return affordabilityPending;
+}
+
+/** Linear interpolation along the income grid, clamped at both ends. */
+function interpolate(incomes, row, income) {
+    if (income <= incomes[0]) return row[0];
+    const last = incomes.length - 1;
+    if (income >= incomes[last]) return row[last];
+    let lo = 0, hi = last;
+    while (hi - lo > 1) {
+        const mid = (lo + hi) >> 1;
+        if (incomes[mid] <= income) lo = mid; else hi = mid;
+    }
+    const t = (income - incomes[lo]) / (incomes[hi] - incomes[lo]);
+    return row[lo] + t * (row[hi] - row[lo]);
+}
+
+/**
+ * Every state's monthly discretionary income at `grossAnnual`, best first:
+ * [{ code, name, discretionary }]. Nothing is recalculated.
+ */
+export function rankStates(matrix, grossAnnual, filingStatus = 'single', housingType = 'rent') {
+    const h = Math.max(0, matrix.housing_types.indexOf(housingType));
+    const f = filingStatus === 'married' ? matrix.filing_statuses.indexOf('married') : 0;
+    const rows = matrix.discretionary[h][f];
+    return matrix.codes
+        .map((code, i) => ({ code, name: matrix.names[i], discretionary: interpolate(matrix.incomes, rows[i], grossAnnual) }))
+        .filter(r => r.code !== 'US')
+        .sort((a, b) => b.discretionary - a.discretionary);
+}
+
+// --- VERSIONED RELEASES ---
+// The ingest scripts publish each output under a content-hashed name in
+// data/releases/, with a manifest and deltas between consecutive releases
+// (see scripts/releases.py). Release files never change, so the browser can
+// cache them forever; only the small manifest is revalidated. The app reads
+// the shards first and uses these full releases only for builds without.
+const RELEASE_DIR = './data/releases';
+const RELEASE_CACHE_PREFIX = 'budget_os_release_v2:';
+
+/** Fetches the release manifest. Resolves to null when the build has none. */
+export async function fetchReleaseManifest() {
+    const res = await fetch(`${RELEASE_DIR}/manifest.json`, { cache: 'no-cache' });
+    if (!res.ok) return null;
+    return res.json();
+}
+
+/** Applies delta ops ({op, scope, key?, value?}) in place; mirrors apply_delta in releases.py. */
+export function applyDelta(data, ops) {
+    for (const op of ops) {
+        const path = op.scope.split('/');
+        const scope = path.pop();
+        let parent = data;
+        for (const part of path) parent = parent[part] || (parent[part] = {});
+        if (!('key' in op)) {
+            if (op.op === 'remove') delete parent[scope];
+            else parent[scope] = op.value;
+        } else if (op.op === 'remove') {
+            if (parent[scope]) delete parent[scope][op.key];
+        } else {
+            (parent[scope] || (parent[scope] = {}))[op.key] = op.value;
+        }
+    }
+    return data;
+}
+
+/** Delta files from release `start` to the current one, or null if the chain is broken. */
+function deltaChain(entry, start) {
+    const files = [];
+    const seen = new Set();
+    while (start !== entry.current) {
+        const step = entry.deltas[start];
+        if (!step || seen.has(start)) return null;
+        seen.add(start);
+        files.push(step.file);
+        start = step.to;
+    }
+    return files;
+}
+
+async function fetchReleaseFile(file) {
+    const res = await fetch(`${RELEASE_DIR}/${file}`, { cache: 'force-cache' });
+    if (!res.ok) throw new Error(`Release ${file}: HTTP ${res.status}`);
+    return res.json();
+}
+
+/** Brings a cached release up to date with deltas; null unless the result hashes to `entry`. */
+async function patchRelease(entry, held) {
+    const chain = deltaChain(entry, held.hash);
+    if (!chain || !entry.data_sha256) return null;
+    try {
+        const data = held.data;
+        for (const file of chain) applyDelta(data, (await fetchReleaseFile(file)).ops);
+        return (await dataHash(data)) === entry.data_sha256 ? data : null;
+    } catch (err) {
+        return null;
+    }
+}
+
+function readCachedRelease(name) {
+    try {
+        return JSON.parse(localStorage.getItem(RELEASE_CACHE_PREFIX + name));
+    } catch (err) {
+        return null;
+    }
+}
+
+/**
+ * The current release of `name` in nested form. A locally cached older
+ * release is brought up to date with the deltas only, and kept only if
+ * the patched document matches the manifest's data_sha256; otherwise the
+ * full release file is fetched (once per version, thanks to its hashed
+ * URL) and checked against its sha256.
+ */
+export async function fetchRelease(manifest, name, expand) {
+    const entry = manifest.outputs[name];
+    if (!entry) return null;
+
+    const held = readCachedRelease(name);
+    let data = held && held.hash === entry.current ? held.data : null;
+    if (!data && held) data = await patchRelease(entry, held);
+    if (!data) data = expand(await fetchVerified(`${RELEASE_DIR}/${entry.file}`, entry.sha256));
+
+    try {
+        localStorage.setItem(RELEASE_CACHE_PREFIX + name, JSON.stringify({ hash: entry.current, data }));
+    } catch (err) {
+        // Quota exceeded: the HTTP cache still holds the release file
+    }
+    return data;
+}
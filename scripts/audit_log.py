@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+
+# --- CONFIG ---
+LOG_FILE = 'data/manual_audit_log.jsonl'
+INDEX_FILE = 'data/manual_audit_log.index.json'
+LEGACY_FILE = 'data/manual_audit_log.json'
+
+# --- HELPERS ---
+
+def write_atomic(path, text):
+    """Writes text to path via a temp file + rename, so readers never see half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def read_entries(log_path, offset=0):
+    """
+    Yields (end_offset, entry) for each line of the JSONL log from `offset`.
+    A torn trailing line (crash mid-append) is skipped, not fatal.
+    """
+    if not os.path.exists(log_path):
+        return
+    with open(log_path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            if not line.endswith(b'\n'):
+                print(f"⚠️ Ignoring incomplete last line in {log_path}.")
+                break
+            try:
+                yield offset, json.loads(line)
+            except ValueError:
+                print(f"⚠️ Skipping unreadable line in {log_path} at byte {offset - len(line)}.")
+
+def index_entry(index, entry):
+    """Records entry as the latest for its (scope, key)."""
+    index["entries"].setdefault(entry.get('scope'), {})[entry.get('key')] = entry
+
+def prefix_hash(log_path, length):
+    """SHA-256 of the log's first `length` bytes."""
+    digest = hashlib.sha256()
+    with open(log_path, 'rb') as f:
+        while length > 0:
+            block = f.read(min(length, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest.hexdigest()
+
+def fold_and_save(index, log_path, index_path):
+    """
+    Folds log entries past index["covered"] into the index, stamps it with
+    the covered prefix's hash and the log's size/mtime, and persists it.
+    """
+    for end, entry in read_entries(log_path, index["covered"]):
+        index_entry(index, entry)
+        index["covered"] = end
+    st = os.stat(log_path)
+    index.update({"sha256": prefix_hash(log_path, index["covered"]),
+                  "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+    write_atomic(index_path, json.dumps(index))
+
+# --- PUBLIC API ---
+
+def migrate_legacy_log(legacy_path=LEGACY_FILE, log_path=LOG_FILE):
+    """
+    One-time migration from the old single-list JSON log to JSONL.
+    Runs only when the JSONL log does not exist yet; the legacy file is
+    kept as <name>.bak. Returns the number of migrated entries.
+    """
+    if os.path.exists(log_path) or not os.path.exists(legacy_path):
+        return 0
+    with open(legacy_path, 'r') as f:
+        entries = json.load(f)
+    write_atomic(log_path, ''.join(json.dumps(e) + '\n' for e in entries))
+    os.replace(legacy_path, legacy_path + '.bak')
+    print(f"📦 Migrated {len(entries)} audit entries from {legacy_path} to {log_path}.")
+    return len(entries)
+
+def load_audit_index(log_path=LOG_FILE, index_path=INDEX_FILE):
+    """
+    Returns the (scope, key) -> latest entry index for the log.
+    The sidecar is reused as is while the log's size and mtime match the
+    ones it was stamped with. Otherwise the indexed prefix is re-hashed:
+    if it is unchanged, entries appended since are folded in; if it was
+    edited, truncated or the sidecar is unreadable, the index is rebuilt.
+    Shape: {"covered": bytes_indexed, "sha256": prefix_hash, "size",
+            "mtime_ns", "entries": {scope: {key: entry}}}
+    """
+    index = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+        except ValueError:
+            index = None
+
+    if not os.path.exists(log_path):
+        return {"covered": 0, "entries": {}}
+    st = os.stat(log_path)
+    if index and index.get("size") == st.st_size and index.get("mtime_ns") == st.st_mtime_ns:
+        return index
+
+    covered = index.get("covered", 0) if index else 0
+    if not index or covered > st.st_size or index.get("sha256") != prefix_hash(log_path, covered):
+        index = {"covered": 0, "entries": {}}
+    fold_and_save(index, log_path, index_path)
+    return index
+
+def iter_latest(index):
+    """(scope, key, entry) for the most recent entry of every indexed pair."""
+    for scope, by_key in index["entries"].items():
+        for key, entry in by_key.items():
+            yield scope, key, entry
+
+def count_entries(index):
+    """Number of distinct (scope, key) pairs in the index."""
+    return sum(len(by_key) for by_key in index["entries"].values())
+
+def append_entries(entries, index, log_path=LOG_FILE, index_path=INDEX_FILE):
+    """
+    Appends entries to the log with a single O_APPEND write + fsync, then
+    folds everything past the index's covered offset (ours, plus anything
+    another process appended) into the index and persists the sidecar.
+    """
+    if not entries:
+        return
+    payload = ''.join(json.dumps(e) + '\n' for e in entries).encode()
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    fold_and_save(index, log_path, index_path)
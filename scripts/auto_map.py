@@ -0,0 +1,229 @@
+import json
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from geo_resolver import load_resolver
+from output_formats import load_output, unpack_geo
+
+# --- CONFIG ---
+RAW_DIR = 'raw_data'
+GEO_FILE = 'data/geo_stats.json'
+PROPOSALS_FILE = '.cache/wizard/proposed_sources_map.json'
+
+FILE_TYPES = {'.csv': 'csv', '.xlsx': 'excel', '.xls': 'excel'}
+
+# Rows read per file; headers plus this sample is all the scan looks at
+SAMPLE_ROWS = 200
+
+# A state column needs this share of its sampled cells to resolve
+MIN_STATE_SHARE = 0.6
+# A value column needs this share of its sampled cells to parse as numbers
+MIN_NUMERIC_SHARE = 0.8
+# Weakest header/description match still proposed (cosine over tokens)
+MIN_MATCH = 0.4
+
+YEAR_RANGE = (1900, 2100)
+
+# Words that say nothing about what a column measures
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'or', 'in', 'by', 'for', 'to', 'with', 'per', 'u', 's', 'us',
+    'average', 'avg', 'mean', 'median', 'monthly', 'annual', 'yearly', 'weekly', 'cost', 'costs',
+    'bill', 'bills', 'expenditure', 'expenditures', 'expense', 'expenses', 'spending', 'price',
+    'single', 'person', 'household', 'households', 'residential', 'capita',
+    'nominal', 'dollars', 'dollar', 'usd', 'amount', 'value', 'based'
+}
+
+# Spellings folded onto the WISHLIST's own words ('Auto Loan' -> car payment)
+SYNONYMS = {
+    'auto': 'car', 'vehicle': 'car', 'loan': 'payment', 'mobile': 'cell', 'wireless': 'cell',
+    'electric': 'electricity', 'power': 'electricity', 'trash': 'garbage', 'waste': 'garbage',
+    'sewer': 'water', 'cable': 'internet', 'broadband': 'internet', 'alarm': 'security',
+    'groceries': 'grocery', 'daycare': 'childcare', 'renters': 'rent'
+}
+
+# Header words that give away the data's frequency
+FREQUENCY_HINTS = {'a': ('annual', 'annually', 'yearly', 'per year', '/yr'),
+                   'w': ('weekly', 'per week', '/wk'),
+                   'm': ('monthly', 'per month', '/mo')}
+# Normalized-to-monthly multipliers (as in ingest_data.calculate_monthly_value)
+FREQUENCY_MULT = {'m': 1.0, 'a': 1 / 12.0, 'w': 52.0 / 12.0}
+
+WORD = re.compile(r'[a-z0-9]+')
+FILE_YEAR = re.compile(r'(?<!\d)(19|20)\d{2}(?!\d)')
+
+# --- TEXT MATCHING ---
+
+def tokens(text):
+    """Content words of a header or description, synonyms folded, numbers dropped."""
+    words = WORD.findall(str(text).lower().replace('_', ' '))
+    return {SYNONYMS.get(w, w) for w in words if w not in STOPWORDS and not w.isdigit()}
+
+def match_score(key_tokens, header):
+    """Cosine similarity of two token sets (0 when either is empty)."""
+    col_tokens = tokens(header)
+    if not key_tokens or not col_tokens:
+        return 0.0
+    return len(key_tokens & col_tokens) / math.sqrt(len(key_tokens) * len(col_tokens))
+
+def key_tokens(key, info):
+    """A WISHLIST key's words: the key itself plus its description."""
+    return tokens(key) | tokens(info.get('desc', ''))
+
+# --- SAMPLING ---
+
+def numeric_values(series):
+    """The sampled cells as floats ('$1,234.50', '12%' included); NaN where not numeric."""
+    clean = series.astype(str).str.replace(r'[$,%\s]', '', regex=True)
+    return pd.to_numeric(clean, errors='coerce')
+
+def is_year_column(name, series):
+    """Named like a year, or every sampled cell is a whole number in YEAR_RANGE."""
+    if 'year' in tokens(name) or str(name).strip().lower() in ('yr', 'fy'):
+        return True
+    vals = numeric_values(series.dropna())
+    if vals.empty or vals.isna().any():
+        return False
+    return bool(((vals % 1 == 0) & vals.between(*YEAR_RANGE)).all())
+
+def read_sample(path, file_type, rows=SAMPLE_ROWS):
+    """Header plus the first `rows` rows, every cell as text."""
+    reader = pd.read_excel if file_type == 'excel' else pd.read_csv
+    df = reader(path, nrows=rows, dtype=str)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+def latest_year(cells):
+    """The newest year among the sampled cells of a year column, or None."""
+    years = numeric_values(cells)
+    years = years[years.between(*YEAR_RANGE)]
+    return str(int(years.max())) if not years.empty else None
+
+def scan_file(path, resolver):
+    """
+    Profiles one raw file from its header and a sample:
+    {"file", "file_type", "state_col", "state_share", "year_col",
+     "year", "value_cols": {header: sample median}} or {"file", "error"}.
+    """
+    name = os.path.basename(path)
+    file_type = FILE_TYPES[os.path.splitext(name)[1].lower()]
+    try:
+        df = read_sample(path, file_type)
+    except Exception as e:  # Unreadable or not tabular
+        return {"file": name, "error": str(e)}
+
+    profile = {"file": name, "file_type": file_type, "state_col": None, "state_share": 0.0,
+               "year_col": None, "year": None, "value_cols": {}}
+    for col in df.columns:
+        cells = df[col].dropna()
+        if cells.empty:
+            continue
+        share = (pd.Series(resolver.resolve_column(cells)).notna()).mean()
+        if share >= MIN_STATE_SHARE and share > profile['state_share']:
+            profile['state_col'], profile['state_share'] = col, float(share)
+            continue
+        if is_year_column(col, cells):
+            if profile['year_col'] is None:
+                profile['year_col'] = col
+            continue
+        vals = numeric_values(cells)
+        if vals.notna().mean() >= MIN_NUMERIC_SHARE:
+            profile['value_cols'][col] = float(vals.median())
+
+    # The state column may have been a value candidate before a better one appeared
+    profile['value_cols'].pop(profile['state_col'], None)
+    if profile['year_col']:
+        profile['year'] = latest_year(df[profile['year_col']].dropna())
+    if profile['year'] is None:
+        found = FILE_YEAR.search(name)
+        profile['year'] = found.group(0) if found else None
+    return profile
+
+def scan_raw_dir(raw_dir=RAW_DIR, jobs=4, resolver=None):
+    """Profiles every CSV/Excel file in raw_dir, `jobs` files at a time. Returns [profile]."""
+    resolver = resolver or load_resolver()
+    paths = sorted(os.path.join(raw_dir, f) for f in os.listdir(raw_dir)
+                   if os.path.splitext(f)[1].lower() in FILE_TYPES)
+    # Reads are I/O and parser bound, so threads overlap them without
+    # paying a process pool's start-up on a handful of small files
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return list(pool.map(lambda p: scan_file(p, resolver), paths))
+
+# --- PROPOSALS ---
+
+def guess_frequency(header, median, reference):
+    """
+    'a' / 'w' / 'm' for a value column: from words in its header, else from
+    how its typical value compares with the current national monthly figure
+    (`reference`), else monthly. Returns (frequency, reason).
+    """
+    text = str(header).lower()
+    for freq, hints in FREQUENCY_HINTS.items():
+        if any(h in text for h in hints):
+            return freq, f"header says {freq}"
+    if reference and median and median > 0:
+        # The frequency whose monthly value lands closest to the reference
+        freq = min(FREQUENCY_MULT, key=lambda f: abs(math.log(median * FREQUENCY_MULT[f] / reference)))
+        return freq, f"sample median {median:,.0f} vs national {reference:,.0f}/mo"
+    return 'm', "assumed monthly"
+
+def load_reference(geo_path=GEO_FILE):
+    """The current national stats ({key: monthly}), or {} before the first build."""
+    if not os.path.exists(geo_path):
+        return {}
+    return load_output(geo_path, unpack_geo).get('national', {})
+
+def propose(profiles, wishlist, skip=(), reference=None):
+    """
+    Best (file, value column) for every WISHLIST key not in `skip`, as
+    sources_map entries. All (key, column) pairs are ranked by match score
+    and taken greedily, so each key and each column is used at most once.
+    Returns {key: {"entry": {...}, "score": float, "why": str}}.
+    """
+    reference = reference or {}
+    wanted = {key: key_tokens(key, info) for key, info in wishlist.items() if key not in skip}
+    pairs = []
+    for profile in profiles:
+        if profile.get('error') or not profile['state_col']:
+            continue
+        for header in profile['value_cols']:
+            for key, words in wanted.items():
+                score = match_score(words, header)
+                if score >= MIN_MATCH:
+                    pairs.append((score, key, profile, header))
+
+    proposals = {}
+    used = set()
+    for score, key, profile, header in sorted(pairs, key=lambda p: -p[0]):
+        if key in proposals or (profile['file'], header) in used:
+            continue
+        used.add((profile['file'], header))
+        freq, freq_why = guess_frequency(header, profile['value_cols'][header], reference.get(key))
+        year_filter = ({"col": profile['year_col'], "val": profile['year']}
+                       if profile['year_col'] and profile['year'] else None)
+        proposals[key] = {
+            "entry": {
+                "file": profile['file'],
+                "file_type": profile['file_type'],
+                "state_col": profile['state_col'],
+                "value_col": header,
+                "filter": year_filter,
+                "frequency": freq,
+                "year": profile['year'] or '',
+                "source": os.path.splitext(profile['file'])[0],
+                "description": wishlist[key]['desc']
+            },
+            "score": round(score, 3),
+            "why": (f"'{header}' ~ {key} ({score:.2f}); states in '{profile['state_col']}' "
+                    f"({profile['state_share']:.0%} resolve); {freq_why}")
+        }
+    return dict(sorted(proposals.items()))
+
+def write_proposals(proposals, path=PROPOSALS_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(proposals, f, indent=4)
+    return path
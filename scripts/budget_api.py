@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import time
+from urllib.parse import urlsplit, parse_qsl
+
+from output_formats import load_output, unpack_geo, unpack_tax
+from budget_engine import FREQUENCY_MULT
+from ingest_tax import walk_brackets, lookup_tax
+
+# --- CONFIG ---
+TAX_FILE = 'data/tax_tables.json'
+GEO_FILE = 'data/geo_stats.json'
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Distinct (gross_annual, state, filing_status) results kept per table version
+TAX_CACHE_SIZE = 65536
+# The data files are stat'ed at most this often (seconds)
+RELOAD_INTERVAL = 1.0
+# Largest accepted request body and batch
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH = 10000
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class RequestError(Exception):
+    """A client error, reported as a JSON {"error": ...} body with `status`."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# --- CALC (scalar calc.js, on ingest_tax's bracket walk and compiled lookup) ---
+
+def progressive_tax(taxable, jurisdiction, status):
+    table = jurisdiction.get('compiled', {}).get(status)
+    if table:
+        return lookup_tax(taxable, table)
+    return walk_brackets(taxable, jurisdiction['brackets'].get(status) or [])
+
+def normalize_to_monthly(amount, frequency):
+    if not amount or amount != amount:
+        return 0
+    return amount * FREQUENCY_MULT.get(frequency, 1.0)
+
+def compute_tax(tax_data, gross_annual, state, filing_status):
+    """calculateFederal + calculateState for one annual gross income."""
+    status = 'married' if filing_status == 'married' else 'single'
+    fed = tax_data['federal']
+    fica = gross_annual * fed['fica_rate']
+    fed_tax = progressive_tax(max(0, gross_annual - fed['standard_deduction'][status]), fed, status)
+
+    state_tax = 0
+    jur = tax_data.get('states', {}).get(state)
+    if jur:
+        deduction = jur['deductions'].get(status) or 0
+        state_tax = progressive_tax(max(0, gross_annual - deduction), jur, status)
+
+    total = fica + fed_tax + state_tax
+    return {
+        "fica_annual": fica,
+        "fed_annual": fed_tax,
+        "state_annual": state_tax,
+        "total_annual": total,
+        "monthly_total": total / 12
+    }
+
+# --- TABLES ---
+
+class Tables:
+    """
+    The tax and geo tables, loaded once and reloaded when either file
+    changes on disk. Each load gets a fresh LRU-cached tax function, so
+    cached results never outlive the tables they came from.
+    """
+    def __init__(self, tax_path=TAX_FILE, geo_path=GEO_FILE,
+                 cache_size=TAX_CACHE_SIZE, reload_interval=RELOAD_INTERVAL):
+        self.tax_path = tax_path
+        self.geo_path = geo_path
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.version = 0
+        self.loaded_at = None
+        self._stamp = None
+        self._checked = 0.0
+        self.load()
+
+    def stamp(self):
+        stats = [os.stat(p) for p in (self.tax_path, self.geo_path)]
+        return tuple((s.st_mtime_ns, s.st_size) for s in stats)
+
+    def load(self):
+        stamp = self.stamp()
+        self.tax_data = load_output(self.tax_path, unpack_tax)
+        self.geo_data = load_output(self.geo_path, unpack_geo)
+        self.tax = functools.lru_cache(maxsize=self.cache_size)(
+            functools.partial(compute_tax, self.tax_data))
+        self._stamp = stamp
+        self.version += 1
+        self.loaded_at = time.time()
+
+    def refresh(self):
+        """Reloads if a file changed since the last check. Returns True on reload."""
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return False
+        self._checked = now
+        try:
+            if self.stamp() == self._stamp:
+                return False
+            self.load()
+        except (OSError, ValueError, KeyError) as e:
+            # Keep serving the last good tables (e.g. mid-rebuild)
+            print(f"⚠️ Reload failed, keeping version {self.version}: {e}")
+            return False
+        print(f"🔄 Reloaded tables (version {self.version}).")
+        return True
+
+    def info(self):
+        cache = self.tax.cache_info()
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "files": [self.tax_path, self.geo_path],
+            "tax_cache": {"hits": cache.hits, "misses": cache.misses,
+                          "size": cache.currsize, "max_size": cache.maxsize}
+        }
+
+# --- REQUEST HANDLING ---
+
+def number(payload, field, default=0.0):
+    value = payload.get(field, default)
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"'{field}' must be a number, got {value!r}")
+
+def text(payload, field, default=None):
+    """A string field. Other JSON types are rejected: they are used as dict and cache keys."""
+    value = payload.get(field)
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise RequestError(f"'{field}' must be a string, got {value!r}")
+    return value
+
+def gross_monthly(payload):
+    if 'income' not in payload:
+        raise RequestError("'income' is required")
+    return normalize_to_monthly(number(payload, 'income'), text(payload, 'income_frequency', 'annual'))
+
+def state_code(payload):
+    return text(payload, 'state', 'US').upper()
+
+def filing_status(payload):
+    return text(payload, 'filing_status', 'single')
+
+def tax_result(tables, payload):
+    """/tax: {income, income_frequency='annual', state='US', filing_status='single'}."""
+    return dict(tables.tax(gross_monthly(payload) * 12, state_code(payload), filing_status(payload)))
+
+def budget_result(tables, payload):
+    """
+    /budget: a calc.js userInput (income, income_frequency, state,
+    filing_status, housing_type, housing_cost, medical_premium,
+    medical_oop_max, bills). Returns calculateBudget's result plus the
+    tax breakdown.
+    """
+    gross = gross_monthly(payload)
+    tax = tables.tax(gross * 12, state_code(payload), filing_status(payload))
+    net_monthly = gross - tax['monthly_total']
+
+    bills = payload.get('bills') or []
+    if not isinstance(bills, list):
+        raise RequestError("'bills' must be a list")
+    total_bills = 0
+    breakdown = []
+    bill_monthly = []
+    for bill in bills:
+        if not isinstance(bill, dict):
+            raise RequestError("each bill must be an object")
+        monthly = normalize_to_monthly(number(bill, 'amount'), text(bill, 'frequency', 'monthly'))
+        total_bills += monthly
+        bill_monthly.append(monthly)
+        breakdown.append({"name": bill.get('name'), "category": bill.get('category'),
+                          "key": text(bill, 'key'), "monthly_cost": monthly})
+
+    housing_cost = number(payload, 'housing_cost')
+    premium = number(payload, 'medical_premium')
+    safe_medical = premium + number(payload, 'medical_oop_max') / 12
+    total_bills += safe_medical
+    if premium > 0:
+        breakdown.append({"name": 'Health Premium', "category": 'health', "monthly_cost": premium})
+    if safe_medical - premium > 0:
+        breakdown.append({"name": 'Health Risk Buffer', "category": 'health', "monthly_cost": safe_medical - premium})
+
+    geo = tables.geo_data
+    stats = geo['states'].get(text(payload, 'state')) or geo['national']
+    insights = []
+
+    def check_stat(label, user_val, key):
+        avg = stats.get(key) or 0
+        if user_val > 0 and avg > 0:
+            diff = (user_val - avg) / avg
+            pct = round(abs(diff) * 100)
+            if diff > 0.15:
+                insights.append({"type": 'warn', "msg": f"{label} is {pct}% above avg."})
+            elif diff < -0.15:
+                insights.append({"type": 'good', "msg": f"{label} is {pct}% below avg."})
+
+    housing_key = 'housing_mortgage' if payload.get('housing_type') == 'own' else 'housing_rent'
+    check_stat('Housing', housing_cost, housing_key)
+    check_stat('Health Ins.', premium, 'health_insurance')
+    for bill, monthly in zip(bills, bill_monthly):
+        if text(bill, 'key'):
+            check_stat(bill.get('name'), monthly, bill['key'])
+
+    return {
+        "income": {"gross_monthly": gross, "net_monthly": net_monthly},
+        "taxes": {
+            "monthly_total": tax['monthly_total'],
+            "breakdown": {"federal": tax['fed_annual'], "fica": tax['fica_annual'], "state": tax['state_annual']}
+        },
+        "spending": {
+            "total_fixed": total_bills,
+            "housing": housing_cost,
+            "discretionary": net_monthly - housing_cost - total_bills,
+            "breakdown": breakdown
+        },
+        "insights": insights
+    }
+
+ROUTES = {'/tax': tax_result, '/budget': budget_result}
+
+def dispatch(tables, method, target, body):
+    """
+    Routes one request. GET takes query parameters for a single record;
+    POST takes a JSON object (single) or a JSON list (batch, answered as
+    {"results": [...]}). Returns the response payload.
+    """
+    url = urlsplit(target)
+    if url.path == '/health':
+        return tables.info()
+    handler = ROUTES.get(url.path)
+    if handler is None:
+        raise RequestError(f"Unknown path {url.path}", 404)
+
+    if method == 'GET':
+        return handler(tables, dict(parse_qsl(url.query)))
+    if method != 'POST':
+        raise RequestError(f"{method} not allowed", 405)
+
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError as e:
+        raise RequestError(f"Invalid JSON: {e}")
+    if isinstance(payload, dict):
+        return handler(tables, payload)
+    if not isinstance(payload, list):
+        raise RequestError("Body must be a JSON object or a list of objects")
+    if len(payload) > MAX_BATCH:
+        raise RequestError(f"Batch of {len(payload)} exceeds {MAX_BATCH}", 413)
+
+    results = []
+    for i, item in enumerate(payload):
+        if not isinstance(item, dict):
+            raise RequestError(f"Item {i} is not an object")
+        try:
+            results.append(handler(tables, item))
+        except RequestError as e:
+            raise RequestError(f"Item {i}: {e}", e.status)
+    return {"results": results}
+
+def encode_response(status, payload, keep_alive):
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+async def read_request(reader):
+    """Reads one HTTP/1.1 request. Returns (method, target, headers, body) or None on EOF."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise RequestError(f"Malformed request line {lines[0]!r}")
+    method, target, version = parts
+
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    headers[':version'] = version
+
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY_BYTES:
+        raise RequestError(f"Body of {length} bytes exceeds {MAX_BODY_BYTES}", 413)
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+def wants_keep_alive(headers):
+    connection = headers.get('connection', '').lower()
+    if headers[':version'] == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+# --- SERVER ---
+
+def make_handler(tables):
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (RequestError, ValueError, asyncio.LimitOverrunError) as e:
+                    status = e.status if isinstance(e, RequestError) else 400
+                    writer.write(encode_response(status, {"error": str(e)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = wants_keep_alive(headers)
+
+                tables.refresh()
+                try:
+                    status, payload = 200, dispatch(tables, method, target, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:  # Never drop the connection on a calc bug
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+async def start_server(tables, host=HOST, port=PORT):
+    """Starts serving `tables`; returns the asyncio Server (port 0 picks a free port)."""
+    return await asyncio.start_server(make_handler(tables), host, port)
+
+async def serve(host=HOST, port=PORT, tax_path=TAX_FILE, geo_path=GEO_FILE,
+                cache_size=TAX_CACHE_SIZE, reload_interval=RELOAD_INTERVAL):
+    tables = Tables(tax_path, geo_path, cache_size, reload_interval)
+    server = await start_server(tables, host, port)
+    bound = server.sockets[0].getsockname()
+    print(f"🚀 Budget API on http://{bound[0]}:{bound[1]} (tables version {tables.version}).")
+    print("   GET/POST /tax, /budget; GET /health. POST a JSON list for batches.", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves budget and tax calculations over local HTTP.")
+    parser.add_argument('--host', default=HOST, help=f"Interface to bind (default: {HOST}).")
+    parser.add_argument('--port', type=int, default=PORT, help=f"Port to bind (default: {PORT}).")
+    parser.add_argument('--tax', default=TAX_FILE, help=f"Tax tables (default: {TAX_FILE}).")
+    parser.add_argument('--geo', default=GEO_FILE, help=f"Geo stats (default: {GEO_FILE}).")
+    parser.add_argument('--cache-size', type=int, default=TAX_CACHE_SIZE,
+                        help=f"LRU size for (income, state, filing) tax results (default: {TAX_CACHE_SIZE:,}).")
+    parser.add_argument('--reload-interval', type=float, default=RELOAD_INTERVAL,
+                        help="Seconds between checks of the data files for changes "
+                             f"(default: {RELOAD_INTERVAL}).")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.tax, args.geo, args.cache_size, args.reload_interval))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
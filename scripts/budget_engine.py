@@ -0,0 +1,196 @@
+import numpy as np
+
+from output_formats import load_output, unpack_geo, unpack_tax
+from ingest_tax import compile_brackets, check_compiled
+
+# --- CONFIG ---
+TAX_FILE = 'data/tax_tables.json'
+GEO_FILE = 'data/geo_stats.json'
+
+# Mirrors FREQUENCIES in js/config.js (multiplier to a monthly amount)
+FREQUENCY_MULT = {
+    'weekly': 4.333,
+    'biweekly': 2.166,
+    'semimonthly': 2.0,
+    'monthly': 1.0,
+    'quarterly': 1 / 3,
+    'biannual': 1 / 6,
+    'annual': 1 / 12
+}
+
+FILING_STATUSES = ('single', 'married')
+
+# --- TABLE COMPILATION ---
+
+def bracket_arrays(brackets):
+    """
+    ingest_tax's compiled table for a [{"cap", "rate"}, ...] list (the one
+    tax_tables.json ships to js/calc.js) as numpy arrays, checked against
+    the bracket walk the same way. cum[i] is the tax owed below bracket i.
+    Returns (caps, prev_caps, rates, cum).
+    """
+    table = compile_brackets(brackets)
+    bad = check_compiled(brackets, table)
+    if bad is not None:
+        raise ValueError(f"Compiled brackets disagree with the bracket walk at {bad}: {brackets}")
+
+    caps = np.array(table['caps'], dtype=float)
+    rates = np.array(table['rates'], dtype=float)
+    prev_caps = np.concatenate([[0.0], caps[:-1]])
+    cum = np.array([0.0] + table['cum'], dtype=float)
+    return caps, prev_caps, rates, cum
+
+def compile_tax_tables(tax_data):
+    """
+    Precomputes every jurisdiction's bracket tables.
+    Table ids: 0/1 are federal single/married; each state then takes
+    two consecutive ids in the same order.
+    """
+    fed = tax_data['federal']
+    tables = [bracket_arrays(fed['brackets'][s]) for s in FILING_STATUSES]
+    fed_deduction = np.array([fed['standard_deduction'][s] for s in FILING_STATUSES], dtype=float)
+
+    state_codes = list(tax_data.get('states', {}))
+    state_deduction = np.zeros(2 * len(state_codes))
+    for i, code in enumerate(state_codes):
+        state = tax_data['states'][code]
+        for j, status in enumerate(FILING_STATUSES):
+            state_deduction[2 * i + j] = state['deductions'].get(status) or 0
+            tables.append(bracket_arrays(state['brackets'].get(status) or []))
+
+    return {
+        "tables": tables,
+        "fed_deduction": fed_deduction,
+        "fica_rate": fed['fica_rate'],
+        "state_index": {code: i for i, code in enumerate(state_codes)},
+        "state_deduction": state_deduction
+    }
+
+def load_engine(tax_path=TAX_FILE, geo_path=GEO_FILE):
+    """Loads and compiles the tax and geo tables once."""
+    tax_data = load_output(tax_path, unpack_tax)
+    geo_data = load_output(geo_path, unpack_geo)
+    engine = compile_tax_tables(tax_data)
+    engine["geo"] = geo_data
+    return engine
+
+# --- VECTOR HELPERS ---
+
+def lookup(values, mapping, default, n):
+    """Maps a scalar or array of labels through `mapping` (one dict hit per distinct label)."""
+    arr = np.asarray(values)
+    if arr.ndim == 0:
+        return np.full(n, mapping.get(arr.item(), default))
+    uniques, inverse = np.unique(arr, return_inverse=True)
+    return np.array([mapping.get(u, default) for u in uniques.tolist()])[inverse.reshape(arr.shape)]
+
+def status_index(filing_status, n):
+    """0 for single, 1 for married (anything but 'married' is single, as in calc.js)."""
+    return lookup(filing_status, {'married': 1}, 0, n).astype(int)
+
+def normalize_to_monthly(amount, frequency):
+    """Vectorized normalizeToMonthly: missing/zero amounts become 0, unknown frequencies are monthly."""
+    amount = np.asarray(amount, dtype=float)
+    out = amount * lookup(frequency, FREQUENCY_MULT, 1.0, 1)
+    return np.where(np.isnan(amount) | (amount == 0), 0.0, out)
+
+def progressive_tax(taxable, table_ids, tables):
+    """
+    Vectorized calculateProgressiveTax. Records are grouped by table (one
+    pass per jurisdiction, never per record), then each group is one
+    searchsorted into the caps plus one multiply for the partial bracket.
+    """
+    taxable = np.asarray(taxable, dtype=float)
+    tax = np.zeros(len(taxable))
+    if not len(taxable):
+        return tax
+
+    order = np.argsort(table_ids, kind='stable')
+    bounds = np.flatnonzero(np.diff(table_ids[order])) + 1
+    for idx in np.split(order, bounds):
+        caps, prev_caps, rates, cum = tables[table_ids[idx[0]]]
+        n = len(caps)
+        if n == 0:
+            continue
+        t = taxable[idx]
+        m = np.searchsorted(caps, t, side='left')
+        k = np.minimum(m, n - 1)
+        partial = cum[k] + (t - prev_caps[k]) * rates[k]
+        tax[idx] = np.where(m < n, partial, cum[n])
+    return tax
+
+# --- PUBLIC API ---
+
+def calculate_federal(engine, gross_annual, filing_status='single'):
+    """Vectorized calculateFederal. Returns dict of fica/fed/total annual arrays."""
+    gross_annual = np.asarray(gross_annual, dtype=float)
+    status = status_index(filing_status, len(gross_annual))
+    fica = gross_annual * engine["fica_rate"]
+    taxable = np.maximum(0, gross_annual - engine["fed_deduction"][status])
+    fed_tax = progressive_tax(taxable, status, engine["tables"])
+    return {"fica_annual": fica, "fed_annual": fed_tax, "total_annual": fica + fed_tax}
+
+def calculate_state(engine, gross_annual, state_code, filing_status='single'):
+    """Vectorized calculateState. Unknown codes (including 'US') owe 0."""
+    gross_annual = np.asarray(gross_annual, dtype=float)
+    n = len(gross_annual)
+    codes = np.char.upper(np.asarray(state_code, dtype=str))
+    state_idx = lookup(codes, engine["state_index"], -1, n).astype(int)
+    status = status_index(filing_status, n)
+
+    tax = np.zeros(n)
+    known = state_idx >= 0
+    if known.any():
+        ids = 2 * state_idx[known] + status[known]
+        taxable = np.maximum(0, gross_annual[known] - engine["state_deduction"][ids])
+        tax[known] = progressive_tax(taxable, ids + 2, engine["tables"])
+    return tax
+
+def calculate_budget(engine, income, income_frequency='annual', state='US',
+                     filing_status='single', housing_cost=0.0, medical_premium=0.0,
+                     medical_oop_max=0.0, bill_amounts=None, bill_frequencies='monthly'):
+    """
+    Vectorized calculateBudget for whole arrays of profiles.
+    Scalars broadcast across records. housing_cost and medical_premium are
+    monthly (as gatherUserInputs passes them); bill_amounts is an
+    (n_records, n_bills) array, NaN/0 for unused slots, with
+    bill_frequencies a label, one label per bill column, or an (n, k) array.
+    Returns the numeric parts of calculateBudget's result (no insights).
+    """
+    income = np.atleast_1d(np.asarray(income, dtype=float))
+    n = len(income)
+
+    gross_monthly = normalize_to_monthly(income, income_frequency)
+    gross_annual = gross_monthly * 12
+
+    fed = calculate_federal(engine, gross_annual, filing_status)
+    state_tax = calculate_state(engine, gross_annual, np.broadcast_to(state, (n,)), filing_status)
+    total_tax_monthly = (fed["total_annual"] + state_tax) / 12
+    net_monthly = gross_monthly - total_tax_monthly
+
+    # Bills are summed left to right, like the forEach in calc.js
+    total_bills = np.zeros(n)
+    if bill_amounts is not None:
+        amounts = np.asarray(bill_amounts, dtype=float).reshape(n, -1)
+        freqs = np.broadcast_to(np.asarray(bill_frequencies), amounts.shape)
+        monthly = normalize_to_monthly(amounts.ravel(), freqs.ravel()).reshape(amounts.shape)
+        for j in range(monthly.shape[1]):
+            total_bills = total_bills + monthly[:, j]
+
+    housing_cost = np.broadcast_to(np.asarray(housing_cost, dtype=float), (n,))
+    medical_premium = np.broadcast_to(np.asarray(medical_premium, dtype=float), (n,))
+    safe_medical = medical_premium + np.broadcast_to(np.asarray(medical_oop_max, dtype=float), (n,)) / 12
+    total_bills = total_bills + safe_medical
+
+    return {
+        "income": {"gross_monthly": gross_monthly, "net_monthly": net_monthly},
+        "taxes": {
+            "monthly_total": total_tax_monthly,
+            "breakdown": {"federal": fed["fed_annual"], "fica": fed["fica_annual"], "state": state_tax}
+        },
+        "spending": {
+            "total_fixed": total_bills,
+            "housing": housing_cost,
+            "discretionary": net_monthly - housing_cost - total_bills
+        }
+    }
@@ -0,0 +1,318 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from output_formats import build_lock, write_text
+import audit_log
+
+# --- CONFIG ---
+# Every path below (and in the ingest scripts) is relative to the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_DIR = os.path.join(ROOT, 'scripts')
+STATE_FILE = '.cache/build/state.json'
+
+PATHS = {
+    'map': 'config/sources_map.json',
+    'states': 'config/states.json',
+    'zip_county': 'config/zip_county.csv',
+    'raw_dir': 'raw_data',
+    'tax_input': 'raw_data/tax_foundation_2025.xlsx',
+    'geo': 'data/geo_stats.json',
+    'tax': 'data/tax_tables.json',
+    'core': 'data/shards/core.json',
+    'affordability': 'data/affordability.json'
+}
+
+# Bump when the state file layout or skip rules change
+STATE_VERSION = 1
+
+# Gap handling for ingest_data; builds never prompt
+GAP_MODES = ('fail', 'skip')
+
+DEFAULT_OPTIONS = {"compact": False, "series": False, "gaps": 'fail', "answers": None,
+                   "use_cache": True, "ingest_jobs": 1}
+
+# --- TARGETS ---
+# The pipeline DAG: raw files -> parsed sources -> geo_stats / tax_tables ->
+# derived outputs. Parsed sources live inside each ingest (parse cache +
+# build manifest), so they are not separate targets here.
+
+def geo_inputs(options):
+    """The source map, states, every mapped raw file, the crosswalk and audit log."""
+    paths = [PATHS['map'], PATHS['states'], PATHS['zip_county'], audit_log.LOG_FILE]
+    if os.path.exists(PATHS['map']):
+        with open(PATHS['map'], 'r') as f:
+            source_map = json.load(f)
+        files = sorted({config['file'] for config in source_map.values()})
+        paths += [os.path.join(PATHS['raw_dir'], name) for name in files]
+    if options.get('answers'):
+        paths.append(options['answers'])
+    return paths
+
+def run_geo(options):
+    import ingest_data
+    return ingest_data.run_ingest(jobs=options['ingest_jobs'], use_cache=options['use_cache'],
+                                  compact=options['compact'], series=options['series'],
+                                  gap_mode=options['gaps'], answers_path=options.get('answers'),
+                                  shards=False)
+
+def run_tax(options):
+    import ingest_tax
+    return ingest_tax.run_ingest(use_cache=options['use_cache'], compact=options['compact'], shards=False)
+
+def run_shards(options):
+    import shards
+    import releases
+    if shards.write_shards(PATHS['geo'], PATHS['tax'], compact=options['compact']) is None:
+        return False
+    releases.publish_shards(shards.SHARD_DIR)
+    return True
+
+def run_affordability(options):
+    import build_affordability
+    return build_affordability.run_build(PATHS['tax'], PATHS['geo'], PATHS['affordability'],
+                                         compact=options['compact'])
+
+# name -> deps, inputs (besides deps' outputs), the options that change
+# its output, its primary outputs and the function that builds it.
+# "writes" lists inputs the target itself appends to (geo_stats logs gap
+# answers to the audit log); they are fingerprinted as the run left them.
+TARGETS = {
+    "tax_tables": {
+        "deps": [],
+        "inputs": lambda options: [PATHS['tax_input'], PATHS['states']],
+        "options": ['compact'],
+        "outputs": [PATHS['tax']],
+        "run": run_tax
+    },
+    "geo_stats": {
+        "deps": [],
+        "inputs": geo_inputs,
+        "options": ['compact', 'series', 'gaps'],
+        "outputs": [PATHS['geo']],
+        "writes": [audit_log.LOG_FILE],
+        "run": run_geo
+    },
+    "shards": {
+        "deps": ["tax_tables", "geo_stats"],
+        "inputs": lambda options: [],
+        "options": ['compact'],
+        "outputs": [PATHS['core']],
+        "run": run_shards
+    },
+    "affordability": {
+        "deps": ["tax_tables", "geo_stats"],
+        "inputs": lambda options: [],
+        "options": ['compact'],
+        "outputs": [PATHS['affordability']],
+        "run": run_affordability
+    }
+}
+
+# --- FINGERPRINTS ---
+
+def file_hash(path, known):
+    """
+    SHA-256 of a file ('missing' if absent). Reused from `known` when size
+    and mtime match, so unchanged raw files are never re-read.
+    """
+    if not os.path.exists(path):
+        return 'missing'
+    st = os.stat(path)
+    prev = known.get(path)
+    if prev and prev['size'] == st.st_size and prev['mtime_ns'] == st.st_mtime_ns:
+        return prev['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    known[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+    return known[path]['sha256']
+
+def code_hash(known):
+    """One hash over scripts/*.py: any code change rebuilds every target."""
+    names = sorted(n for n in os.listdir(SCRIPT_DIR) if n.endswith('.py'))
+    parts = [f"{n}:{file_hash(os.path.join(SCRIPT_DIR, n), known)}" for n in names]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+def fingerprint_payload(name, options, known, code):
+    """A target's input hashes (its dependencies' outputs included), options and code."""
+    spec = TARGETS[name]
+    paths = list(spec['inputs'](options))
+    for dep in spec['deps']:
+        paths += TARGETS[dep]['outputs']
+    return {
+        "inputs": {p: file_hash(p, known) for p in paths},
+        "options": {k: options[k] for k in spec['options']},
+        "code": code
+    }
+
+def fingerprint_of(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def settled_fingerprint(name, payload, known):
+    """
+    The fingerprint to record after a successful run: the pre-run payload
+    with the target's own "writes" re-hashed, so entries it appended don't
+    make the next build see a changed input.
+    """
+    for path in TARGETS[name].get('writes', []):
+        if path in payload['inputs']:
+            payload['inputs'][path] = file_hash(path, known)
+    return fingerprint_of(payload)
+
+def outputs_intact(name, entry, known):
+    """True if every output still has the hash recorded when it was built."""
+    return all(os.path.exists(p) and file_hash(p, known) == entry['outputs'].get(p)
+               for p in TARGETS[name]['outputs'])
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "targets": {}, "files": {}}
+
+# --- EXECUTION ---
+
+def plan(targets):
+    """The requested targets plus everything they depend on, in dependency order."""
+    order = []
+    def visit(name, path=()):
+        if name in path:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+        if name not in order:
+            for dep in TARGETS[name]['deps']:
+                visit(dep, path + (name,))
+            order.append(name)
+    for name in targets:
+        if name not in TARGETS:
+            raise ValueError(f"Unknown target {name!r} (choose from {', '.join(TARGETS)})")
+        visit(name)
+    return order
+
+def run_target(name, options):
+    """Runs one target with its output captured, so concurrent logs don't interleave."""
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        try:
+            ok = TARGETS[name]['run'](options) is not False
+        except Exception as e:
+            print(f"❌ {name} failed: {e}")
+            ok = False
+    return ok, buf.getvalue(), time.perf_counter() - t0
+
+def build(targets=None, jobs=2, force=False, options=None, state_path=STATE_FILE):
+    """
+    Builds `targets` (default: all) and whatever they depend on. Targets
+    whose dependencies are done run concurrently in up to `jobs` worker
+    processes (jobs=1 runs them inline). A target is skipped when its
+    fingerprint matches the last successful build and its outputs are
+    untouched. The caller must hold build_lock.
+    Returns {target: 'built' | 'skipped' | 'failed' | 'blocked'}.
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    order = plan(targets or list(TARGETS))
+    state = load_state(state_path)
+    known = state['files']
+    code = code_hash(known)
+
+    status = {}
+    running = {}
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    def finish(name, payload, result):
+        ok, log, seconds = result
+        print(log, end='')
+        status[name] = 'built' if ok else 'failed'
+        print(f"{'✅' if ok else '❌'} [{name}] {status[name]} in {seconds:.2f}s")
+        if ok:
+            state['targets'][name] = {
+                "fingerprint": settled_fingerprint(name, payload, known),
+                "outputs": {p: file_hash(p, known) for p in TARGETS[name]['outputs']}
+            }
+        else:
+            state['targets'].pop(name, None)
+
+    try:
+        while len(status) < len(order):
+            for name in order:
+                if name in status or name in running:
+                    continue
+                deps = [status.get(d) for d in TARGETS[name]['deps']]
+                if any(d in ('failed', 'blocked') for d in deps):
+                    status[name] = 'blocked'
+                    print(f"⏭️ [{name}] blocked by a failed dependency")
+                    continue
+                if not all(d in ('built', 'skipped') for d in deps):
+                    continue
+
+                payload = fingerprint_payload(name, options, known, code)
+                entry = state['targets'].get(name)
+                if (not force and entry and entry['fingerprint'] == fingerprint_of(payload)
+                        and outputs_intact(name, entry, known)):
+                    status[name] = 'skipped'
+                    print(f"♻️ [{name}] up to date")
+                    continue
+
+                print(f"🔨 [{name}] building...")
+                if pool is None:
+                    finish(name, payload, run_target(name, options))
+                else:
+                    running[name] = (payload, pool.submit(run_target, name, options))
+
+            if running:
+                done, _ = wait([f for _, f in running.values()], return_when=FIRST_COMPLETED)
+                for name in [n for n, (_, f) in running.items() if f in done]:
+                    payload, future = running.pop(name)
+                    try:
+                        result = future.result()
+                    except Exception as e:  # Worker crashed
+                        result = (False, f"❌ {name} worker crashed: {e}\n", 0.0)
+                    finish(name, payload, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+        write_text(state_path, json.dumps(state, indent=2))
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds data/ from raw_data/ and config/: "
+                                                 "independent targets run concurrently, unchanged ones are skipped.")
+    parser.add_argument('targets', nargs='*', default=[],
+                        help=f"Targets to build with their dependencies (default: all of {', '.join(TARGETS)}).")
+    parser.add_argument('--jobs', type=int, default=2,
+                        help="Targets built at once, each in its own process (default: 2; 1 runs inline).")
+    parser.add_argument('--force', action='store_true', help="Rebuild even when inputs are unchanged.")
+    parser.add_argument('--compact', action='store_true', help="Production output (see the ingest scripts).")
+    parser.add_argument('--series', action='store_true', help="Also build data/geo_series.json.")
+    parser.add_argument('--gaps', choices=GAP_MODES, default='fail',
+                        help="Unfilled geo gaps: stop before saving (default) or leave them empty.")
+    parser.add_argument('--answers', default=None, help="Bulk gap answers file for ingest_data.")
+    parser.add_argument('--ingest-jobs', type=int, default=1, help="--jobs for ingest_data itself.")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the ingest parse cache.")
+    args = parser.parse_args()
+
+    answers = os.path.abspath(args.answers) if args.answers else None
+    os.chdir(ROOT)
+    options = {"compact": args.compact, "series": args.series, "gaps": args.gaps, "answers": answers,
+               "use_cache": not args.no_cache, "ingest_jobs": args.ingest_jobs}
+    try:
+        plan(args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+    with build_lock():
+        result = build(args.targets, jobs=args.jobs, force=args.force, options=options)
+    print("\n🏁 " + ", ".join(f"{name}: {s}" for name, s in result.items()))
+    sys.exit(0 if all(s in ('built', 'skipped') for s in result.values()) else 1)
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+import budget_engine
+from output_formats import (write_output, write_text, remove_compressed, print_size_report, build_lock,
+                            COMPACT_FORMAT, COMPACT_VERSION)
+
+# --- CONFIG ---
+TAX_FILE = budget_engine.TAX_FILE
+GEO_FILE = budget_engine.GEO_FILE
+OUTPUT_FILE = 'data/affordability.json'
+
+# $5k steps to $200k, then $10k steps to $500k
+INCOME_GRID = list(range(10_000, 200_001, 5_000)) + list(range(210_000, 500_001, 10_000))
+FILING_STATUSES = budget_engine.FILING_STATUSES
+
+# Housing type -> geo_stats key, as in calculateBudget's housing insight
+HOUSING_KEYS = {'rent': 'housing_rent', 'own': 'housing_mortgage'}
+
+# Benchmark monthly bills for a typical household (geo_stats keys).
+# A state missing a key uses the national figure for it.
+BASKET = ['electricity', 'water', 'natural_gas', 'garbage', 'internet', 'cell_phone',
+          'car_insurance', 'health_insurance', 'food_total']
+
+# --- BUILD ---
+
+def benchmark_column(geo, codes, key):
+    """One geo_stats key for every code ('US' is national), falling back to the national figure."""
+    national = geo['national'].get(key) or 0
+    return np.array([(geo['national'] if c == 'US' else geo['states'].get(c, {})).get(key) or national
+                     for c in codes], dtype=float)
+
+def build_matrix(engine, incomes=INCOME_GRID, basket=BASKET):
+    """
+    Runs calculate_budget once over the whole grid:
+    filing statuses x states (plus 'US') x incomes x housing types.
+    Tax depends only on (status, state, income), fixed costs only on the
+    state and housing on (housing, state), so each is stored at its own rank:
+      tax_monthly, net_monthly: [status][state][income]
+      fixed_costs:              [state]
+      housing:                  [housing][state]
+      discretionary:            [housing][status][state][income]
+    Monetary values are monthly and rounded to cents.
+    """
+    geo = engine['geo']
+    codes = list(geo['states']) + ['US']
+    housing_types = list(HOUSING_KEYS)
+    incomes = np.asarray(incomes, dtype=float)
+
+    bills = np.stack([benchmark_column(geo, codes, k) for k in basket], axis=1)  # state x key
+    housing = np.stack([benchmark_column(geo, codes, HOUSING_KEYS[h]) for h in housing_types])  # housing x state
+
+    # One record per (housing, status, state, income), in that axis order
+    shape = (len(housing_types), len(FILING_STATUSES), len(codes), len(incomes))
+    h_idx, f_idx, s_idx, i_idx = np.indices(shape).reshape(4, -1)
+    res = budget_engine.calculate_budget(
+        engine,
+        income=incomes[i_idx],
+        income_frequency='annual',
+        state=np.asarray(codes)[s_idx],
+        filing_status=np.asarray(FILING_STATUSES)[f_idx],
+        housing_cost=housing[h_idx, s_idx],
+        bill_amounts=bills[s_idx],
+        bill_frequencies='monthly'
+    )
+
+    def cents(values, full_shape=shape):
+        return np.round(values.reshape(full_shape), 2)
+
+    tax = cents(res['taxes']['monthly_total'])[0]
+    net = cents(res['income']['net_monthly'])[0]
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "incomes": incomes.tolist(),
+        "filing_statuses": list(FILING_STATUSES),
+        "housing_types": housing_types,
+        "codes": codes,
+        "names": [geo['states'].get(c, {}).get('name', 'National') for c in codes],
+        "basket": list(basket),
+        "housing": np.round(housing, 2).tolist(),
+        "fixed_costs": np.round(bills.sum(axis=1), 2).tolist(),
+        "tax_monthly": tax.tolist(),
+        "net_monthly": net.tolist(),
+        "discretionary": cents(res['spending']['discretionary']).tolist()
+    }
+
+# --- LOOKUP ---
+
+def interpolate(incomes, row, income):
+    """Linear interpolation along the income grid (clamped at both ends)."""
+    return float(np.interp(income, incomes, row))
+
+def rank_states(matrix, income, filing_status='single', housing_type='rent'):
+    """
+    Every state's discretionary income at `income`, interpolated between
+    grid points, best first. Returns [(code, discretionary), ...] without
+    the national row.
+    """
+    h = matrix['housing_types'].index(housing_type)
+    f = matrix['filing_statuses'].index('married' if filing_status == 'married' else 'single')
+    rows = matrix['discretionary'][h][f]
+    ranked = [(code, interpolate(matrix['incomes'], row, income))
+              for code, row in zip(matrix['codes'], rows) if code != 'US']
+    return sorted(ranked, key=lambda r: r[1], reverse=True)
+
+# --- MAIN ---
+
+def run_build(tax_path=TAX_FILE, geo_path=GEO_FILE, output_path=OUTPUT_FILE, compact=False):
+    """
+    Builds the affordability table from the current tax and geo outputs.
+    The table is columnar either way, so it is always written minified;
+    compact adds the precompressed .gz/.br siblings and a size report.
+    """
+    missing = [p for p in (tax_path, geo_path) if not os.path.exists(p)]
+    if missing:
+        print(f"❌ Missing {', '.join(missing)}; run the ingest scripts first.")
+        return False
+
+    engine = budget_engine.load_engine(tax_path, geo_path)
+    matrix = build_matrix(engine)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if compact:
+        row = write_output(matrix, output_path, dict, compact=True)
+    else:
+        write_text(output_path, json.dumps(matrix, separators=(',', ':')))
+        remove_compressed(output_path)
+    cells = len(matrix['housing_types']) * len(matrix['filing_statuses']) * len(matrix['codes']) * len(matrix['incomes'])
+    print(f"✅ Created {output_path}: {cells:,} budgets "
+          f"({len(matrix['codes'])} regions x {len(matrix['incomes'])} incomes x "
+          f"{len(matrix['filing_statuses'])} filing x {len(matrix['housing_types'])} housing).")
+    if compact:
+        print_size_report([row])
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Precomputes {OUTPUT_FILE}: budgets for every state "
+                                                 "across an income x filing status x housing grid.")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"Output path (default: {OUTPUT_FILE}).")
+    parser.add_argument('--compact', action='store_true',
+                        help="Also write precompressed .gz/.br siblings and print a size report.")
+    args = parser.parse_args()
+    with build_lock():
+        ok = run_build(output_path=args.output, compact=args.compact)
+    if not ok:
+        raise SystemExit(1)
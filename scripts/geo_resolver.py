@@ -0,0 +1,146 @@
+import collections
+import functools
+import json
+import os
+import re
+
+from readers import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- CONFIG ---
+STATES_FILE = 'config/states.json'
+NATIONAL = 'US'
+
+# Cells that mean the whole country (alias_key form is derived from these)
+NATIONAL_ALIASES = ['United States', 'USA', 'US', 'U.S.', 'U.S.A.', 'National', 'Total US',
+                    'U.S. Total', 'America', 'United States of America']
+
+# AP style and Tax Foundation abbreviations, plus other common spellings.
+# Full names and USPS codes come from config/states.json.
+STATE_ALIASES = {
+    'AL': ['Ala.'], 'AK': ['Alaska'], 'AZ': ['Ariz.'], 'AR': ['Ark.'],
+    'CA': ['Calif.', 'Cal.'], 'CO': ['Colo.'], 'CT': ['Conn.'], 'DE': ['Del.'],
+    'DC': ['D.C.', 'Washington DC', 'Washington, D.C.', 'District of Columbia', 'Dist. of Columbia'],
+    'FL': ['Fla.'], 'GA': ['Ga.'], 'HI': ['Hawaii'], 'ID': ['Idaho'], 'IL': ['Ill.'],
+    'IN': ['Ind.'], 'IA': ['Iowa'], 'KS': ['Kan.', 'Kans.'], 'KY': ['Ky.'], 'LA': ['La.'],
+    'ME': ['Maine'], 'MD': ['Md.'], 'MA': ['Mass.'], 'MI': ['Mich.'], 'MN': ['Minn.'],
+    'MS': ['Miss.'], 'MO': ['Mo.'], 'MT': ['Mont.'], 'NE': ['Neb.', 'Nebr.'], 'NV': ['Nev.'],
+    'NH': ['N.H.'], 'NJ': ['N.J.'], 'NM': ['N.M.', 'N. Mex.'], 'NY': ['N.Y.'], 'NC': ['N.C.'],
+    'ND': ['N.D.', 'N. Dak.'], 'OH': ['Ohio'], 'OK': ['Okla.'], 'OR': ['Ore.', 'Oreg.'],
+    'PA': ['Pa.', 'Penn.', 'Penna.'], 'RI': ['R.I.'], 'SC': ['S.C.'], 'SD': ['S.D.', 'S. Dak.'],
+    'TN': ['Tenn.'], 'TX': ['Tex.', 'Texas'], 'UT': ['Utah'], 'VT': ['Vt.'], 'VA': ['Va.'],
+    'WA': ['Wash.'], 'WV': ['W.Va.', 'W. Va.'], 'WI': ['Wis.', 'Wisc.'], 'WY': ['Wyo.']
+}
+
+# Footnote markers: '(a)', '(b, c)', '[1]', trailing '*' / daggers
+FOOTNOTE = re.compile(r'\s*[\(\[][^\)\]]*[\)\]]|[*†‡§]+')
+# Periods and apostrophes vanish ('N.Y.' -> 'NY'); other punctuation splits words
+DROP = re.compile(r"[.'’]")
+SPLIT = re.compile(r'[^A-Z0-9 ]+')
+
+# --- HELPERS ---
+
+def alias_key(value):
+    """
+    The lookup form of a cell: footnotes stripped, upper-cased, periods
+    dropped, other punctuation and runs of whitespace collapsed to one space.
+    'Calif. (a)' -> 'CALIF', 'Washington, D.C.' -> 'WASHINGTON DC'.
+    """
+    text = DROP.sub('', FOOTNOTE.sub('', str(value)).upper())
+    return ' '.join(SPLIT.sub(' ', text).split())
+
+def load_states(path=STATES_FILE):
+    """{code: name} from config/states.json, or {} when it is missing."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# --- RESOLVER ---
+
+class GeoResolver:
+    """
+    State/national resolver built once from {code: name}.
+    Every alias form is precompiled into a single alias_key -> code table,
+    and every raw cell seen is memoized, so a value repeated across sources
+    is normalized once per process.
+    """
+    def __init__(self, states):
+        self.states = dict(states)
+        # Category order for resolve_categorical: national first, then config order
+        self.categories = [NATIONAL] + [c for c in self.states if c != NATIONAL]
+        self.index = self.build_index()
+        self._memo = {}
+
+    def build_index(self):
+        """
+        alias_key -> code for names, USPS codes, STATE_ALIASES and the
+        national aliases. Raises ValueError if two codes claim one alias.
+        """
+        pairs = [(name, code) for code, name in self.states.items()]
+        pairs += [(code, code) for code in self.states]
+        pairs += [(alias, code) for code, aliases in STATE_ALIASES.items()
+                  if code in self.states or not self.states for alias in aliases]
+        pairs += [(code, code) for code in STATE_ALIASES if not self.states]
+        pairs += [(alias, NATIONAL) for alias in NATIONAL_ALIASES]
+
+        index = {}
+        for alias, code in pairs:
+            key = alias_key(alias)
+            if index.setdefault(key, code) != code:
+                raise ValueError(f"Alias {alias!r} maps to both {index[key]} and {code}")
+        return index
+
+    def resolve(self, value):
+        """One cell -> 'US', a state code, or None."""
+        if not isinstance(value, str):
+            return None
+        if value not in self._memo:
+            self._memo[value] = self.index.get(alias_key(value))
+        return self._memo[value]
+
+    def _factorized(self, values, unresolved=None):
+        """(row -> unique position, resolved uniques), counting misses into `unresolved`."""
+        positions, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        resolved = [self.resolve(str(u)) for u in uniques]
+        if unresolved is not None:
+            misses = [i for i, code in enumerate(resolved) if code is None]
+            if misses:
+                counts = np.bincount(positions[positions >= 0], minlength=len(uniques))
+                for i in misses:
+                    unresolved[str(uniques[i])] += int(counts[i])
+        return positions, resolved
+
+    def resolve_column(self, values, unresolved=None):
+        """
+        A whole column at once; each distinct value is resolved once and
+        broadcast back. Returns an object ndarray of codes or None.
+        unresolved: optional Counter that receives {raw value: rows}.
+        """
+        positions, resolved = self._factorized(values, unresolved)
+        # Sentinel -1 (missing) lands on the trailing None
+        return np.array(resolved + [None], dtype=object)[positions]
+
+    def resolve_categorical(self, values, unresolved=None):
+        """resolve_column as a pandas Categorical over self.categories (NaN where unresolved)."""
+        positions, resolved = self._factorized(values, unresolved)
+        lookup = {code: i for i, code in enumerate(self.categories)}
+        codes = np.array([lookup.get(c, -1) for c in resolved] + [-1])[positions]
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+@functools.lru_cache(maxsize=None)
+def load_resolver(path=STATES_FILE):
+    """
+    The shared resolver for a states file, built once per process.
+    Without the file it still knows USPS codes and STATE_ALIASES.
+    """
+    return GeoResolver(load_states(path))
+
+def format_unresolved(unresolved, limit=10):
+    """One line per source: the most frequent unresolved values with row counts."""
+    top = collections.Counter(unresolved).most_common(limit)
+    text = ', '.join(f"{value!r} x{rows}" for value, rows in top)
+    more = len(unresolved) - len(top)
+    return text + (f" (+{more} more)" if more > 0 else '')
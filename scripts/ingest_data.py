@@ -1,27 +1,87 @@
-import pandas as pd
 import json
 import os
 import math
 import datetime
+import time
+import io
+import argparse
+import sys
+import contextlib
+import collections
+import csv
+import functools
+import hashlib
+
+from readers import lazy_import, choose_backend, read_csv_rows, dataframe_reader, Rows, BACKENDS
+from parse_cache import read_cached, hash_file, CACHE_DIR, CACHE_MAX_BYTES
+import audit_log
+from output_formats import (write_output, write_text, build_lock, pack_geo, unpack_geo, pack_series,
+                            print_size_report)
+from shards import write_shards, SHARD_DIR
+from releases import publish_release, publish_shards
+import run_report
+from geo_resolver import load_resolver, format_unresolved
+from subgeo import (normalize_region_column, build_region_tables, build_region_index,
+                    write_regions, REGION_DIR, CROSSWALK_FILE, LEVELS)
+
+# Loaded on first use: small CSV sources and reused results never need them
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 # --- CONSTANTS & CONFIGURATION ---
 PATHS = {
     'map': 'config/sources_map.json',
     'states': 'config/states.json',
     'output': 'data/geo_stats.json',
-    'audit': 'data/manual_audit_log.json',
-    'raw_dir': 'raw_data'
+    'series': 'data/geo_series.json',
+    'audit': audit_log.LOG_FILE,
+    'audit_index': audit_log.INDEX_FILE,
+    'audit_legacy': audit_log.LEGACY_FILE,
+    'manifest': 'data/.ingest_manifest.json',
+    'regions': REGION_DIR,
+    'zip_county': CROSSWALK_FILE,
+    'raw_dir': 'raw_data',
+    'gap_report': os.path.join(run_report.REPORT_DIR, 'gaps.csv')
 }
 
-# Load States from Config
-if os.path.exists(PATHS['states']):
-    with open(PATHS['states'], 'r') as f:
-        US_STATES = json.load(f)
-else:
-    print("⚠️ States config missing, using fallback.")
-    US_STATES = {} 
+# How unfilled gaps are handled: ask on stdin, abort before saving, or leave empty
+GAP_MODES = ('prompt', 'fail', 'skip')
+GAP_REPORT_COLUMNS = ['scope', 'key', 'value', 'citation', 'frequency', 'description']
+
+# Bump when ingest logic changes in a way that invalidates cached results
+MANIFEST_VERSION = 3
+
+# CSVs at or above this size are streamed in chunks instead of loaded whole
+STREAM_THRESHOLD_BYTES = 256 * 1024 * 1024
+CHUNK_ROWS = 200_000
+
+# --- STATES CONFIG ---
+# Read on first use rather than at import, relative to the working directory
+# at that time (the build orchestrator and tests chdir into workspaces).
+
+@functools.lru_cache(maxsize=None)
+def load_us_states(path):
+    if not os.path.exists(path):
+        print("⚠️ States config missing, using fallback.")
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
 
-STATE_NAME_TO_CODE = {v.upper(): k for k, v in US_STATES.items()}
+def us_states():
+    """{code: name} from config/states.json."""
+    return load_us_states(os.path.abspath(PATHS['states']))
+
+def state_resolver():
+    """The shared resolver: every alias form (names, codes, AP abbreviations, ...) precompiled once."""
+    return load_resolver(os.path.abspath(PATHS['states']))
+
+def __getattr__(name):
+    # US_STATES and RESOLVER used to be built at import time
+    if name == 'US_STATES':
+        return us_states()
+    if name == 'RESOLVER':
+        return state_resolver()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- HELPER FUNCTIONS ---
 
@@ -37,29 +97,15 @@ def load_json(path):
         return [] if 'log' in path else {}
 
 def save_json(data, path):
-    """Saves data to a JSON file with pretty indentation."""
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Saves data to a JSON file with pretty indentation (temp file + rename)."""
+    write_text(path, json.dumps(data, indent=2))
 
 def normalize_state(value):
     """
     Normalizes state inputs to 2-letter codes or 'US'.
     Returns None if the value cannot be mapped.
     """
-    if not isinstance(value, str): 
-        return None
-    clean_val = value.strip().upper()
-    
-    # Handle National Data explicit identifiers
-    national_identifiers = ['UNITED STATES', 'USA', 'US', 'NATIONAL', 'U.S.', 'TOTAL US', 'AMERICA']
-    if clean_val in national_identifiers:
-        return 'US'
-        
-    if clean_val in US_STATES: 
-        return clean_val
-    if clean_val in STATE_NAME_TO_CODE: 
-        return STATE_NAME_TO_CODE[clean_val]
-    return None
+    return state_resolver().resolve(value)
 
 def parse_manual_input(user_input):
     """
@@ -106,12 +152,88 @@ def calculate_monthly_value(raw_val, frequency):
     except (ValueError, TypeError):
         return None
 
+def normalize_state_column(series, unresolved=None):
+    """
+    Vectorized normalize_state over a whole column.
+    Each distinct value is resolved once, then broadcast back to every row.
+    Returns an object ndarray of codes ('US', 'CA', ...) or None.
+    unresolved: optional Counter of {raw value: rows} that did not map.
+    """
+    return state_resolver().resolve_column(series, unresolved)
+
+def normalize_state_categorical(series, unresolved=None):
+    """
+    normalize_state_column as a pandas Categorical over the resolver's
+    codes ('US' first, then config/states.json order): one small integer
+    per row instead of a code string. Unmapped cells have code -1.
+    """
+    return state_resolver().resolve_categorical(series, unresolved)
+
+def parse_numeric_column(series):
+    """
+    Vectorized equivalent of the string-cleaning + float() step in
+    calculate_monthly_value. Returns a float ndarray, NaN where the
+    scalar path would have returned None.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return np.full(len(series), np.nan)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+
+    text = series.astype(object).map(str, na_action='ignore')
+    clean = (text.str.replace('$', '', regex=False)
+                 .str.replace(',', '', regex=False)
+                 .str.replace(' ', '', regex=False))
+    raw = clean.to_numpy(dtype=object)
+
+    # to_numeric finds the parseable cells; float() does the actual conversion
+    # so results are bit-identical to the scalar path.
+    parsed = pd.to_numeric(clean, errors='coerce').notna().to_numpy()
+    vals = np.full(len(raw), np.nan)
+    if parsed.any():
+        vals[parsed] = raw[parsed].astype(float)
+
+    # Anything to_numeric rejected gets a second opinion from float()
+    # (e.g. '1_000'), so no value the old loop accepted is lost.
+    for i in np.flatnonzero(~parsed & clean.notna().to_numpy()):
+        try:
+            vals[i] = float(raw[i])
+        except (ValueError, TypeError):
+            pass
+    return vals
+
+def monthly_value_column(series, frequency):
+    """
+    Vectorized calculate_monthly_value over a whole column.
+    Returns a float ndarray with NaN where the value is missing/unparseable.
+    """
+    vals = parse_numeric_column(series)
+    freq_norm = str(frequency).lower().strip() if frequency else 'm'
+
+    if freq_norm in ['a', 'annual']:
+        vals = vals / 12.0
+    elif freq_norm in ['w', 'weekly']:
+        vals = (vals * 52.0) / 12.0
+    return vals
+
 # --- CORE LOGIC ---
 
-def process_dataframe(df, config, final_data):
+def geo_level(config):
+    """'state' (default) or a sub-state level from subgeo.LEVELS ('county', 'zip')."""
+    return config.get('geo_level') or 'state'
+
+def resolve_geo_column(series, level, unresolved=None):
+    """Normalized codes for a geography column at the given level (None if unmapped)."""
+    if level == 'state':
+        return normalize_state_column(series, unresolved)
+    return normalize_region_column(series, level)
+
+def process_dataframe(df, config, final_data, unresolved=None):
     """
-    Iterates through a loaded DataFrame and updates final_data 
+    Maps a loaded DataFrame onto final_data in columnar form
     based on the configuration map.
+    Later rows win over earlier ones, matching a top-down row walk.
+    State cells that did not map are counted into `unresolved`.
     """
     state_col = config['state_col']
     val_col = config['value_col']
@@ -121,99 +243,594 @@ def process_dataframe(df, config, final_data):
         print(f"   ❌ Columns missing. Needed: {state_col}, {val_col}")
         return 0
 
+    states = normalize_state_categorical(df[state_col], unresolved)
+    categories = list(states.categories)
+    cat_codes = np.asarray(states.codes, dtype=np.intp)
+    vals = monthly_value_column(df[val_col], config.get('frequency'))
+
+    rows = np.flatnonzero((cat_codes >= 0) & ~np.isnan(vals))
+    # Last valid row per category (later rows win)
+    last = np.full(len(categories), -1, dtype=np.intp)
+    np.maximum.at(last, cat_codes[rows], rows)
+    hit = np.flatnonzero(last >= 0)
+
+    for cat, val in zip(hit.tolist(), vals[last[hit]].tolist()):
+        state_code = categories[cat]
+        if state_code == 'US':
+            final_data["national"][key_name] = val
+        elif state_code in final_data["states"]:
+            final_data["states"][state_code][key_name] = val
+
+    # Count every matched state row (duplicates included), as the row walk did
+    in_states = np.array([c in final_data["states"] for c in categories], dtype=bool)
+    count = int(in_states[cat_codes[rows]].sum())
+    return count
+
+def process_rows(rows, config, final_data, unresolved=None):
+    """
+    process_dataframe for a readers.Rows table (stdlib backend): the scalar
+    normalize_state / calculate_monthly_value per cell, which the vectorized
+    path reproduces exactly. Same results and counts, no pandas.
+    """
+    state_col = config['state_col']
+    val_col = config['value_col']
+    key_name = config['_key_name']
+
+    if state_col not in rows.columns or val_col not in rows.columns:
+        print(f"   ❌ Columns missing. Needed: {state_col}, {val_col}")
+        return 0
+
+    resolve = state_resolver().resolve
+    frequency = config.get('frequency')
+    hits = {}
     count = 0
-    for _, row in df.iterrows():
-        state_code = normalize_state(str(row[state_col]))
-        
-        # Apply Normalization
-        val = calculate_monthly_value(row[val_col], config.get('frequency'))
-
-        if state_code and val is not None:
-            if state_code == 'US':
-                final_data["national"][key_name] = val
-            elif state_code in final_data["states"]:
-                final_data["states"][state_code][key_name] = val
-                count += 1
-    
+    for cell, raw in zip(rows[state_col], rows[val_col]):
+        state_code = resolve(cell)
+        if state_code is None:
+            if cell is not None and unresolved is not None:
+                unresolved[cell] += 1
+            continue
+        val = calculate_monthly_value(raw, frequency)
+        if val is None:
+            continue
+        hits[state_code] = val  # Later rows win
+        if state_code in final_data["states"]:
+            count += 1
+
+    for state_code, val in hits.items():
+        if state_code == 'US':
+            final_data["national"][key_name] = val
+        elif state_code in final_data["states"]:
+            final_data["states"][state_code][key_name] = val
     return count
 
-def ingest_sources(source_map, final_data):
+def process_region_dataframe(df, config):
+    """
+    County/ZIP counterpart of process_dataframe. For these sources
+    state_col names the FIPS or ZIP column. Later rows win.
+    Returns (codes, values): unique codes and their monthly values.
+    """
+    geo_col = config['state_col']
+    val_col = config['value_col']
+    if geo_col not in df.columns or val_col not in df.columns:
+        print(f"   ❌ Columns missing. Needed: {geo_col}, {val_col}")
+        return np.array([], dtype=object), np.array([])
+
+    codes = resolve_geo_column(df[geo_col], geo_level(config))
+    vals = monthly_value_column(df[val_col], config.get('frequency'))
+
+    valid = pd.notna(codes) & ~np.isnan(vals)
+    hits = pd.Series(vals[valid], index=codes[valid])
+    hits = hits[~hits.index.duplicated(keep='last')]
+    return hits.index.to_numpy(dtype=object), hits.to_numpy()
+
+def series_dataframe(df, config):
+    """
+    Every year of a state-level entry from one unfiltered read. Rows are
+    grouped by the entry's filter column (its year); within a year later
+    rows win, as in process_dataframe.
+    Returns {"national": {year: val}, "states": {code: {year: val}}}, or None.
+    """
+    year_col = config['filter']['col']
+    state_col = config['state_col']
+    val_col = config['value_col']
+    if any(c not in df.columns for c in (year_col, state_col, val_col)):
+        return None
+
+    codes = normalize_state_column(df[state_col])
+    vals = monthly_value_column(df[val_col], config.get('frequency'))
+    years = df[year_col].astype(str).to_numpy(dtype=object)
+
+    valid = pd.notna(codes) & ~np.isnan(vals)
+    hits = pd.DataFrame({"year": years[valid], "code": codes[valid], "val": vals[valid]})
+    hits = hits.drop_duplicates(['year', 'code'], keep='last')
+
+    out = {"national": {}, "states": {}}
+    for year, code, val in zip(hits['year'].tolist(), hits['code'].tolist(), hits['val'].tolist()):
+        if code == 'US':
+            out["national"][year] = val
+        elif code in us_states():
+            out["states"].setdefault(code, {})[year] = val
+    return out
+
+def series_result(df_all, config, res):
+    """
+    Time-series view of one key: every year in the file for entries that
+    filter on a year column, otherwise the single configured 'year'.
+    """
+    if config.get('filter') and df_all is not None:
+        return series_dataframe(df_all, config)
+    year = config.get('year')
+    if not year:
+        return None
+    key = config['_key_name']
+    return {
+        "national": {str(year): res["national"][key]} if key in res["national"] else {},
+        "states": {code: {str(year): vals[key]} for code, vals in res["states"].items() if key in vals}
+    }
+
+def source_group(config):
+    """Identifies the raw read a source_map entry needs: (file, file_type)."""
+    return (config['file'], config.get('file_type') or 'csv')
+
+def filter_signature(config):
+    """Hashable form of an entry's filter block, or None."""
+    f = config.get('filter')
+    if not f:
+        return None
+    return (f['col'], str(f['val']))
+
+def plan_reads(source_map):
+    """
+    Groups source_map keys by the raw file they read, so each file is
+    parsed once and shared. Only the state/value/filter columns any of
+    its keys need are requested from the reader.
+    Returns {(file, file_type): {"columns": set, "keys": [key, ...]}}.
+    """
+    plan = {}
+    for key, config in source_map.items():
+        group = plan.setdefault(source_group(config), {"columns": set(), "keys": []})
+        group["columns"].update([config['state_col'], config['value_col']])
+        if config.get('filter'):
+            group["columns"].add(config['filter']['col'])
+        group["keys"].append(key)
+    return plan
+
+def read_source(file_path, file_type, columns, cache=None, backend='pandas'):
+    """
+    Parses a raw file, loading only the (whitespace-stripped) column names in
+    `columns`.
+    cache: None to read straight from disk, or {"dir": ..., "max_bytes": ...}
+    to go through the columnar parse cache (keyed by the column selection,
+    so only these columns are ever parsed or stored).
+    backend: see readers.choose_backend. 'csv' returns a readers.Rows and
+    skips the cache (a small file parses faster than a cache lookup);
+    'pyarrow' and 'pandas' return a DataFrame.
+    """
+    if backend == 'csv':
+        return read_csv_rows(file_path, columns)
+
+    wanted = set(columns)
+    usecols = lambda c: str(c).strip() in wanted
+    reader, reader_key = dataframe_reader(file_type, backend)
+    reader_key = f"{reader_key}:{','.join(sorted(wanted))}"
+
+    if cache is not None:
+        df = read_cached(file_path, reader, reader_key, usecols=usecols,
+                         cache_dir=cache["dir"], max_bytes=cache["max_bytes"])
+    else:
+        df = reader(file_path, usecols=usecols)
+
+    df.columns = [c.strip() for c in df.columns if c]
+    return df
+
+def apply_filter(df, config):
+    """Keeps only rows matching the entry's filter column/value (if any)."""
+    if config.get('filter'):
+        f_col = config['filter']['col']
+        f_val = str(config['filter']['val'])
+        if f_col in df.columns:
+            if isinstance(df, Rows):
+                return df.take([i for i, cell in enumerate(df[f_col]) if str(cell) == f_val])
+            df = df[df[f_col].astype(str) == f_val]
+    return df
+
+def stream_source(file_path, columns, entries, chunk_rows=CHUNK_ROWS, series=False, stats=None):
+    """
+    Reads a large CSV in chunks, keeping only the rows that pass each entry's
+    filter and whose state resolves. Peak memory follows chunk_rows plus the
+    surviving rows, not the file size.
+    With series, resolved rows of every year are also kept under None.
+    stats, if given, gets the total rows read under "rows_read".
+    Returns {filter_signature: DataFrame of surviving rows}.
+    """
+    wanted = set(columns)
+    usecols = lambda c: str(c).strip() in wanted
+
+    configs = {}
+    for _, config in entries:
+        configs.setdefault(filter_signature(config), config)
+    if series:
+        configs.setdefault(None, {})
+    geo_cols = {(config['state_col'], geo_level(config)) for _, config in entries}
+
+    kept = {sig: [] for sig in configs}
+    template = None
+    for chunk in pd.read_csv(file_path, usecols=usecols, chunksize=chunk_rows):
+        chunk.columns = [c.strip() for c in chunk.columns if c]
+        if template is None:
+            template = chunk.iloc[:0]
+        if stats is not None:
+            stats["rows_read"] = stats.get("rows_read", 0) + len(chunk)
+
+        resolved = np.zeros(len(chunk), dtype=bool)
+        for col, level in geo_cols:
+            if col in chunk.columns:
+                resolved |= pd.notna(resolve_geo_column(chunk[col], level))
+        chunk = chunk[resolved]
+
+        for sig, config in configs.items():
+            part = apply_filter(chunk, config)
+            if len(part):
+                kept[sig].append(part)
+
+    if template is None:
+        template = pd.read_csv(file_path, usecols=usecols, nrows=0)
+        template.columns = [c.strip() for c in template.columns if c]
+    return {sig: pd.concat(parts) if parts else template for sig, parts in kept.items()}
+
+def ingest_group(file_path, file_type, columns, entries, cache=None, stream=None, series=False,
+                 reader='auto'):
+    """
+    Parses one raw file and normalizes every source_map key that uses it.
+    Self-contained (no shared state) so it can run in a pool worker.
+    entries: [(key, config), ...] in source_map order.
+    stream: None, or {"threshold": bytes, "chunk_rows": n}; CSVs at or above
+    the threshold are read with stream_source instead of in one piece.
+    series: also return every year of each key (see series_result), from
+    the same read.
+    reader: backend for CSVs (readers.BACKENDS); 'auto' reads small files
+    with the stdlib when every key is state-level and series are off.
+    Returns {key: result}; each result carries the key's console output and
+    the values to merge, so the caller can replay them in a fixed order.
+    """
+    results = {}
+    df_all = None
+    filtered = {}  # filter_signature -> filtered DataFrame (or Rows)
+    read_stats = {}
+    backend = 'pandas'
+    # Rows only serve the state-level path; regions and series need DataFrames
+    rows_ok = not series and all(geo_level(config) == 'state' for _, config in entries)
+
+    for key, config in entries:
+        res = {"metadata": None, "national": {}, "states": {}, "regions": None, "series": None,
+               "unresolved": {}, "count": 0, "parsed": False, "read": False, "ok": False}
+        buf = io.StringIO()
+
+        with contextlib.redirect_stdout(buf):
+            print(f"Processing '{key}' from {config['file']}...")
+            try:
+                if not os.path.exists(file_path):
+                    print(f"   ⚠️ File not found: {file_path}")
+                else:
+                    streaming = (stream is not None and file_type != 'excel'
+                                 and os.path.getsize(file_path) >= stream["threshold"])
+                    t0 = time.perf_counter()
+                    if streaming and not filtered:
+                        print(f"   🌊 Streaming {os.path.getsize(file_path) / 1e6:.0f} MB in chunks of {stream['chunk_rows']:,} rows...")
+                        filtered = stream_source(file_path, columns, entries, stream["chunk_rows"], series, read_stats)
+                        res["parsed"] = True
+                    elif not streaming and df_all is None:
+                        backend = choose_backend(file_path, file_type, reader, rows_ok)
+                        df_all = read_source(file_path, file_type, columns, cache, backend)
+                        read_stats["rows_read"] = len(df_all)
+                        res["parsed"] = True
+                    read_seconds = time.perf_counter() - t0 if res["parsed"] else 0.0
+                    res["read"] = True
+
+                    f_key = filter_signature(config)
+                    if f_key not in filtered:
+                        filtered[f_key] = apply_filter(df_all, config)
+                    df = filtered[f_key]
+
+                    res["metadata"] = {
+                        "source": config.get("source", "Unknown"),
+                        "year": config.get("year", "Unknown"),
+                        "desc": config.get("description", "")
+                    }
+
+                    t0 = time.perf_counter()
+                    level = geo_level(config)
+                    if level in LEVELS:
+                        codes, vals = process_region_dataframe(df, config)
+                        res["regions"] = {"level": level, "metric": config.get('metric') or key,
+                                          "codes": codes.tolist(), "values": vals.tolist()}
+                        count = len(codes)
+                    else:
+                        scratch = {"national": {}, "states": {code: {} for code in us_states()}}
+                        unresolved = collections.Counter()
+                        process = process_rows if isinstance(df, Rows) else process_dataframe
+                        try:
+                            count = process(df, config, scratch, unresolved)
+                        finally:
+                            res["national"] = scratch["national"]
+                            res["states"] = {c: v for c, v in scratch["states"].items() if v}
+                            res["unresolved"] = dict(unresolved)
+                    res["count"] = count
+                    if series:
+                        # {} rather than None marks "built in series mode" for the manifest
+                        unfiltered = df_all if df_all is not None else filtered.get(None)
+                        res["series"] = (level not in LEVELS and series_result(unfiltered, config, res)) or {}
+                    res["timing"] = {
+                        "file": config['file'],
+                        "parsed": res["parsed"],
+                        "streamed": streaming,
+                        "backend": backend,
+                        "read_seconds": round(read_seconds, 4),
+                        "rows_read": read_stats.get("rows_read"),
+                        "rows_kept": len(df),
+                        "records": count,
+                        "process_seconds": round(time.perf_counter() - t0, 4)
+                    }
+                    res["ok"] = True
+                    print(f"   ✅ Loaded {count} records.")
+
+            except Exception as e:
+                print(f"   ❌ Critical Error processing {key}: {e}")
+
+        res["log"] = buf.getvalue()
+        results[key] = res
+
+    return results
+
+def merge_key_result(final_data, key, result, regions=None):
+    """
+    Applies one key's ingest_group result to final_data; county/ZIP
+    results go to `regions` ({key: result["regions"]}) instead.
+    """
+    if result.get("regions") is not None:
+        if regions is not None:
+            regions[key] = dict(result["regions"], metadata=result["metadata"])
+        return
+    if result["metadata"] is not None:
+        final_data["metadata"][key] = result["metadata"]
+    final_data["national"].update(result["national"])
+    for code, vals in result["states"].items():
+        final_data["states"][code].update(vals)
+
+# --- INCREMENTAL BUILD MANIFEST ---
+
+def hash_entry(config):
+    """Stable hash of a source_map entry (ignoring injected '_' fields)."""
+    clean = {k: v for k, v in config.items() if not k.startswith('_')}
+    return hashlib.sha256(json.dumps(clean, sort_keys=True).encode()).hexdigest()
+
+def file_fingerprint(path, previous=None):
+    """
+    Size/mtime/content fingerprint of a raw file, or None if it is missing.
+    The content hash is reused from `previous` when size and mtime are
+    unchanged, so untouched files are never re-read.
+    """
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if previous and previous.get("size") == fp["size"] and previous.get("mtime_ns") == fp["mtime_ns"]:
+        fp["sha256"] = previous["sha256"]
+    else:
+        fp["sha256"] = hash_file(path)
+    return fp
+
+def states_hash():
+    """Hash of the states config; a change here invalidates every key."""
+    return hashlib.sha256(json.dumps(us_states(), sort_keys=True).encode()).hexdigest()
+
+def load_manifest(path):
+    """
+    Loads the build manifest, discarding it when it was written by a
+    different manifest version or against a different states config.
+    """
+    manifest = load_json(path)
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("states") != states_hash():
+        manifest = {}
+    manifest.setdefault("files", {})
+    manifest.setdefault("keys", {})
+    manifest["version"] = MANIFEST_VERSION
+    manifest["states"] = states_hash()
+    return manifest
+
+def reusable_result(manifest, key, config, fingerprint, series=False):
+    """
+    Returns the cached result for a key if its entry and file are unchanged
+    (and, when series are wanted, it was built with them).
+    """
+    cached = manifest["keys"].get(key)
+    if not cached or fingerprint is None:
+        return None
+    if series and cached["result"].get("series") is None:
+        return None
+    if cached["entry"] != hash_entry(config) or cached["file"] != fingerprint["sha256"]:
+        return None
+    result = dict(cached["result"], parsed=False, read=False, ok=True)
+    result["log"] = (f"Processing '{key}' from {config['file']}...\n"
+                     f"   ♻️ Reused {result['count']} records (unchanged).\n")
+    return result
+
+def report_unresolved(source_map, results):
+    """
+    One summary, after every source is merged, of state cells that did not
+    resolve (per key, most frequent first), instead of a warning per row.
+    """
+    misses = {key: results[key].get("unresolved") for key in source_map if results[key].get("unresolved")}
+    if not misses:
+        return
+    print(f"🗺️ Unresolved state values in {len(misses)} source(s) (add aliases in geo_resolver.py if these are states):")
+    for key, unresolved in misses.items():
+        print(f"   {key}: {format_unresolved(unresolved)}")
+
+def ingest_sources(source_map, final_data, jobs=1, manifest=None, cache=None, stream=None,
+                   regions=None, series=None, report=None, reader='auto'):
     """
     Loads files defined in source_map and populates final_data.
+    Each raw file is parsed once and shared by every key that maps it.
+    With jobs > 1, files are parsed in a process pool; results are merged
+    in source_map order so output matches a serial run exactly.
+    With a manifest, keys whose entry and raw file are unchanged are reused
+    from it and only dirty keys are parsed; the manifest is updated in place.
+    cache is passed through to read_source (None disables the parse cache);
+    stream and reader to ingest_group (None disables chunked streaming).
+    County/ZIP-level keys are collected into `regions` (see merge_key_result).
+    With a `series` dict, every year of each key is collected into it too
+    ({key: {"national": {year: val}, "states": {code: {year: val}}}}).
+    Per-source read/parse metrics go to `report` (see run_report).
     """
     print("\n--- 2. PROCESSING FILES ---")
-    
+
     for key, config in source_map.items():
-        file_path = os.path.join(PATHS['raw_dir'], config['file'])
         config['_key_name'] = key # Inject key for the processor
-        
-        print(f"Processing '{key}' from {config['file']}...")
-        
-        if not os.path.exists(file_path):
-            print(f"   ⚠️ File not found: {file_path}")
-            continue
 
-        try:
-            if config.get('file_type') == 'excel':
-                df = pd.read_excel(file_path)
-            else:
-                df = pd.read_csv(file_path)
-            
-            df.columns = [c.strip() for c in df.columns if c]
+    results = {}
+    fingerprints = {}
+    if manifest is not None:
+        for key, config in source_map.items():
+            name = config['file']
+            if name not in fingerprints:
+                fp_path = os.path.join(PATHS['raw_dir'], name)
+                fingerprints[name] = file_fingerprint(fp_path, manifest["files"].get(name))
+            cached = reusable_result(manifest, key, config, fingerprints[name], series is not None)
+            if cached:
+                results[key] = cached
 
-            if config.get('filter'):
-                f_col = config['filter']['col']
-                f_val = str(config['filter']['val'])
-                if f_col in df.columns:
-                    df = df[df[f_col].astype(str) == f_val]
+    dirty = {key: config for key, config in source_map.items() if key not in results}
+    plan = plan_reads(dirty)
 
-            final_data["metadata"][key] = {
-                "source": config.get("source", "Unknown"),
-                "year": config.get("year", "Unknown"),
-                "desc": config.get("description", "")
-            }
+    tasks = {}
+    for group, info in plan.items():
+        file_path = os.path.join(PATHS['raw_dir'], group[0])
+        entries = [(key, source_map[key]) for key in info["keys"]]
+        tasks[group] = (file_path, group[1], sorted(info["columns"]), entries, cache, stream,
+                        series is not None, reader)
+
+    if jobs > 1 and len(tasks) > 1:
+        # multiprocessing is a noticeable share of start-up; only pay it here
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            futures = {group: pool.submit(ingest_group, *args) for group, args in tasks.items()}
+            for group, future in futures.items():
+                try:
+                    results.update(future.result())
+                except Exception as e:
+                    # A crashed worker only takes its own file's keys down
+                    for key in plan[group]["keys"]:
+                        results[key] = {
+                            "metadata": None, "national": {}, "states": {}, "regions": None, "series": None,
+                            "unresolved": {}, "count": 0,
+                            "parsed": False, "read": False, "ok": False,
+                            "log": f"Processing '{key}' from {group[0]}...\n"
+                                   f"   ❌ Critical Error processing {key}: {e}\n"
+                        }
+    else:
+        for args in tasks.values():
+            results.update(ingest_group(*args))
+
+    for key in source_map:
+        print(results[key]["log"], end='')
+        merge_key_result(final_data, key, results[key], regions)
+        if series is not None and results[key].get("series"):
+            series[key] = results[key]["series"]
+        timing = results[key].get("timing")
+        if timing is None:
+            timing = {"file": source_map[key]['file'], "ok": results[key]["ok"],
+                      "reused": results[key]["ok"], "records": results[key]["count"]}
+        run_report.add_source(report, key, timing)
+
+    report_unresolved(source_map, results)
+
+    parses = sum(r["parsed"] for r in results.values())
+    served = sum(r["read"] for r in results.values())
+    print(f"📚 Parsed {parses} file(s) for {served} key(s) — saved {served - parses} parse(s).")
+
+    if manifest is not None:
+        manifest["files"] = {name: fp for name, fp in fingerprints.items() if fp}
+        manifest["keys"] = {}
+        for key, config in source_map.items():
+            res = results[key]
+            fp = fingerprints.get(config['file'])
+            if res["ok"] and fp:
+                manifest["keys"][key] = {
+                    "entry": hash_entry(config),
+                    "file": fp["sha256"],
+                    "result": {f: res.get(f) for f in ("metadata", "national", "states", "regions", "series",
+                                                        "unresolved", "count")}
+                }
+        print(f"♻️ Reused {len(source_map) - len(dirty)} key(s) from the build manifest, re-parsed {len(dirty)}.")
+
+def year_sort_key(year):
+    """Numeric years in numeric order, anything else after them."""
+    try:
+        return (0, float(year), year)
+    except ValueError:
+        return (1, 0.0, year)
+
+def build_series(series):
+    """
+    Turns per-key {year: value} maps into year-indexed arrays:
+    {"years": [...], "default_year": latest year with data,
+     "national": {key: [val or None per year]},
+     "states": {code: {key: [val or None per year]}}}.
+    """
+    years = set()
+    for res in series.values():
+        years.update(res["national"])
+        for by_year in res["states"].values():
+            years.update(by_year)
+    years = sorted(years, key=year_sort_key)
+    position = {y: i for i, y in enumerate(years)}
 
-            count = process_dataframe(df, config, final_data)
-            print(f"   ✅ Loaded {count} records.")
+    def to_array(by_year):
+        arr = [None] * len(years)
+        for year, val in by_year.items():
+            arr[position[year]] = val
+        return arr
 
-        except Exception as e:
-            print(f"   ❌ Critical Error processing {key}: {e}")
+    out = {"years": years, "default_year": years[-1] if years else None, "national": {}, "states": {}}
+    for key, res in series.items():
+        if res["national"]:
+            out["national"][key] = to_array(res["national"])
+    for code in us_states():
+        stats = {key: to_array(res["states"][code]) for key, res in series.items() if res["states"].get(code)}
+        if stats:
+            out["states"][code] = stats
+    return out
 
-def apply_historical_audits(final_data, audit_log, source_map):
+def apply_historical_audits(final_data, audit_index, source_map):
     """
     Fills gaps in final_data using the historical manual_audit_log.
+    Walks the index's latest entry per (scope, key), so the cost follows
+    the number of audited values, not the log's history; the newest
+    correction wins. Keys not in source_map are restored too (as monthly).
     CRITICAL: Applies frequency normalization to the raw log value.
     """
     print("\n--- 3. REHYDRATING FROM AUDIT LOG ---")
-    if not audit_log:
+    if not audit_log.count_entries(audit_index):
         print("   No historical manual entries found.")
         return
 
     restored_count = 0
-    
-    for entry in audit_log:
-        scope = entry.get('scope')
-        key = entry.get('key')
-        raw_val = entry.get('value')
-        
+
+    for scope, key, entry in audit_log.iter_latest(audit_index):
+        target = final_data["national"] if scope == 'National' else final_data["states"].get(scope)
+        if target is None or key in target:
+            continue
+
         # Look up frequency from map to apply correct math
-        freq = 'm'
-        if key in source_map:
-            freq = source_map[key].get('frequency', 'm')
+        freq = source_map[key].get('frequency', 'm') if key in source_map else 'm'
+        norm_val = calculate_monthly_value(entry.get('value'), freq)
 
-        # Normalize
-        norm_val = calculate_monthly_value(raw_val, freq)
-        
         if norm_val is not None:
-            if scope == 'National':
-                if key not in final_data["national"]:
-                    final_data["national"][key] = norm_val
-                    restored_count += 1
-            elif scope in final_data["states"]:
-                if key not in final_data["states"][scope]:
-                    final_data["states"][scope][key] = norm_val
-                    restored_count += 1
-                
+            target[key] = norm_val
+            restored_count += 1
+
     print(f"   ✅ Restored {restored_count} manual entries from history (Normalized).")
 
 def interrogate_missing_data(final_data, source_map, new_audit_entries):
@@ -222,7 +839,8 @@ def interrogate_missing_data(final_data, source_map, new_audit_entries):
     normalizes it for the app, but logs the RAW value for audits.
     """
     print("\n--- 4. GAPS ANALYSIS ---")
-    required_keys = list(source_map.keys())
+    # County/ZIP sources fall back to state values, so they never need prompts
+    required_keys = gap_keys(source_map)
     
     # 1. Check National
     print(">> Checking National Averages...")
@@ -251,7 +869,7 @@ def interrogate_missing_data(final_data, source_map, new_audit_entries):
 
     # 2. Check States
     print("\n>> Checking State Gaps...")
-    for state_code in sorted(US_STATES.keys()):
+    for state_code in sorted(us_states().keys()):
         state_obj = final_data["states"][state_code]
         for key in required_keys:
             if key not in state_obj:
@@ -276,42 +894,305 @@ def interrogate_missing_data(final_data, source_map, new_audit_entries):
                         "citation": note
                     })
 
-def run_ingest():
+# --- GAP FILLING (HEADLESS) ---
+
+def gap_keys(source_map):
+    """State-level keys every scope needs; county/ZIP sources fall back to state values."""
+    return [k for k, config in source_map.items() if geo_level(config) == 'state']
+
+def gap_table(final_data, source_map):
+    """
+    The full gap matrix in one pass: scopes (National, then states A-Z) x
+    required keys. Returns {"scope": [...], "key": [...]} of missing
+    (absent, None or NaN) pairs in the order interrogate_missing_data
+    would prompt for them.
+    """
+    keys = gap_keys(source_map)
+    scopes = [('National', final_data["national"])]
+    scopes += [(code, final_data["states"][code]) for code in sorted(us_states())]
+    table = {"scope": [], "key": []}
+    for scope, stats in scopes:
+        for key in keys:
+            val = stats.get(key)
+            if val is None or val != val:
+                table["scope"].append(scope)
+                table["key"].append(key)
+    return table
+
+def find_gaps(final_data, source_map):
+    """gap_table as a DataFrame (scope, key), for merging with answers."""
+    return pd.DataFrame(gap_table(final_data, source_map), columns=['scope', 'key'], dtype=object)
+
+def write_gap_report(gaps, path, source_map):
+    """
+    Writes the gaps as an answers template (CSV, or JSON for a .json path):
+    scope, key, empty value/citation, plus the source's frequency and
+    description so values can be entered in the source's own units.
+    """
+    report = [{"scope": scope, "key": key, "value": '', "citation": '',
+               "frequency": source_map[key].get('frequency', 'm'),
+               "description": source_map[key].get('description', '')}
+              for scope, key in zip(gaps['scope'], gaps['key'])]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith('.json'):
+        save_json({"gaps": report}, path)
+    else:
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=GAP_REPORT_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(report)
+        write_text(path, buf.getvalue())
+    print(f"📋 Gap report: {len(report)} missing value(s) written to {path}")
+
+def load_answers(path):
+    """
+    Reads a bulk answers file: CSV with scope,key,value[,citation] columns,
+    or JSON (a list of such objects, or {"answers"/"gaps": [...]}).
+    Returns a DataFrame with those four columns, or None if unreadable.
+    """
+    try:
+        if path.endswith('.json'):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get('answers', data.get('gaps', []))
+            df = pd.DataFrame(data)
+        else:
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    except Exception as e:
+        print(f"❌ Could not read answers file {path}: {e}")
+        return None
+
+    missing = [c for c in ('scope', 'key', 'value') if c not in df.columns]
+    if missing:
+        print(f"❌ Answers file {path} is missing column(s): {', '.join(missing)}")
+        return None
+    if 'citation' not in df.columns:
+        df['citation'] = ''
+    return df[['scope', 'key', 'value', 'citation']]
+
+def apply_answers(final_data, answers, source_map, new_audit_entries):
+    """
+    Fills gaps from a bulk answers frame in one step. Values are RAW (in
+    the source's frequency): they are normalized per key for the app and
+    logged raw for audits, like manual prompt entries. Only current gaps
+    are filled; for a repeated (scope, key) the last row wins.
+    Returns the number of values applied.
+    """
+    codes = normalize_state_column(answers['scope'].astype(str))
+    raw = parse_numeric_column(answers['value'])
+    df = pd.DataFrame({
+        "scope": np.where(codes == 'US', 'National', codes),
+        "key": answers['key'].astype(str).str.strip().to_numpy(),
+        "raw": raw,
+        "citation": answers['citation'].fillna('').astype(str).str.strip().to_numpy()
+    })
+    usable = pd.notna(codes) & ~np.isnan(raw)
+    df = df[usable].drop_duplicates(['scope', 'key'], keep='last')
+    df = df.merge(find_gaps(final_data, source_map), on=['scope', 'key'])
+
+    # Normalize per key, since frequency is a property of the source
+    df['value'] = np.nan
+    for key, rows in df.groupby('key').groups.items():
+        df.loc[rows, 'value'] = monthly_value_column(df.loc[rows, 'raw'], source_map[key].get('frequency', 'm'))
+    df['citation'] = df['citation'].where(df['citation'] != '', "Manual Entry (No citation)")
+
+    timestamp = str(datetime.datetime.now())
+    for scope, key, raw_val, val, note in zip(df['scope'].tolist(), df['key'].tolist(), df['raw'].tolist(),
+                                              df['value'].tolist(), df['citation'].tolist()):
+        target = final_data["national"] if scope == 'National' else final_data["states"][scope]
+        target[key] = val
+        new_audit_entries.append({
+            "timestamp": timestamp,
+            "scope": scope,
+            "key": key,
+            "value": raw_val,
+            "citation": note
+        })
+
+    ignored = len(answers) - len(df)
+    print(f"   ✅ Applied {len(df)} answer(s)" + (f"; {ignored} ignored (blank, not a gap, or unknown scope/key)." if ignored else "."))
+    return len(df)
+
+def fill_gaps(final_data, source_map, new_audit_entries, gap_mode='prompt', answers_path=None,
+              gap_report_path=PATHS['gap_report']):
+    """
+    Gap handling for a build. Answers (if any) are applied first; then
+    'prompt' asks for whatever is left, while 'fail' and 'skip' run
+    unattended: the remaining gaps go to a report and the build either
+    stops ('fail') or saves with them empty ('skip').
+    Returns False if the build should stop.
+    """
+    if answers_path:
+        print(f"\n>> Applying answers from {answers_path}...")
+        answers = load_answers(answers_path)
+        if answers is None:
+            return False
+        apply_answers(final_data, answers, source_map, new_audit_entries)
+
+    if gap_mode == 'prompt':
+        interrogate_missing_data(final_data, source_map, new_audit_entries)
+        return True
+
+    print("\n--- 4. GAPS ANALYSIS ---")
+    gaps = gap_table(final_data, source_map)
+    write_gap_report(gaps, gap_report_path, source_map)
+    missing = len(gaps['scope'])
+    if not missing:
+        print("   ✅ No gaps.")
+    elif gap_mode == 'fail':
+        print(f"❌ {missing} gap(s) left and --gaps fail is set; nothing was saved.")
+        return False
+    else:
+        print(f"⚠️ Leaving {missing} gap(s) empty; the app falls back to national averages.")
+    return True
+
+def run_ingest(jobs=1, incremental=True, use_cache=True, cache_max_mb=None,
+               stream_threshold_mb=None, chunk_rows=CHUNK_ROWS, compact=False, series=False,
+               report_path=None, trace_memory=False, gap_mode='prompt', answers_path=None,
+               gap_report_path=PATHS['gap_report'], shards=True, reader='auto'):
+    """
+    Builds geo_stats.json (and series/regions/manifest/audit updates).
+    shards=False leaves data/shards to the caller (see build.py).
+    reader: CSV reader backend (see readers.choose_backend).
+    Returns False if nothing was saved.
+    """
     print("--- 1. INITIALIZATION ---")
     
     if not os.path.exists(PATHS['map']):
         print("❌ Map not found. Run scripts/setup_wizard.py first.")
-        return
+        return False
     
-    source_map = load_json(PATHS['map'])
-    audit_log = load_json(PATHS['audit'])
+    report = run_report.new_report('ingest_data', trace_memory=trace_memory)
+    with run_report.stage(report, 'initialization'):
+        source_map = load_json(PATHS['map'])
+        audit_log.migrate_legacy_log(PATHS['audit_legacy'], PATHS['audit'])
+        audit_index = audit_log.load_audit_index(PATHS['audit'], PATHS['audit_index'])
     
     final_data = {
         "metadata": {},
         "national": {},
-        "states": {code: {"name": name} for code, name in US_STATES.items()}
+        "states": {code: {"name": name} for code, name in us_states().items()}
     }
     
     # Execution Pipeline
-    ingest_sources(source_map, final_data)
+    manifest = load_manifest(PATHS['manifest']) if incremental else None
+    cache = None
+    if use_cache:
+        max_bytes = cache_max_mb * 1024 * 1024 if cache_max_mb is not None else CACHE_MAX_BYTES
+        cache = {"dir": CACHE_DIR, "max_bytes": max_bytes}
+    threshold = stream_threshold_mb * 1024 * 1024 if stream_threshold_mb is not None else STREAM_THRESHOLD_BYTES
+    stream = {"threshold": threshold, "chunk_rows": chunk_rows}
+    regions = {}
+    series_results = {} if series else None
+    with run_report.stage(report, 'ingest_sources'):
+        ingest_sources(source_map, final_data, jobs=jobs, manifest=manifest, cache=cache, stream=stream,
+                       regions=regions, series=series_results, report=report, reader=reader)
     
     # Pass source_map to these so they know the Frequency
-    apply_historical_audits(final_data, audit_log, source_map)
+    with run_report.stage(report, 'apply_historical_audits'):
+        apply_historical_audits(final_data, audit_index, source_map)
     
+    # Includes time spent waiting on prompts
     new_audit_entries = []
-    interrogate_missing_data(final_data, source_map, new_audit_entries)
+    with run_report.stage(report, 'gaps'):
+        proceed = fill_gaps(final_data, source_map, new_audit_entries, gap_mode=gap_mode,
+                            answers_path=answers_path, gap_report_path=gap_report_path)
+    if not proceed:
+        run_report.finish_report(report, report_path)
+        return False
     
     # Save Results
     print("\n--- 5. SAVING ---")
-    save_json(final_data, PATHS['output'])
-    print(f"✅ Data compiled to {PATHS['output']}")
-    
-    if new_audit_entries:
-        full_log = audit_log + new_audit_entries
-        save_json(full_log, PATHS['audit'])
-        print(f"📝 Audit log updated with {len(new_audit_entries)} new entries.")
-    else:
-        print("📝 No new manual entries to log.")
+    with run_report.stage(report, 'save'):
+        size_row = write_output(final_data, PATHS['output'], pack_geo, compact=compact)
+        print(f"✅ Data compiled to {PATHS['output']}")
+        if compact:
+            print_size_report([size_row])
+        publish_release('geo_stats', PATHS['output'], unpack_geo)
+        if shards and write_shards(PATHS['output'], compact=compact) is not None:
+            publish_shards(SHARD_DIR)
+
+        if series:
+            timeline = build_series(series_results)
+            series_row = write_output(timeline, PATHS['series'], pack_series, compact=compact)
+            print(f"📈 Wrote {len(timeline['years'])} year(s) for {len(series_results)} key(s) to {PATHS['series']} "
+                  f"(default view: {timeline['default_year']}).")
+            if compact:
+                print_size_report([series_row])
+
+        # County/ZIP tables and the ZIP -> county -> state index
+        if regions or os.path.exists(PATHS['zip_county']):
+            try:
+                tables = build_region_tables(regions)
+                region_rows = write_regions(tables, build_region_index(PATHS['zip_county']),
+                                            PATHS['regions'], compact=compact)
+                if compact:
+                    print_size_report(region_rows)
+            except Exception as e:
+                print(f"❌ Could not build sub-state regions: {e}")
+
+        if manifest is not None:
+            save_json(manifest, PATHS['manifest'])
+        
+        if new_audit_entries:
+            audit_log.append_entries(new_audit_entries, audit_index, PATHS['audit'], PATHS['audit_index'])
+            print(f"📝 Audit log updated with {len(new_audit_entries)} new entries.")
+        else:
+            print("📝 No new manual entries to log.")
+
+    run_report.finish_report(report, report_path)
+    return True
 
 if __name__ == "__main__":
-    run_ingest()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Builds data/geo_stats.json from the mapped raw sources.")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Parse independent source files in N worker processes (default: 1).")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore the build manifest and re-parse every source.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Bypass the columnar parse cache in {CACHE_DIR}.")
+    parser.add_argument('--cache-max-mb', type=int, default=None,
+                        help="Size cap for the parse cache; least-recently-used entries are evicted.")
+    parser.add_argument('--stream-threshold-mb', type=float, default=None,
+                        help="Stream CSVs at least this large in chunks "
+                             f"(default: {STREAM_THRESHOLD_BYTES // (1024 * 1024)}).")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f"Rows per chunk in streaming mode (default: {CHUNK_ROWS:,}).")
+    parser.add_argument('--compact', action='store_true',
+                        help="Production output: minified columnar JSON with .gz/.br siblings and a size report.")
+    parser.add_argument('--series', action='store_true',
+                        help=f"Also write every year of each source to {PATHS['series']} "
+                             "(one read per file; the latest year is the default view).")
+    parser.add_argument('--report', default=None,
+                        help=f"Path for the JSON run report (default: {run_report.REPORT_DIR}/ingest_data.json).")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record tracemalloc peaks per stage in the run report (slower).")
+    parser.add_argument('--profile', default=None,
+                        help="Also dump cProfile stats for the whole run to this path.")
+    parser.add_argument('--gaps', choices=GAP_MODES, default='prompt',
+                        help="Unfilled gaps: ask for each one (default), or run unattended and "
+                             "either stop before saving (fail) or leave them empty (skip).")
+    parser.add_argument('--answers', default=None,
+                        help="Bulk answers file (CSV/JSON of scope,key,value,citation) applied before gap handling.")
+    parser.add_argument('--gap-report', default=PATHS['gap_report'],
+                        help="Where unattended runs write the remaining gaps, as an answers template "
+                             f"(default: {PATHS['gap_report']}).")
+    parser.add_argument('--reader', choices=BACKENDS, default='auto',
+                        help="CSV reader: stdlib csv for small files and pyarrow (if installed) for large ones "
+                             "(auto, default), or force one. Excel always uses pandas.")
+    args = parser.parse_args()
+    options = dict(jobs=args.jobs, incremental=not args.full,
+                   use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                   stream_threshold_mb=args.stream_threshold_mb, chunk_rows=args.chunk_rows,
+                   compact=args.compact, series=args.series,
+                   report_path=args.report, trace_memory=args.trace_memory,
+                   gap_mode=args.gaps, answers_path=args.answers, gap_report_path=args.gap_report,
+                   reader=args.reader)
+    with build_lock():
+        if args.profile:
+            ok = run_report.run_profiled(run_ingest, args.profile, **options)
+        else:
+            ok = run_ingest(**options)
+    if not ok:
+        sys.exit(1)
\ No newline at end of file
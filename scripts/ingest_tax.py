@@ -1,126 +1,288 @@
-import pandas as pd
 import json
-import re
 import os
+import argparse
+import sys
+import bisect
+import functools
+import time
+
+from readers import lazy_import
+from parse_cache import read_cached, CACHE_DIR, CACHE_MAX_BYTES
+from output_formats import write_output, write_text, build_lock, load_output, pack_tax, unpack_tax, print_size_report
+from shards import write_shards, SHARD_DIR
+from releases import publish_release, publish_shards
+from geo_resolver import load_resolver, NATIONAL
+import run_report
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 # --- CONFIG ---
 INPUT_FILE = 'raw_data/tax_foundation_2025.xlsx'
 OUTPUT_FILE = 'data/tax_tables.json'
+HISTORY_FILE = 'data/tax_history.json'
+
+# Cells that mean "no value"
+NO_MONEY = ['n.a.', 'none', '-']
+NO_RATE = ['none', 'n.a.']
+
+INFINITY_CAP = 99999999999
+
+def text_column(series):
+    """
+    str() of every cell, with missing cells kept as NaN. Kept as object
+    dtype so .str ops run on Python's re/str (e.g. Unicode-aware \\d).
+    """
+    return series.astype(object).map(str, na_action='ignore').astype(object)
+
+def digits_to_float(text):
+    """
+    Strips everything but digits and '.', then float()s each cell (0.0 where
+    that fails). to_numeric only finds the parseable cells; float() does the
+    conversion so values match a per-cell float() exactly.
+    """
+    clean = text.str.replace(r'[^\d.]', '', regex=True)
+    raw = clean.to_numpy(dtype=object)
+    out = np.zeros(len(raw))
+
+    ok = pd.to_numeric(clean, errors='coerce').notna().to_numpy()
+    if ok.any():
+        out[ok] = raw[ok].astype(float)
+    for i in np.flatnonzero(~ok & clean.notna().to_numpy()):
+        try:
+            out[i] = float(raw[i])
+        except ValueError:
+            pass
+    return out
 
-# MAPPING: Tax Foundation Abbr -> ISO Code
-STATE_MAP = {
-    'Ala.': 'AL', 'Alaska': 'AK', 'Ariz.': 'AZ', 'Ark.': 'AR', 'Calif.': 'CA',
-    'Colo.': 'CO', 'Conn.': 'CT', 'Del.': 'DE', 'Fla.': 'FL', 'Ga.': 'GA',
-    'Hawaii': 'HI', 'Idaho': 'ID', 'Ill.': 'IL', 'Ind.': 'IN', 'Iowa': 'IA',
-    'Kans.': 'KS', 'Ky.': 'KY', 'La.': 'LA', 'Maine': 'ME', 'Md.': 'MD',
-    'Mass.': 'MA', 'Mich.': 'MI', 'Minn.': 'MN', 'Miss.': 'MS', 'Mo.': 'MO',
-    'Mont.': 'MT', 'Nebr.': 'NE', 'Nev.': 'NV', 'N.H.': 'NH', 'N.J.': 'NJ',
-    'N.M.': 'NM', 'N.Y.': 'NY', 'N.C.': 'NC', 'N.D.': 'ND', 'Ohio': 'OH',
-    'Okla.': 'OK', 'Ore.': 'OR', 'Pa.': 'PA', 'R.I.': 'RI', 'S.C.': 'SC',
-    'S.D.': 'SD', 'Tenn.': 'TN', 'Tex.': 'TX', 'Utah': 'UT', 'Vt.': 'VT',
-    'Va.': 'VA', 'Wash.': 'WA', 'W.Va.': 'WV', 'Wis.': 'WI', 'Wyo.': 'WY',
-    'D.C.': 'DC'
-}
-
-def clean_money(val):
-    """Converts '$3,000' or '$100 credit' to float."""
-    if pd.isna(val) or str(val).strip().lower() in ['n.a.', 'none', '-']:
-        return 0.0
+def clean_money_column(series):
+    """Converts '$3,000' cells to floats; '$100 credit', n.a., none, '-' and blanks to 0.0."""
+    text = text_column(series)
+    out = digits_to_float(text)
     # If it mentions "credit", we ignore it for deduction purposes (conservative)
-    if 'credit' in str(val).lower():
-        return 0.0
-    
-    clean = re.sub(r'[^\d.]', '', str(val))
-    try:
-        return float(clean)
-    except:
-        return 0.0
-
-def clean_rate(val):
-    """Converts '2.00%' to 0.02."""
-    if pd.isna(val) or str(val).strip().lower() in ['none', 'n.a.']:
-        return 0.0
-    
-    clean = re.sub(r'[^\d.]', '', str(val))
-    try:
-        return float(clean) / 100.0
-    except:
-        return 0.0
+    no_value = (text.str.strip().str.lower().isin(NO_MONEY).to_numpy()
+                | text.str.lower().str.contains('credit', regex=False).fillna(False).to_numpy(dtype=bool))
+    out[no_value] = 0.0
+    return out
+
+def clean_rate_column(series):
+    """Converts '2.00%' cells to 0.02; none, n.a. and blanks to 0.0."""
+    text = text_column(series)
+    out = digits_to_float(text) / 100.0
+    out[text.str.strip().str.lower().isin(NO_RATE).to_numpy()] = 0.0
+    return out
 
-def process_brackets(rows, type_key):
+def resolve_state_blocks(states):
     """
-    Converts 'Floor' style data to 'Cap' style logic.
-    Input rows: List of {'rate': 0.02, 'threshold': 0}
+    Maps the sparse State column onto row groups.
+    A row whose State cell resolves to a state (footnotes like '(a)' are
+    ignored; see geo_resolver) starts a block; every following row belongs
+    to it until the next recognised name.
+    Rows before the first state get NaN. If a state appears twice, only
+    its last block is kept.
+    Returns (code per row, keep mask, kept block-start mask, state order),
+    where state order lists codes by first appearance.
     """
-    brackets = []
-    # Sort by threshold just in case
-    rows.sort(key=lambda x: x['threshold'])
-    
-    for i in range(len(rows)):
-        rate = rows[i]['rate']
-        
-        # The Cap is the Threshold of the NEXT bracket.
-        # If last bracket, Cap is Infinity.
-        if i < len(rows) - 1:
-            cap = rows[i+1]['threshold']
-        else:
-            cap = 99999999999 # Infinity
-            
-        brackets.append({
-            "rate": rate,
-            "cap": cap
-        })
+    resolved = load_resolver().resolve_column(states.astype(object).map(str).to_numpy(dtype=object))
+    start_code = pd.Series(np.where(resolved == NATIONAL, None, resolved), index=states.index, dtype=object)
+    starts = start_code.notna().to_numpy()
+
+    block = np.cumsum(starts)
+    code = start_code.where(starts).ffill()
+
+    last_block = pd.Series(block[starts]).groupby(start_code[starts].to_numpy()).max()
+    keep = code.notna().to_numpy() & (block == code.map(last_block).fillna(-1).to_numpy())
+    return code, keep, starts & keep, pd.unique(start_code[starts])
+
+def build_brackets(codes, rates, thresholds):
+    """
+    Converts 'Floor' style rows to 'Cap' style brackets per state.
+    Rows are stably sorted by threshold within each state; each bracket's
+    cap is the next bracket's threshold, the last one's is INFINITY_CAP.
+    Returns {code: [{"rate": r, "cap": c}, ...]}.
+    """
+    order = np.lexsort((thresholds, codes))
+    codes, rates, thresholds = codes[order], rates[order], thresholds[order]
+
+    last = np.ones(len(codes), dtype=bool)
+    last[:-1] = codes[1:] != codes[:-1]
+    caps = np.empty(len(codes), dtype=object)
+    caps[:-1] = thresholds[1:].tolist()
+    caps[last] = INFINITY_CAP
+
+    brackets = {}
+    for code, rate, cap in zip(codes.tolist(), rates.tolist(), caps.tolist()):
+        brackets.setdefault(code, []).append({"rate": rate, "cap": cap})
     return brackets
 
-def run_ingest():
+def parse_tax_sheet(df):
+    """
+    Columnar parse of one Tax Foundation sheet.
+    Returns {code: {"deductions": {...}, "brackets": {...}}} in the order
+    states first appear in the sheet.
+    """
+    code, keep, heads, order = resolve_state_blocks(df['State'])
+    codes = code.to_numpy(dtype=object)
+
+    std_s = clean_money_column(df['Std_Ded_Single'])
+    std_m = clean_money_column(df['Std_Ded_Married'])
+
+    by_status = {}
+    for status, rate_col, bracket_col in (('single', 'Single_Rate', 'Single_Bracket'),
+                                          ('married', 'Married_Rate', 'Married_Bracket')):
+        rates = clean_rate_column(df[rate_col])
+        thresholds = clean_money_column(df[bracket_col])
+        # Only add if it looks like real data
+        rows = keep & ((rates > 0) | (thresholds >= 0))
+        by_status[status] = build_brackets(codes[rows].astype(str), rates[rows], thresholds[rows])
+
+    states = {}
+    head_rows = dict(zip(codes[heads], np.flatnonzero(heads)))
+    for c in order:
+        i = head_rows[c]
+        states[c] = {
+            "deductions": {"single": float(std_s[i]), "married": float(std_m[i])},
+            "brackets": {
+                "single": by_status['single'].get(c, []),
+                "married": by_status['married'].get(c, [])
+            }
+        }
+    return states
+
+def walk_brackets(taxable, brackets):
+    """Reference bracket walk, line for line as calculateProgressiveTax in js/calc.js."""
+    tax = 0
+    previous_cap = 0
+    for bracket in brackets:
+        if taxable > previous_cap:
+            tax += (min(taxable, bracket['cap']) - previous_cap) * bracket['rate']
+            previous_cap = bracket['cap']
+        else:
+            break
+    return tax
+
+def compile_brackets(brackets):
+    """
+    Parallel caps/rates arrays plus cum, the tax owed at each cap.
+    cum is summed in the same order as the bracket walk, so a lookup
+    returns exactly what the walk would.
+    """
+    caps = [b['cap'] for b in brackets]
+    rates = [b['rate'] for b in brackets]
+    cum = []
+    tax, previous_cap = 0, 0
+    for cap, rate in zip(caps, rates):
+        tax += (cap - previous_cap) * rate
+        cum.append(tax)
+        previous_cap = cap
+    return {"caps": caps, "rates": rates, "cum": cum}
+
+def lookup_tax(taxable, table):
+    """One binary search plus one multiply; mirrors lookupProgressiveTax in js/calc.js."""
+    caps, rates, cum = table['caps'], table['rates'], table['cum']
+    if not caps or not taxable > 0:
+        return 0
+    i = bisect.bisect_left(caps, taxable)
+    if i == len(caps):
+        return cum[-1]
+    if i == 0:
+        return taxable * rates[0]
+    return cum[i - 1] + (taxable - caps[i - 1]) * rates[i]
+
+def check_compiled(brackets, table):
+    """
+    Compares lookup_tax with the bracket walk at every cap, halfway between
+    caps, just either side of each cap and past the last one.
+    Returns the first mismatching income, or None.
+    """
+    points = [0, 1]
+    previous_cap = 0
+    for b in brackets:
+        points += [b['cap'], b['cap'] - 0.5, b['cap'] + 0.5, (previous_cap + b['cap']) / 2]
+        previous_cap = b['cap']
+    points.append(previous_cap * 2 + 1)
+
+    for taxable in points:
+        if taxable >= 0 and lookup_tax(taxable, table) != walk_brackets(taxable, brackets):
+            return taxable
+    return None
+
+def add_compiled_tables(final_json):
+    """
+    Adds a "compiled" block next to "brackets" for federal and every state:
+    {status: {"caps": [...], "rates": [...], "cum": [...]}}.
+    A table that disagrees with the walk (e.g. out-of-order caps) is left
+    out, so the front end falls back to walking its brackets.
+    Returns the number of tables left out.
+    """
+    jurisdictions = [('federal', final_json['federal'])] + list(final_json['states'].items())
+    skipped = 0
+    for name, jur in jurisdictions:
+        compiled = {}
+        for status, brackets in jur.get('brackets', {}).items():
+            table = compile_brackets(brackets)
+            bad = check_compiled(brackets, table)
+            if bad is not None:
+                print(f"⚠️ {name} ({status}): compiled table disagrees with the bracket walk at {bad}; not emitted.")
+                skipped += 1
+                continue
+            compiled[status] = table
+        jur['compiled'] = compiled
+    return skipped
+
+def read_sheet(path, sheet, use_cache=True, max_bytes=CACHE_MAX_BYTES):
+    """Loads one worksheet (by position or name) through the parse cache."""
+    if sheet == 0:
+        reader, reader_key = pd.read_excel, 'excel'
+    else:
+        reader, reader_key = functools.partial(pd.read_excel, sheet_name=sheet), f'excel:{sheet}'
+    return read_cached(path, reader, reader_key, enabled=use_cache,
+                       cache_dir=CACHE_DIR, max_bytes=max_bytes)
+
+def run_ingest(use_cache=True, cache_max_mb=None, sheet=0, all_sheets=False, compact=False,
+               report_path=None, trace_memory=False, shards=True):
+    """
+    Builds tax_tables.json from the workbook.
+    shards=False leaves data/shards to the caller (see build.py).
+    Returns False if the workbook is missing.
+    """
     print("--- 1. LOADING EXCEL ---")
     if not os.path.exists(INPUT_FILE):
         print(f"❌ File not found: {INPUT_FILE}")
-        return
+        return False
+
+    report = run_report.new_report('ingest_tax', trace_memory=trace_memory)
 
     # Load file (assuming headers are in row 0 after your cleanup)
-    df = pd.read_excel(INPUT_FILE)
-    
-    # Structure to hold raw rows per state
-    state_buffer = {} 
-    current_state = None
+    max_bytes = cache_max_mb * 1024 * 1024 if cache_max_mb is not None else CACHE_MAX_BYTES
+    with run_report.stage(report, 'load'):
+        t0 = time.perf_counter()
+        df = read_sheet(INPUT_FILE, sheet, use_cache, max_bytes)
+        read_seconds = time.perf_counter() - t0
     
-    # 1. Iterate Rows
-    for _, row in df.iterrows():
-        raw_state = str(row['State']).strip()
-        
-        # Detect New State (Column A has text)
-        if raw_state and raw_state.lower() != 'nan':
-            # Clean State Name (Remove footnotes like '(a)')
-            clean_name = re.sub(r'\s*\(.*\)', '', raw_state).strip()
-            
-            # Map to Code
-            if clean_name in STATE_MAP:
-                current_state = STATE_MAP[clean_name]
-                state_buffer[current_state] = {
-                    "std_ded_s": clean_money(row['Std_Ded_Single']),
-                    "std_ded_m": clean_money(row['Std_Ded_Married']),
-                    "single_rows": [],
-                    "married_rows": []
-                }
-            else:
-                # Handle cases not in map or footnotes
-                pass
-        
-        # 2. Add Bracket Data to Current State
-        if current_state:
-            # Single
-            s_rate = clean_rate(row['Single_Rate'])
-            s_thresh = clean_money(row['Single_Bracket'])
-            # Only add if it looks like real data
-            if s_rate > 0 or s_thresh >= 0:
-                state_buffer[current_state]['single_rows'].append({'rate': s_rate, 'threshold': s_thresh})
-
-            # Married
-            m_rate = clean_rate(row['Married_Rate'])
-            m_thresh = clean_money(row['Married_Bracket'])
-            if m_rate > 0 or m_thresh >= 0:
-                state_buffer[current_state]['married_rows'].append({'rate': m_rate, 'threshold': m_thresh})
+    # 1-2. Resolve State blocks, clean cells and build brackets in bulk
+    with run_report.stage(report, 'parse'):
+        t0 = time.perf_counter()
+        state_tables = parse_tax_sheet(df)
+        run_report.add_source(report, f"sheet:{sheet}", {
+            "file": os.path.basename(INPUT_FILE),
+            "read_seconds": round(read_seconds, 4),
+            "rows_read": len(df),
+            "records": len(state_tables),
+            "process_seconds": round(time.perf_counter() - t0, 4)
+        })
+
+    # Optional: every sheet (e.g. one per year) into a history file
+    if all_sheets:
+        with run_report.stage(report, 'history'):
+            history = {}
+            # Close the workbook before parsing, so no handle outlives the run
+            with pd.ExcelFile(INPUT_FILE) as xl:
+                sheet_names = xl.sheet_names
+            for name in sheet_names:
+                history[name] = parse_tax_sheet(read_sheet(INPUT_FILE, name, use_cache, max_bytes))
+            write_text(HISTORY_FILE, json.dumps({"sheets": history}, indent=2))
+            print(f"📚 Wrote {len(history)} sheet(s) to {HISTORY_FILE}.")
 
     # 3. Transform to Final JSON Structure
     print("--- 2. TRANSFORMING DATA ---")
@@ -143,38 +305,60 @@ def run_ingest():
     # Try to load existing to preserve Federal data
     if os.path.exists(OUTPUT_FILE):
         try:
-            with open(OUTPUT_FILE, 'r') as f:
-                existing = json.load(f)
-                if 'federal' in existing:
-                    final_json['federal'] = existing['federal']
+            existing = load_output(OUTPUT_FILE, unpack_tax)
+            if 'federal' in existing:
+                final_json['federal'] = existing['federal']
         except:
             pass
 
-    for code, data in state_buffer.items():
-        # Process floors into caps
-        single_brackets = process_brackets(data['single_rows'], 'single')
-        married_brackets = process_brackets(data['married_rows'], 'married')
-        
-        # If no brackets (e.g. TX, FL), check if they have a flat rate?
-        # The sheet usually lists "none" or just empty. 
-        # If lists are empty, it's 0 tax.
-        
-        final_json['states'][code] = {
-            "deductions": {
-                "single": data['std_ded_s'],
-                "married": data['std_ded_m']
-            },
-            "brackets": {
-                "single": single_brackets,
-                "married": married_brackets
-            }
-        }
+    final_json['states'] = state_tables
+
+    # Cumulative-tax lookup tables, checked against the bracket walk
+    with run_report.stage(report, 'compile'):
+        skipped = add_compiled_tables(final_json)
+    if not skipped:
+        print("✅ Compiled tax lookup tables match the bracket walk at every cap.")
 
     # 4. Save
     print("--- 3. SAVING ---")
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(final_json, f, indent=2)
-    print(f"✅ Created {OUTPUT_FILE} with {len(final_json['states'])} states.")
+    with run_report.stage(report, 'save'):
+        size_row = write_output(final_json, OUTPUT_FILE, pack_tax, compact=compact)
+        print(f"✅ Created {OUTPUT_FILE} with {len(final_json['states'])} states.")
+        if compact:
+            print_size_report([size_row])
+        publish_release('tax_tables', OUTPUT_FILE, unpack_tax)
+        if shards and write_shards(tax_path=OUTPUT_FILE, compact=compact) is not None:
+            publish_shards(SHARD_DIR)
+
+    run_report.finish_report(report, report_path)
+    return True
 
 if __name__ == "__main__":
-    run_ingest()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Builds data/tax_tables.json from the Tax Foundation workbook.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Bypass the columnar parse cache in {CACHE_DIR}.")
+    parser.add_argument('--cache-max-mb', type=int, default=None,
+                        help="Size cap for the parse cache; least-recently-used entries are evicted.")
+    parser.add_argument('--sheet', default=0,
+                        help="Worksheet to build tax_tables.json from (name; default: the first).")
+    parser.add_argument('--all-sheets', action='store_true',
+                        help=f"Also parse every worksheet (e.g. one per year) into {HISTORY_FILE}.")
+    parser.add_argument('--compact', action='store_true',
+                        help="Production output: minified columnar JSON with .gz/.br siblings and a size report.")
+    parser.add_argument('--report', default=None,
+                        help=f"Path for the JSON run report (default: {run_report.REPORT_DIR}/ingest_tax.json).")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record tracemalloc peaks per stage in the run report (slower).")
+    parser.add_argument('--profile', default=None,
+                        help="Also dump cProfile stats for the whole run to this path.")
+    args = parser.parse_args()
+    options = dict(use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                   sheet=args.sheet, all_sheets=args.all_sheets, compact=args.compact,
+                   report_path=args.report, trace_memory=args.trace_memory)
+    with build_lock():
+        if args.profile:
+            ok = run_report.run_profiled(run_ingest, args.profile, **options)
+        else:
+            ok = run_ingest(**options)
+    if not ok:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,261 @@
+import contextlib
+import json
+import os
+import gzip
+import tempfile
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --- CONFIG ---
+# Marker for the compact (production) layout; the pretty layout has none
+COMPACT_FORMAT = 'columnar'
+COMPACT_VERSION = 1
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+# Held by every build that writes data/, so overlapping builds take turns
+LOCK_FILE = 'data/.build.lock'
+
+# --- GEO STATS ---
+
+def pack_geo(data):
+    """
+    geo_stats.json -> columnar layout: one `keys` list, the national row
+    and a states x keys matrix. Missing stats are null.
+    """
+    keys = list(data.get('national', {}))
+    seen = set(keys)
+    for stats in data.get('states', {}).values():
+        for k in stats:
+            if k != 'name' and k not in seen:
+                seen.add(k)
+                keys.append(k)
+
+    states = data.get('states', {})
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "metadata": data.get('metadata', {}),
+        "keys": keys,
+        "national": [data.get('national', {}).get(k) for k in keys],
+        "codes": list(states),
+        "names": [s.get('name') for s in states.values()],
+        "values": [[s.get(k) for k in keys] for s in states.values()]
+    }
+
+def unpack_geo(packed):
+    """Inverse of pack_geo (null cells are dropped, as they were absent)."""
+    keys = packed['keys']
+    national = {k: v for k, v in zip(keys, packed['national']) if v is not None}
+    states = {}
+    for code, name, row in zip(packed['codes'], packed['names'], packed['values']):
+        stats = {"name": name} if name is not None else {}
+        stats.update((k, v) for k, v in zip(keys, row) if v is not None)
+        states[code] = stats
+    return {"metadata": packed['metadata'], "national": national, "states": states}
+
+# --- TIME SERIES ---
+
+def pack_series(data):
+    """
+    geo_series.json -> columnar layout: a states x keys x years cube plus a
+    keys x years national matrix. Missing years are null.
+    """
+    keys = list(data['national'])
+    seen = set(keys)
+    for stats in data['states'].values():
+        for k in stats:
+            if k not in seen:
+                seen.add(k)
+                keys.append(k)
+    empty = [None] * len(data['years'])
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "years": data['years'],
+        "default_year": data['default_year'],
+        "keys": keys,
+        "national": [data['national'].get(k, empty) for k in keys],
+        "codes": list(data['states']),
+        "values": [[stats.get(k, empty) for k in keys] for stats in data['states'].values()]
+    }
+
+def unpack_series(packed):
+    """Inverse of pack_series (all-null rows are dropped, as they were absent)."""
+    def rows(matrix):
+        return {k: row for k, row in zip(packed['keys'], matrix) if any(v is not None for v in row)}
+    return {
+        "years": packed['years'],
+        "default_year": packed['default_year'],
+        "national": rows(packed['national']),
+        "states": {code: rows(matrix) for code, matrix in zip(packed['codes'], packed['values'])}
+    }
+
+# --- TAX TABLES ---
+
+def pack_jurisdiction(jur):
+    """Replaces [{"cap", "rate"}, ...] lists with parallel arrays; cum moves alongside."""
+    out = {k: v for k, v in jur.items() if k not in ('brackets', 'compiled')}
+    compiled = jur.get('compiled', {})
+    out['brackets'] = {}
+    for status, brackets in jur.get('brackets', {}).items():
+        table = {"caps": [b['cap'] for b in brackets], "rates": [b['rate'] for b in brackets]}
+        if status in compiled:
+            table['cum'] = compiled[status]['cum']
+        out['brackets'][status] = table
+    return out
+
+def unpack_jurisdiction(packed):
+    """Inverse of pack_jurisdiction."""
+    jur = {k: v for k, v in packed.items() if k != 'brackets'}
+    jur['brackets'] = {}
+    jur['compiled'] = {}
+    for status, table in packed.get('brackets', {}).items():
+        jur['brackets'][status] = [{"cap": c, "rate": r} for c, r in zip(table['caps'], table['rates'])]
+        if 'cum' in table:
+            jur['compiled'][status] = table
+    return jur
+
+def pack_tax(data):
+    """tax_tables.json -> columnar layout (no per-bracket objects)."""
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "federal": pack_jurisdiction(data['federal']),
+        "states": {code: pack_jurisdiction(s) for code, s in data.get('states', {}).items()}
+    }
+
+def unpack_tax(packed):
+    """Inverse of pack_tax."""
+    return {
+        "federal": unpack_jurisdiction(packed['federal']),
+        "states": {code: unpack_jurisdiction(s) for code, s in packed.get('states', {}).items()}
+    }
+
+# --- READ / WRITE ---
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get('format') == COMPACT_FORMAT
+
+def load_output(path, unpack):
+    """Loads a build output in either layout, always returning the pretty (nested) one."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return unpack(data) if is_compact(data) else data
+
+def write_bytes(path, data):
+    """
+    Temp file + rename, so a half-written output is never served. The temp
+    file is unique per call, so concurrent writers never share one, and
+    the last rename wins whole.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                               dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600; outputs are meant to be served
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def write_text(path, text):
+    """write_bytes for UTF-8 text."""
+    write_bytes(path, text.encode())
+
+@contextlib.contextmanager
+def build_lock(path=LOCK_FILE, poll=0.5):
+    """
+    Exclusive lock on data/ for the duration of a build (an OS file lock,
+    released even if the process dies). Waits, with a message, while
+    another build holds it.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+') as f:
+        waited = False
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if not waited:
+                    print(f"🔒 Another build holds {path}; waiting...")
+                    waited = True
+                time.sleep(poll)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def remove_compressed(path):
+    """Deletes stale .gz/.br siblings of path."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def write_output(data, path, pack, compact=False):
+    """
+    Writes a build output.
+    Default: pretty JSON (indent=2), and stale .gz/.br siblings are removed.
+    compact: minified columnar JSON plus precompressed .gz/.br siblings
+    (.br only when the brotli module is installed).
+    Returns a size-report row for the file.
+    """
+    pretty = json.dumps(data, indent=2)
+    if not compact:
+        write_text(path, pretty)
+        remove_compressed(path)
+        return {"file": path, "pretty": len(pretty.encode())}
+
+    text = json.dumps(pack(data), separators=(',', ':'))
+    raw = text.encode()
+    write_text(path, text)
+
+    row = {"file": path, "pretty": len(pretty.encode()), "compact": len(raw)}
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    write_bytes(path + '.gz', gz)
+    row['gz'] = len(gz)
+
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        write_bytes(path + '.br', br)
+        row['br'] = len(br)
+    elif os.path.exists(path + '.br'):
+        os.remove(path + '.br')
+    return row
+
+def print_size_report(rows):
+    """Prints pretty vs compact vs compressed sizes for each written output."""
+    print("📏 Output sizes (bytes):")
+    for row in rows:
+        if 'compact' not in row:
+            print(f"   {row['file']}: {row['pretty']:,} (pretty)")
+            continue
+        parts = [f"pretty {row['pretty']:,}", f"compact {row['compact']:,} ({row['compact'] / row['pretty']:.0%})",
+                 f"gz {row['gz']:,} ({row['gz'] / row['pretty']:.0%})"]
+        if 'br' in row:
+            parts.append(f"br {row['br']:,} ({row['br'] / row['pretty']:.0%})")
+        else:
+            parts.append("br skipped (pip install brotli)")
+        print(f"   {row['file']}: " + ", ".join(parts))
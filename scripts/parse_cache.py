@@ -0,0 +1,219 @@
+import json
+import os
+import shutil
+import hashlib
+
+from readers import lazy_import, has_module
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- CONFIG ---
+CACHE_DIR = '.cache/parsed'
+INDEX_FILE = 'index.json'
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the on-disk layout changes
+CACHE_VERSION = 1
+
+# --- HELPERS ---
+
+def hash_file(path):
+    """SHA-256 of a file's contents, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_index(cache_dir):
+    """Loads the path -> fingerprint index, or an empty one."""
+    path = os.path.join(cache_dir, INDEX_FILE)
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+        if index.get("version") == CACHE_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "files": {}}
+
+def save_index(index, cache_dir):
+    """Writes the index atomically; concurrent writers just lose an update."""
+    path = os.path.join(cache_dir, INDEX_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+def entry_size(path):
+    """Bytes used by a cache entry (a file, or a directory of .npy columns)."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, n)) for n in os.listdir(path))
+    return os.path.getsize(path)
+
+def remove_entry(path):
+    """Deletes a cache entry (file or directory) if present."""
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+# --- STORAGE FORMATS ---
+
+def write_feather(df, path):
+    """Feather via pyarrow. Fails on mixed-type object columns."""
+    if not has_module('pyarrow') or not all(isinstance(c, str) for c in df.columns):
+        raise TypeError("feather unavailable for this frame")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.reset_index(drop=True).to_feather(tmp, compression='uncompressed')
+        os.replace(tmp, path)
+    finally:
+        remove_entry(tmp)
+
+def read_feather(path, usecols):
+    """Memory-mapped Feather read of only the requested columns."""
+    import pyarrow.feather as feather
+
+    table = feather.read_table(path, memory_map=True)
+    if usecols is not None:
+        table = table.select([c for c in table.column_names if usecols(c)])
+    return table.to_pandas()
+
+def write_npy(df, path):
+    """
+    One .npy per column plus a header array. Numeric columns can be
+    memory-mapped on load; object columns are pickled, so any mix of
+    Python values round-trips exactly.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    try:
+        header = np.empty(len(df.columns), dtype=object)
+        for i, c in enumerate(df.columns):
+            header[i] = (c, str(df.iloc[:, i].dtype))
+        np.save(os.path.join(tmp, 'columns.npy'), header, allow_pickle=True)
+        for i, c in enumerate(df.columns):
+            arr = df.iloc[:, i].to_numpy()
+            np.save(os.path.join(tmp, f'{i}.npy'), arr, allow_pickle=arr.dtype == object)
+        remove_entry(path)
+        os.replace(tmp, path)
+    finally:
+        remove_entry(tmp)
+
+def read_npy(path, usecols):
+    """Loads the requested columns, memory-mapping the numeric ones."""
+    header = np.load(os.path.join(path, 'columns.npy'), allow_pickle=True)
+    data = {}
+    for i, (name, dtype) in enumerate(header):
+        if usecols is not None and not usecols(name):
+            continue
+        col_path = os.path.join(path, f'{i}.npy')
+        try:
+            arr = np.load(col_path, mmap_mode='r')
+        except ValueError:
+            arr = np.load(col_path, allow_pickle=True)
+        col = pd.Series(arr, name=name, copy=False)
+        if str(col.dtype) != dtype:
+            col = col.astype(dtype)
+        data[name] = col
+    return pd.DataFrame(data, columns=list(data))
+
+# --- PUBLIC API ---
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """
+    Deletes least-recently-used entries until the cache fits in max_bytes.
+    Entries named in `keep` are never evicted.
+    Returns the number of entries removed.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name == INDEX_FILE or name.endswith('.tmp'):
+            continue
+        path = os.path.join(cache_dir, name)
+        entries.append((os.path.getmtime(path), entry_size(path), name, path))
+
+    total = sum(e[1] for e in entries)
+    removed = 0
+    for _, size, name, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name in keep:
+            continue
+        remove_entry(path)
+        total -= size
+        removed += 1
+    return removed
+
+def read_cached(path, reader, reader_key, usecols=None, enabled=True,
+                cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Returns reader(path, usecols=usecols) as a DataFrame, served from the
+    columnar parse cache when the file is unchanged.
+
+    reader:     callable(path, usecols=None) -> DataFrame.
+    reader_key: string naming the reader and its options; part of the key.
+                With usecols, it must also name the column selection, since
+                only those columns are parsed and cached.
+    usecols:    optional callable(column_name) -> bool, passed to the reader
+                so a miss never parses unused columns of a wide file.
+
+    Entries are keyed by path, size, mtime and content hash. The hash is
+    only recomputed when size or mtime moved.
+    """
+    parse = (lambda: reader(path)) if usecols is None else (lambda: reader(path, usecols=usecols))
+    if not enabled:
+        df = parse()
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        index = load_index(cache_dir)
+        st = os.stat(path)
+        abs_path = os.path.abspath(path)
+        known = index["files"].get(abs_path, {})
+
+        if known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+            content = known["sha256"]
+        else:
+            content = hash_file(path)
+
+        name = hashlib.sha256(f"{content}|{reader_key}".encode()).hexdigest()[:32]
+        entry = known.get("entries", {}).get(reader_key)
+
+        if entry and entry["name"] == name and os.path.exists(os.path.join(cache_dir, name)):
+            entry_path = os.path.join(cache_dir, name)
+            try:
+                if entry["format"] == 'feather':
+                    df = read_feather(entry_path, usecols)
+                else:
+                    df = read_npy(entry_path, usecols)
+                os.utime(entry_path)  # LRU touch
+                evict(cache_dir, max_bytes, keep={name})
+                return df
+            except Exception as e:
+                print(f"   ⚠️ Parse cache entry unreadable, re-parsing {path}: {e}")
+                remove_entry(entry_path)
+
+        df = parse()
+        entry_path = os.path.join(cache_dir, name)
+        try:
+            write_feather(df, entry_path)
+            fmt = 'feather'
+        except Exception:
+            write_npy(df, entry_path)
+            fmt = 'npy'
+
+        # Re-read the index so concurrent writers mostly keep each other's updates
+        index = load_index(cache_dir)
+        record = index["files"].get(abs_path, {})
+        if record.get("sha256") != content:
+            record = {"entries": {}}
+        record.update({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": content})
+        record.setdefault("entries", {})[reader_key] = {"name": name, "format": fmt}
+        index["files"][abs_path] = record
+        save_index(index, cache_dir)
+        evict(cache_dir, max_bytes, keep={name})
+    return df
@@ -0,0 +1,154 @@
+import csv
+import importlib.util
+import os
+import sys
+
+# --- CONFIG ---
+# Reader backends for raw CSV sources. Excel always goes through pandas/openpyxl.
+BACKENDS = ('auto', 'csv', 'pyarrow', 'pandas')
+
+# CSVs under this size read fastest with the stdlib: no pandas import at all
+SMALL_FILE_BYTES = 2 * 1024 * 1024
+
+# Cells pandas.read_csv treats as missing by default; the stdlib backend
+# maps them to None so both backends see the same gaps
+NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+})
+
+# --- LAZY IMPORTS ---
+
+def lazy_import(name):
+    """
+    The module `name`, loaded on first attribute access instead of now
+    (importlib's LazyLoader). Used for pandas/numpy so commands that never
+    touch them (--help, small CSV sources, reused results) don't pay their
+    import time.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def has_module(name):
+    """True if `name` is importable, without importing it."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+pd = lazy_import('pandas')
+
+# --- BACKEND CHOICE ---
+
+def choose_backend(path, file_type, requested='auto', rows_ok=True):
+    """
+    The backend that reads `path`:
+      'csv'     stdlib csv -> Rows (small files, or when requested)
+      'pyarrow' pyarrow's multithreaded CSV reader -> DataFrame
+      'pandas'  pandas.read_csv / read_excel -> DataFrame
+    'auto' picks csv under SMALL_FILE_BYTES, else pyarrow when installed.
+    rows_ok=False (the caller needs a DataFrame) rules out 'csv'.
+    """
+    if file_type == 'excel':
+        return 'pandas'
+    backend = requested
+    if backend == 'auto':
+        small = os.path.exists(path) and os.path.getsize(path) < SMALL_FILE_BYTES
+        backend = 'csv' if small and rows_ok else 'pyarrow'
+    if backend == 'csv' and not rows_ok:
+        backend = 'pyarrow'
+    if backend == 'pyarrow' and not has_module('pyarrow'):
+        backend = 'pandas'
+    return backend
+
+# --- STDLIB BACKEND ---
+
+class Rows:
+    """
+    Columns read by the stdlib backend: {header: [cell text or None]}.
+    Supports the slice of the DataFrame API the ingest needs:
+    `name in rows.columns`, `rows[name]` and `len(rows)`.
+    """
+    def __init__(self, columns, length=0):
+        self.columns = columns
+        self.length = length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.length
+
+    def take(self, keep):
+        """The rows whose positions are in `keep` (a list of ints)."""
+        return Rows({name: [col[i] for i in keep] for name, col in self.columns.items()}, len(keep))
+
+def read_csv_rows(path, columns):
+    """
+    Reads only the (whitespace-stripped) headers in `columns` with the
+    stdlib csv module. Blank lines are skipped and NA_VALUES become None,
+    as pandas.read_csv does; a repeated header keeps its first column.
+    """
+    wanted = set(columns)
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        picks = {}
+        for i, name in enumerate(header):
+            name = name.strip()
+            if name in wanted and name not in picks:
+                picks[name] = i
+        data = {name: [] for name in picks}
+        length = 0
+        for row in reader:
+            if not row:
+                continue
+            length += 1
+            width = len(row)
+            for name, i in picks.items():
+                cell = row[i] if i < width else ''
+                data[name].append(None if cell in NA_VALUES else cell)
+    return Rows(data, length)
+
+# --- DATAFRAME BACKENDS ---
+
+def read_csv_header(path):
+    """The raw (unstripped) header row of a CSV."""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+def read_pyarrow(path, usecols=None):
+    """
+    pandas DataFrame via pyarrow.csv (parallel parse). Only the columns
+    usecols(name) accepts are converted; empty text cells become NaN as
+    with pandas.
+    """
+    import pyarrow.csv as pa_csv
+
+    header = read_csv_header(path)
+    include = [c for c in dict.fromkeys(header) if usecols is None or usecols(c)]
+    options = pa_csv.ConvertOptions(include_columns=include, strings_can_be_null=True,
+                                    null_values=sorted(NA_VALUES))
+    return pa_csv.read_csv(path, convert_options=options).to_pandas()
+
+def dataframe_reader(file_type, backend):
+    """
+    (reader, reader_key) for a full DataFrame parse: reader(path, usecols=None)
+    and the name the parse cache files its result under.
+    """
+    if file_type == 'excel':
+        return pd.read_excel, 'excel'
+    if backend == 'pyarrow':
+        return read_pyarrow, 'csv:pyarrow'
+    return pd.read_csv, 'csv'
@@ -0,0 +1,310 @@
+import datetime
+import decimal
+import hashlib
+import json
+import os
+
+from output_formats import load_output, write_bytes, write_text, build_lock, COMPRESSED_SUFFIXES
+
+# --- CONFIG ---
+RELEASE_DIR = 'data/releases'
+MANIFEST_FILE = 'manifest.json'
+# Hashed copies of data/shards, under RELEASE_DIR
+SHARD_RELEASE_DIR = 'shards'
+# Guards the manifest's read-modify-write (the two ingests may run at once)
+MANIFEST_LOCK = '.manifest.lock'
+
+# Releases per output kept on disk; clients older than this refetch in full
+KEEP_RELEASES = 10
+# Hex digits of the SHA-256 used in filenames
+HASH_LEN = 16
+
+# 2: entries carry data_sha256 and the manifest a "shards" entry
+MANIFEST_FORMAT = 2
+
+# --- CANONICAL JSON ---
+# Clients patch the nested document with deltas, so they can't check it
+# against the file's bytes. data_sha256 hashes it in a form JavaScript
+# rebuilds exactly: sorted keys, no whitespace, numbers as Number#toString.
+
+def js_number(value):
+    """A float the way JSON.stringify writes it (1500.0 -> '1500', 1e-07 -> '1e-7')."""
+    if value != value or value in (float('inf'), float('-inf')):
+        return 'null'
+    if value == 0:
+        return '0'
+    sign, digits, exp = decimal.Decimal(repr(value)).as_tuple()
+    digits = ''.join(map(str, digits))
+    stripped = digits.rstrip('0')
+    exp += len(digits) - len(stripped)
+    digits, k = stripped, len(stripped)
+    n = exp + k  # Position of the decimal point relative to the digits
+    if k <= n <= 21:
+        text = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        text = f"{digits[:n]}.{digits[n:]}"
+    elif -6 < n <= 0:
+        text = '0.' + '0' * -n + digits
+    else:
+        mantissa = digits[0] + (f".{digits[1:]}" if k > 1 else '')
+        text = f"{mantissa}e{'+' if n > 0 else '-'}{abs(n - 1)}"
+    return ('-' if sign else '') + text
+
+def canonical_json(value):
+    """Mirrors canonicalJSON in js/data.js."""
+    if isinstance(value, dict):
+        items = (f"{json.dumps(k, ensure_ascii=False)}:{canonical_json(value[k])}" for k in sorted(value))
+        return '{' + ','.join(items) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(canonical_json(v) for v in value) + ']'
+    if isinstance(value, float):
+        return js_number(value)
+    return json.dumps(value, ensure_ascii=False)
+
+def data_hash(data):
+    return hashlib.sha256(canonical_json(data).encode('utf-8')).hexdigest()
+
+# --- DELTAS ---
+
+def scoped_items(data):
+    """
+    {scope: {key: value}} for a nested build output. Each top-level dict
+    ('metadata', 'national', 'federal') is a scope, and so is every state
+    as 'states/<code>'.
+    """
+    scopes = {}
+    for top, block in data.items():
+        if top == 'states':
+            scopes.update((f"states/{code}", stats) for code, stats in block.items())
+        elif isinstance(block, dict):
+            scopes[top] = block
+    return scopes
+
+def diff_release(old, new):
+    """
+    JSON-patch style ops turning `old` into `new`, one per changed
+    (scope, key): {"op": "add"|"replace"|"remove", "scope", "key", "value"}.
+    A whole scope that appears or disappears is one op without "key".
+    """
+    before, after = scoped_items(old), scoped_items(new)
+    ops = []
+    for scope in before:
+        if scope not in after:
+            ops.append({"op": "remove", "scope": scope})
+    for scope, block in after.items():
+        if scope not in before:
+            ops.append({"op": "add", "scope": scope, "value": block})
+            continue
+        prev = before[scope]
+        for key in prev:
+            if key not in block:
+                ops.append({"op": "remove", "scope": scope, "key": key})
+        for key, value in block.items():
+            if key not in prev:
+                ops.append({"op": "add", "scope": scope, "key": key, "value": value})
+            elif prev[key] != value:
+                ops.append({"op": "replace", "scope": scope, "key": key, "value": value})
+    return ops
+
+def apply_delta(data, ops):
+    """Applies diff_release ops to `data` in place (mirrors applyDelta in js/data.js)."""
+    for op in ops:
+        *parents, scope = op['scope'].split('/')
+        parent = data
+        for part in parents:
+            parent = parent.setdefault(part, {})
+        if 'key' not in op:
+            if op['op'] == 'remove':
+                parent.pop(scope, None)
+            else:
+                parent[scope] = op['value']
+        elif op['op'] == 'remove':
+            parent.get(scope, {}).pop(op['key'], None)
+        else:
+            parent.setdefault(scope, {})[op['key']] = op['value']
+    return data
+
+# --- MANIFEST ---
+
+def load_manifest(release_dir=RELEASE_DIR):
+    path = os.path.join(release_dir, MANIFEST_FILE)
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('format') == MANIFEST_FORMAT:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"format": MANIFEST_FORMAT, "outputs": {}}
+
+def prune(entry, name, release_dir):
+    """Keeps the newest KEEP_RELEASES releases of `name`; deletes files nobody references."""
+    entry['history'] = entry['history'][:KEEP_RELEASES - 1]
+    live = {entry['current'], *entry['history']}
+    entry['deltas'] = {h: d for h, d in entry['deltas'].items() if h in live}
+
+    keep = {entry['file']} | {d['file'] for d in entry['deltas'].values()}
+    keep |= {f"{name}.{h}.json" for h in live}
+    removed = 0
+    for fname in os.listdir(release_dir):
+        base = fname
+        for suffix in COMPRESSED_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base.startswith(f"{name}.") and base not in keep:
+            os.remove(os.path.join(release_dir, fname))
+            removed += 1
+    return removed
+
+def copy_release(path, raw, dest):
+    """Writes a release file and copies the output's compressed siblings next to it."""
+    write_bytes(dest, raw)
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(path + suffix):
+            with open(path + suffix, 'rb') as f:
+                write_bytes(dest + suffix, f.read())
+
+def present_deltas(entry, release_dir):
+    """The entry's deltas whose files are on disk (a fresh checkout has none)."""
+    return {h: d for h, d in entry['deltas'].items() if os.path.exists(os.path.join(release_dir, d['file']))}
+
+# --- PUBLIC API ---
+
+def publish_release(name, path, unpack, release_dir=RELEASE_DIR):
+    """
+    Publishes a freshly written build output as an immutable release:
+      <release_dir>/<name>.<hash>.json  (byte copy, plus .gz/.br siblings)
+      <release_dir>/<name>.<old>-<hash>.delta.json  (ops from the previous release)
+    and points the manifest's entry for `name` at it. The hash is of the
+    file's bytes, so a release's URL can be cached forever; data_sha256
+    is of the nested document, for clients that patch it with deltas.
+    Unchanged output is a no-op, unless the release file is missing (the
+    manifest is tracked, release files are not): then it is rewritten. `unpack` turns the compact layout back
+    into the nested one that deltas are computed on.
+    Returns the manifest entry.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    sha = hashlib.sha256(raw).hexdigest()
+    digest = sha[:HASH_LEN]
+    os.makedirs(release_dir, exist_ok=True)
+
+    with build_lock(os.path.join(release_dir, MANIFEST_LOCK)):
+        manifest = load_manifest(release_dir)
+        entry = manifest['outputs'].get(name)
+        if entry and entry['current'] == digest:
+            if os.path.exists(os.path.join(release_dir, entry['file'])):
+                print(f"📦 {name}: release {digest} unchanged.")
+                return entry
+            copy_release(path, raw, os.path.join(release_dir, entry['file']))
+            entry['deltas'] = present_deltas(entry, release_dir)
+            write_text(os.path.join(release_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+            print(f"📦 {name}: release {digest} restored.")
+            return entry
+
+        fname = f"{name}.{digest}.json"
+        copy_release(path, raw, os.path.join(release_dir, fname))
+
+        new = load_output(path, unpack)
+        new_entry = {"current": digest, "file": fname, "sha256": sha, "data_sha256": data_hash(new),
+                     "bytes": len(raw), "released": datetime.datetime.now().isoformat(timespec='seconds'),
+                     "history": [], "deltas": {}}
+        message = f"📦 {name}: release {digest} ({len(raw):,} bytes)"
+        if entry:
+            new_entry['history'] = [entry['current']] + entry['history']
+            new_entry['deltas'] = present_deltas(entry, release_dir)
+            prev_path = os.path.join(release_dir, entry['file'])
+            if os.path.exists(prev_path):
+                old = load_output(prev_path, unpack)
+                ops = diff_release(old, new)
+                check = apply_delta(json.loads(json.dumps(old)), ops)
+                if json.dumps(check, sort_keys=True) != json.dumps(new, sort_keys=True):
+                    raise ValueError(f"{name}: delta from {entry['current']} does not reproduce the new release")
+                delta_name = f"{name}.{entry['current']}-{digest}.delta.json"
+                delta = {"name": name, "from": entry['current'], "to": digest, "ops": ops}
+                write_text(os.path.join(release_dir, delta_name), json.dumps(delta, separators=(',', ':')))
+                new_entry['deltas'][entry['current']] = {"to": digest, "file": delta_name, "ops": len(ops)}
+                message += f", {len(ops)} change(s) since {entry['current']}"
+
+        prune(new_entry, name, release_dir)
+        manifest['outputs'][name] = new_entry
+        write_text(os.path.join(release_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    print(message + ".")
+    return new_entry
+
+def publish_shards(shard_dir, release_dir=RELEASE_DIR):
+    """
+    Publishes the core file and every state shard in `shard_dir` under
+    content-hashed names (<release_dir>/shards/<name>.<hash>.json) and
+    records them in the manifest's "shards" entry:
+      {"current", "released", "core": {"file", "sha256"}, "states": {code: {"file", "sha256"}}}
+    A shard whose bytes did not change keeps its URL, so returning browsers
+    only download the shards that changed. Files from the current and the
+    previous publish are kept; older ones are deleted. Unchanged shards
+    are a no-op only while every referenced file is on disk.
+    Returns the manifest entry.
+    """
+    files = {}
+    for fname in sorted(os.listdir(shard_dir)):
+        if not fname.endswith('.json'):
+            continue
+        with open(os.path.join(shard_dir, fname), 'rb') as f:
+            files[fname[:-len('.json')]] = f.read()
+    hashes = {name: hashlib.sha256(raw).hexdigest() for name, raw in files.items()}
+    digest = hashlib.sha256(''.join(f"{n}:{h}\n" for n, h in hashes.items()).encode()).hexdigest()[:HASH_LEN]
+    out_dir = os.path.join(release_dir, SHARD_RELEASE_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with build_lock(os.path.join(release_dir, MANIFEST_LOCK)):
+        manifest = load_manifest(release_dir)
+        prev = manifest.get('shards')
+        refs = [prev.get('core'), *prev['states'].values()] if prev else []
+        if (prev and prev['current'] == digest
+                and all(os.path.exists(os.path.join(release_dir, ref['file'])) for ref in refs if ref)):
+            print(f"📦 shards: release {digest} unchanged.")
+            return prev
+
+        refs = {}
+        for name, raw in files.items():
+            fname = f"{name}.{hashes[name][:HASH_LEN]}.json"
+            dest = os.path.join(out_dir, fname)
+            if not os.path.exists(dest):
+                copy_release(os.path.join(shard_dir, f"{name}.json"), raw, dest)
+            refs[name] = {"file": f"{SHARD_RELEASE_DIR}/{fname}", "sha256": hashes[name]}
+
+        core = refs.pop('core', None)
+        restored = prev and prev['current'] == digest  # Same shards, files were missing
+        released = prev['released'] if restored else datetime.datetime.now().isoformat(timespec='seconds')
+        entry = {"current": digest, "released": released,
+                 "core": core, "states": refs}
+        changed = sum(1 for name, ref in refs.items()
+                      if not prev or prev['states'].get(name, {}).get('sha256') != ref['sha256'])
+
+        keep = set()
+        for e in (entry, prev or {"states": {}}):
+            keep |= {ref['file'].split('/', 1)[1] for ref in [e.get('core'), *e['states'].values()] if ref}
+        for fname in os.listdir(out_dir):
+            base = fname
+            for suffix in COMPRESSED_SUFFIXES:
+                if base.endswith(suffix):
+                    base = base[:-len(suffix)]
+            if base not in keep:
+                os.remove(os.path.join(out_dir, fname))
+
+        manifest['shards'] = entry
+        write_text(os.path.join(release_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    print(f"📦 shards: release {digest} ({changed} of {len(refs)} state shards changed).")
+    return entry
+
+def delta_chain(entry, start):
+    """Delta files taking a client from release `start` to the current one, or None if it can't."""
+    files = []
+    seen = set()
+    while start != entry['current']:
+        step = entry['deltas'].get(start)
+        if step is None or start in seen:
+            return None
+        seen.add(start)
+        files.append(step['file'])
+        start = step['to']
+    return files
@@ -0,0 +1,122 @@
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- CONFIG ---
+REPORT_DIR = '.cache/reports'
+HISTORY_FILE = 'history.jsonl'
+
+# --- HELPERS ---
+
+def max_rss_bytes():
+    """
+    Peak resident set size of this process and of its (pool) children,
+    from getrusage. None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    # Linux reports KiB, macOS bytes
+    scale = 1 if os.uname().sysname == 'Darwin' else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    }
+
+def rate(rows, seconds):
+    """Rows per second, or None when too fast to measure."""
+    return round(rows / seconds, 1) if seconds > 0 else None
+
+# --- PUBLIC API ---
+
+def new_report(script, trace_memory=False):
+    """
+    Starts a run report. With trace_memory, tracemalloc runs for the whole
+    build and each stage records its own Python-allocation peak (this
+    slows parsing noticeably, so it is opt-in).
+    """
+    if trace_memory:
+        tracemalloc.start()
+    return {
+        "script": script,
+        "started": datetime.datetime.now().isoformat(timespec='seconds'),
+        "trace_memory": trace_memory,
+        "stages": {},
+        "sources": {},
+        "_t0": time.perf_counter()
+    }
+
+@contextlib.contextmanager
+def stage(report, name):
+    """Times a pipeline stage (and its tracemalloc peak) into report["stages"]."""
+    if report is None:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = {"seconds": round(time.perf_counter() - t0, 4)}
+        if tracing:
+            entry["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        report["stages"][name] = entry
+
+def add_source(report, key, timing):
+    """Records one source's read/parse metrics, deriving rows/sec."""
+    if report is None or timing is None:
+        return
+    row = dict(timing)
+    if row.get("read_seconds") is not None and row.get("rows_read") is not None:
+        row["rows_per_sec"] = rate(row["rows_read"], row["read_seconds"])
+    report["sources"][key] = row
+
+def finish_report(report, path=None):
+    """
+    Completes the report (total time, peak RSS, tracemalloc peak), writes it
+    as JSON to `path` (default .cache/reports/<script>.json), appends it
+    to the history file next to it and prints a one-line summary per stage.
+    Returns the path written.
+    """
+    report["seconds"] = round(time.perf_counter() - report.pop("_t0"), 4)
+    report["max_rss_bytes"] = max_rss_bytes()
+    if tracemalloc.is_tracing():
+        report["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    path = path or os.path.join(REPORT_DIR, f"{report['script']}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+    with open(os.path.join(os.path.dirname(path) or '.', HISTORY_FILE), 'a') as f:
+        f.write(json.dumps(report) + '\n')
+
+    print(f"\n⏱️ {report['script']} finished in {report['seconds']:.2f}s:")
+    for name, entry in report["stages"].items():
+        peak = entry.get("tracemalloc_peak_bytes")
+        extra = f", peak {peak / 1e6:.1f} MB traced" if peak is not None else ""
+        print(f"   {name}: {entry['seconds']:.3f}s{extra}")
+    print(f"   Run report: {path}")
+    return path
+
+def run_profiled(func, profile_path, **kwargs):
+    """Runs func(**kwargs) under cProfile and dumps pstats data to profile_path."""
+    os.makedirs(os.path.dirname(profile_path) or '.', exist_ok=True)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, **kwargs)
+    finally:
+        profiler.dump_stats(profile_path)
+        print(f"🔬 cProfile stats written to {profile_path} (view with: python -m pstats {profile_path})")
@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 
@@ -158,5 +159,62 @@ def run_wizard():
 
     print("\n✨ Wizard Complete. Run 'python scripts/ingest_data.py'")
 
+def run_auto_map(raw_dir='raw_data', jobs=4, accept_all=False, dry_run=False):
+    """
+    Proposes sources_map entries for every unmapped WISHLIST key by
+    sniffing the headers and a sample of each file in raw_dir (see
+    auto_map.py), then asks for a y/n per proposal.
+    accept_all: save every proposal without asking.
+    dry_run: only write the proposals file for review.
+    """
+    import auto_map
+
+    print("--- 🧙 DATA SOURCE WIZARD (auto-map) ---")
+    current_map = load_config()
+    profiles = auto_map.scan_raw_dir(raw_dir, jobs=jobs)
+    for profile in profiles:
+        if profile.get('error'):
+            print(f"⚠️ {profile['file']}: unreadable ({profile['error']})")
+        elif not profile['state_col']:
+            print(f"⚠️ {profile['file']}: no state column found")
+
+    proposals = auto_map.propose(profiles, WISHLIST, skip=set(current_map),
+                                 reference=auto_map.load_reference())
+    path = auto_map.write_proposals(proposals)
+    print(f"📝 {len(proposals)} proposal(s) written to {path}")
+    missing = [k for k in WISHLIST if k not in current_map and k not in proposals]
+    if missing:
+        print(f"❓ No match for: {', '.join(missing)} (map them with the interactive wizard)")
+    if dry_run or not proposals:
+        return
+
+    accepted = 0
+    for key, proposal in proposals.items():
+        entry = proposal['entry']
+        print(f"\n{key.upper()}: {entry['file']} -> '{entry['value_col']}'")
+        print(f"   state: '{entry['state_col']}'  filter: {entry['filter']}  frequency: {entry['frequency']}  year: {entry['year']}")
+        print(f"   why: {proposal['why']}")
+        choice = 'y' if accept_all else input("Accept? (y/n/q): ").lower().strip()
+        if choice == 'q':
+            break
+        if choice == 'y':
+            current_map[key] = entry
+            accepted += 1
+
+    if accepted:
+        save_config(current_map)
+    print(f"\n✨ {accepted} source(s) mapped. Check 'source' names, then run 'python scripts/ingest_data.py'")
+
 if __name__ == "__main__":
-    run_wizard()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Maps raw_data/ files to WISHLIST keys in " + CONFIG_PATH + ".")
+    parser.add_argument('--auto', action='store_true',
+                        help="Propose mappings by sniffing every file's headers and first rows, then confirm each.")
+    parser.add_argument('--raw-dir', default='raw_data', help="Directory to scan with --auto (default: raw_data).")
+    parser.add_argument('--jobs', type=int, default=4, help="Files read at once with --auto (default: 4).")
+    parser.add_argument('--yes', action='store_true', help="With --auto, accept every proposal.")
+    parser.add_argument('--dry-run', action='store_true', help="With --auto, only write the proposals file.")
+    args = parser.parse_args()
+    if args.auto:
+        run_auto_map(args.raw_dir, jobs=args.jobs, accept_all=args.yes, dry_run=args.dry_run)
+    else:
+        run_wizard()
\ No newline at end of file
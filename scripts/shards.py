@@ -0,0 +1,88 @@
+import os
+
+from output_formats import (write_output, load_output, print_size_report, pack_jurisdiction,
+                            unpack_geo, unpack_tax, COMPACT_FORMAT, COMPACT_VERSION,
+                            COMPRESSED_SUFFIXES)
+
+# --- CONFIG ---
+GEO_FILE = 'data/geo_stats.json'
+TAX_FILE = 'data/tax_tables.json'
+SHARD_DIR = 'data/shards'
+CORE_FILE = 'core.json'
+
+# --- BUILD ---
+
+def build_shards(geo, tax):
+    """
+    Splits the two build outputs into what every session needs (core) and
+    what only one state needs (one shard per state).
+    core:  {"metadata", "national", "federal", "states": {code: name}}
+    shard: {"geo": state stats or None, "tax": state tax block or None}
+    """
+    geo_states = geo.get('states', {})
+    tax_states = tax.get('states', {})
+    codes = list(geo_states) + [c for c in tax_states if c not in geo_states]
+
+    core = {
+        "metadata": geo.get('metadata', {}),
+        "national": geo.get('national', {}),
+        "federal": tax['federal'],
+        "states": {c: geo_states.get(c, {}).get('name', c) for c in codes}
+    }
+    shards = {c: {"geo": geo_states.get(c), "tax": tax_states.get(c)} for c in codes}
+    return core, shards
+
+def pack_core(core):
+    """Compact layout for the core file (federal brackets as parallel arrays)."""
+    return dict(core, format=COMPACT_FORMAT, version=COMPACT_VERSION,
+                federal=pack_jurisdiction(core['federal']))
+
+def pack_shard(shard):
+    """Compact layout for a state shard."""
+    tax = pack_jurisdiction(shard['tax']) if shard['tax'] is not None else None
+    return dict(shard, format=COMPACT_FORMAT, version=COMPACT_VERSION, tax=tax)
+
+def remove_stale_shards(shard_dir, keep):
+    """Deletes shard files (and compressed siblings) for states no longer built."""
+    removed = 0
+    for name in os.listdir(shard_dir):
+        base = name
+        for suffix in COMPRESSED_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base.endswith('.json') and base not in keep:
+            os.remove(os.path.join(shard_dir, name))
+            removed += 1
+    return removed
+
+# --- PUBLIC API ---
+
+def write_shards(geo_path=GEO_FILE, tax_path=TAX_FILE, shard_dir=SHARD_DIR, compact=False):
+    """
+    Rebuilds the core file and every state shard from the current
+    geo_stats.json and tax_tables.json (either layout). Both ingest scripts
+    call this after saving, so shards always reflect the latest of each.
+    Returns the size-report rows, or None if an input is missing.
+    """
+    missing = [p for p in (geo_path, tax_path) if not os.path.exists(p)]
+    if missing:
+        print(f"⚠️ Skipping state shards: {', '.join(missing)} not built yet.")
+        return None
+
+    core, shards = build_shards(load_output(geo_path, unpack_geo), load_output(tax_path, unpack_tax))
+    os.makedirs(shard_dir, exist_ok=True)
+
+    core_row = write_output(core, os.path.join(shard_dir, CORE_FILE), pack_core, compact=compact)
+    shard_rows = [write_output(shard, os.path.join(shard_dir, f"{code}.json"), pack_shard, compact=compact)
+                  for code, shard in shards.items()]
+    remove_stale_shards(shard_dir, {CORE_FILE} | {f"{code}.json" for code in shards})
+    print(f"🧩 Wrote {shard_dir}/{CORE_FILE} and {len(shards)} state shards.")
+
+    if compact:
+        total = {"file": f"{shard_dir}/<state>.json x{len(shard_rows)}"}
+        for row in shard_rows:
+            for k, v in row.items():
+                if k != 'file':
+                    total[k] = total.get(k, 0) + v
+        print_size_report([core_row, total])
+    return [core_row] + shard_rows
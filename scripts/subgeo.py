@@ -0,0 +1,258 @@
+import bisect
+import os
+
+from readers import lazy_import
+from output_formats import write_output, load_output, COMPACT_FORMAT, COMPACT_VERSION
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- CONFIG ---
+REGION_DIR = 'data/regions'
+INDEX_FILE = 'index.json'
+CROSSWALK_FILE = 'config/zip_county.csv'
+
+# Sub-state levels a source_map entry can declare with "geo_level"
+LEVELS = ('county', 'zip')
+
+# State FIPS prefix (first 2 digits of a county FIPS) -> USPS code
+STATE_FIPS = {
+    '01': 'AL', '02': 'AK', '04': 'AZ', '05': 'AR', '06': 'CA', '08': 'CO', '09': 'CT',
+    '10': 'DE', '11': 'DC', '12': 'FL', '13': 'GA', '15': 'HI', '16': 'ID', '17': 'IL',
+    '18': 'IN', '19': 'IA', '20': 'KS', '21': 'KY', '22': 'LA', '23': 'ME', '24': 'MD',
+    '25': 'MA', '26': 'MI', '27': 'MN', '28': 'MS', '29': 'MO', '30': 'MT', '31': 'NE',
+    '32': 'NV', '33': 'NH', '34': 'NJ', '35': 'NM', '36': 'NY', '37': 'NC', '38': 'ND',
+    '39': 'OH', '40': 'OK', '41': 'OR', '42': 'PA', '44': 'RI', '45': 'SC', '46': 'SD',
+    '47': 'TN', '48': 'TX', '49': 'UT', '50': 'VT', '51': 'VA', '53': 'WA', '54': 'WV',
+    '55': 'WI', '56': 'WY'
+}
+
+# USPS 3-digit ZIP prefix ranges (inclusive) -> state, sorted by start.
+# Used for ZIP -> state when a ZIP is not in the county crosswalk.
+ZIP3_RANGES = [
+    (5, 5, 'NY'), (10, 27, 'MA'), (28, 29, 'RI'), (30, 38, 'NH'), (39, 49, 'ME'),
+    (50, 54, 'VT'), (55, 55, 'MA'), (56, 59, 'VT'), (60, 69, 'CT'), (70, 89, 'NJ'),
+    (100, 149, 'NY'), (150, 196, 'PA'), (197, 199, 'DE'), (200, 200, 'DC'), (201, 201, 'VA'),
+    (202, 205, 'DC'), (206, 219, 'MD'), (220, 246, 'VA'), (247, 268, 'WV'), (270, 289, 'NC'),
+    (290, 299, 'SC'), (300, 319, 'GA'), (320, 339, 'FL'), (341, 349, 'FL'), (350, 369, 'AL'),
+    (370, 385, 'TN'), (386, 397, 'MS'), (398, 399, 'GA'), (400, 427, 'KY'), (430, 459, 'OH'),
+    (460, 479, 'IN'), (480, 499, 'MI'), (500, 528, 'IA'), (530, 549, 'WI'), (550, 567, 'MN'),
+    (569, 569, 'DC'), (570, 577, 'SD'), (580, 588, 'ND'), (590, 599, 'MT'), (600, 629, 'IL'),
+    (630, 658, 'MO'), (660, 679, 'KS'), (680, 693, 'NE'), (700, 714, 'LA'), (716, 729, 'AR'),
+    (730, 732, 'OK'), (733, 733, 'TX'), (734, 749, 'OK'), (750, 799, 'TX'), (800, 816, 'CO'),
+    (820, 831, 'WY'), (832, 838, 'ID'), (840, 847, 'UT'), (850, 865, 'AZ'), (870, 884, 'NM'),
+    (885, 885, 'TX'), (889, 898, 'NV'), (900, 961, 'CA'), (967, 968, 'HI'), (970, 979, 'OR'),
+    (980, 994, 'WA'), (995, 999, 'AK')
+]
+
+# --- CODE NORMALIZATION ---
+
+def digits_code(value, width):
+    """
+    Zero-padded digit string for a code cell ('6037', 6037, 6037.0 -> '06037'),
+    or None if it has anything but digits or is too long.
+    """
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        text = str(int(value))
+    elif isinstance(value, (float, np.floating)):
+        if not np.isfinite(value) or value != int(value):
+            return None
+        text = str(int(value))
+    elif isinstance(value, str):
+        text = value.strip()
+    else:
+        return None
+    if not text.isdigit() or len(text) > width:
+        return None
+    return text.zfill(width)
+
+def normalize_fips(value):
+    """5-digit county FIPS with a known state prefix, or None."""
+    code = digits_code(value, 5)
+    return code if code and code[:2] in STATE_FIPS else None
+
+def normalize_zip(value):
+    """5-digit ZIP (ZIP+4 is truncated), or None."""
+    if isinstance(value, str) and '-' in value:
+        value = value.split('-')[0]
+    return digits_code(value, 5)
+
+def normalize_region_column(series, level):
+    """
+    Vectorized normalize_fips / normalize_zip over a column: each distinct
+    cell is resolved once. Returns an object ndarray of codes or None.
+    """
+    resolve = normalize_fips if level == 'county' else normalize_zip
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    resolved = np.array([resolve(u) for u in uniques.tolist()] + [None], dtype=object)
+    return resolved[codes]
+
+# --- TABLES ---
+
+def build_region_tables(region_results):
+    """
+    Assembles per-key results into one array-backed table per level:
+    {"level", "codes": sorted codes, "metrics": [...],
+     "values": {metric: [float or None per code]}, "sources": {metric: metadata}}.
+    region_results: {key: {"level", "metric", "codes", "values", "metadata"}}
+    in source_map order;
+    a later key for the same (level, metric) overrides earlier codes.
+    """
+    by_level = {}
+    for key, res in region_results.items():
+        level = by_level.setdefault(res["level"], {})
+        level.setdefault(res["metric"], []).append((key, res))
+
+    tables = {}
+    for level, metrics in by_level.items():
+        codes = np.unique(np.concatenate(
+            [np.asarray(r["codes"], dtype=str) for parts in metrics.values() for _, r in parts]))
+        values, sources = {}, {}
+        for metric, parts in metrics.items():
+            column = np.full(len(codes), np.nan)
+            for key, res in parts:
+                if len(res["codes"]):
+                    column[np.searchsorted(codes, np.asarray(res["codes"], dtype=str))] = res["values"]
+                if res.get("metadata"):
+                    sources[metric] = res["metadata"]
+            values[metric] = [None if np.isnan(v) else v for v in column.tolist()]
+        tables[level] = {
+            "level": level,
+            "codes": codes.tolist(),
+            "metrics": list(metrics),
+            "values": values,
+            "sources": sources
+        }
+    return tables
+
+def load_crosswalk(path=CROSSWALK_FILE):
+    """
+    Reads a HUD-style ZIP -> county crosswalk (ZIP, COUNTY[, RES_RATIO]).
+    A ZIP spanning several counties maps to the one with the largest
+    residential share (or the first listed). Returns (zips, counties) as
+    sorted parallel lists, or empty lists if the file is missing.
+    """
+    if not path or not os.path.exists(path):
+        return [], []
+    df = pd.read_csv(path, dtype=str)
+    df.columns = [c.strip().upper() for c in df.columns]
+    zips = normalize_region_column(df['ZIP'], 'zip')
+    counties = normalize_region_column(df['COUNTY'], 'county')
+    ratio = np.zeros(len(df))
+    if 'RES_RATIO' in df.columns:
+        ratio = pd.to_numeric(df['RES_RATIO'], errors='coerce').fillna(0).to_numpy()
+
+    ok = pd.notna(zips) & pd.notna(counties)
+    pairs = pd.DataFrame({"zip": zips[ok], "county": counties[ok], "ratio": ratio[ok]})
+    pairs = pairs.sort_values(['zip', 'ratio'], ascending=[True, False], kind='stable')
+    pairs = pairs.drop_duplicates('zip', keep='first')
+    return pairs['zip'].tolist(), pairs['county'].tolist()
+
+def build_region_index(crosswalk_path=CROSSWALK_FILE):
+    """
+    Lookup index for the ZIP -> county -> state fallback:
+    zip_county: sorted ZIPs with their county (binary search),
+    zip3: sorted ZIP-prefix ranges with their state (binary search on starts),
+    state_fips: county prefix -> state.
+    """
+    zips, counties = load_crosswalk(crosswalk_path)
+    return {
+        "zip_county": {"zips": zips, "counties": counties},
+        "zip3": {
+            "starts": [r[0] for r in ZIP3_RANGES],
+            "ends": [r[1] for r in ZIP3_RANGES],
+            "states": [r[2] for r in ZIP3_RANGES]
+        },
+        "state_fips": STATE_FIPS
+    }
+
+# --- LOOKUP ---
+
+def find_code(codes, code):
+    """Position of code in a sorted code list, or -1. O(log n)."""
+    i = bisect.bisect_left(codes, code)
+    return i if i < len(codes) and codes[i] == code else -1
+
+def zip_to_county(index, zip_code):
+    """County FIPS for a ZIP from the crosswalk, or None."""
+    xw = index["zip_county"]
+    i = find_code(xw["zips"], zip_code)
+    return xw["counties"][i] if i >= 0 else None
+
+def county_to_state(index, county):
+    """State code from a county FIPS prefix, or None."""
+    return index["state_fips"].get(county[:2])
+
+def zip_to_state(index, zip_code):
+    """State code from the ZIP prefix ranges, or None."""
+    ranges = index["zip3"]
+    prefix = int(zip_code[:3])
+    i = bisect.bisect_right(ranges["starts"], prefix) - 1
+    return ranges["states"][i] if i >= 0 and prefix <= ranges["ends"][i] else None
+
+def table_value(table, metric, code):
+    """Value of metric for code in a region table, or None."""
+    if table is None or metric not in table["values"]:
+        return None
+    i = find_code(table["codes"], code)
+    return table["values"][metric][i] if i >= 0 else None
+
+def lookup_metric(tables, index, geo_data, metric, zip_code=None, county=None, state=None):
+    """
+    Most specific available value for metric: ZIP, then its county, then
+    its state, then national. Missing levels are derived from the index
+    (ZIP -> county via the crosswalk, county/ZIP -> state via prefixes).
+    Returns (value, scope) with scope like 'zip:02139', 'county:25017',
+    'state:MA' or 'national'; (None, None) if nothing has the metric.
+    """
+    zip_code = normalize_zip(zip_code) if zip_code is not None else None
+    county = normalize_fips(county) if county is not None else None
+
+    if zip_code:
+        val = table_value(tables.get('zip'), metric, zip_code)
+        if val is not None:
+            return val, f"zip:{zip_code}"
+        county = county or zip_to_county(index, zip_code)
+    if county:
+        val = table_value(tables.get('county'), metric, county)
+        if val is not None:
+            return val, f"county:{county}"
+        state = state or county_to_state(index, county)
+    if zip_code and not state:
+        state = zip_to_state(index, zip_code)
+    if state:
+        val = geo_data.get('states', {}).get(state, {}).get(metric)
+        if val is not None:
+            return val, f"state:{state}"
+    val = geo_data.get('national', {}).get(metric)
+    return (val, 'national') if val is not None else (None, None)
+
+# --- READ / WRITE ---
+
+def pack_region(table):
+    """Region tables are already columnar; compact output only adds the marker."""
+    return dict(table, format=COMPACT_FORMAT, version=COMPACT_VERSION)
+
+def unpack_region(packed):
+    return {k: v for k, v in packed.items() if k not in ('format', 'version')}
+
+def write_regions(tables, index, region_dir=REGION_DIR, compact=False):
+    """Writes <level>.json per table plus index.json. Returns size-report rows."""
+    os.makedirs(region_dir, exist_ok=True)
+    rows = [write_output(index, os.path.join(region_dir, INDEX_FILE), pack_region, compact=compact)]
+    for level, table in tables.items():
+        rows.append(write_output(table, os.path.join(region_dir, f"{level}.json"), pack_region, compact=compact))
+    counts = ', '.join(f"{len(t['codes']):,} {level}" for level, t in tables.items())
+    print(f"🗺️ Wrote {counts or 'no'} regions to {region_dir}.")
+    return rows
+
+def load_regions(region_dir=REGION_DIR):
+    """Loads (tables, index) written by write_regions; empty if not built."""
+    tables, index = {}, None
+    for level in LEVELS:
+        path = os.path.join(region_dir, f"{level}.json")
+        if os.path.exists(path):
+            tables[level] = load_output(path, unpack_region)
+    index_path = os.path.join(region_dir, INDEX_FILE)
+    index = load_output(index_path, unpack_region) if os.path.exists(index_path) else build_region_index(None)
+    return tables, index
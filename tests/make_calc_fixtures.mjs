@@ -0,0 +1,97 @@
+// Regenerates tests/fixtures/calc_scenarios.json from the JS engine.
+// Run from the repo root after data/ changes:  node tests/make_calc_fixtures.mjs
+import { readFileSync, writeFileSync } from 'fs';
+import { calculateBudget, createCalculator } from '../js/calc.js';
+import { expandTaxData, expandGeoData } from '../js/data.js';
+
+const taxData = expandTaxData(JSON.parse(readFileSync('./data/tax_tables.json', 'utf8')));
+const geoData = expandGeoData(JSON.parse(readFileSync('./data/geo_stats.json', 'utf8')));
+
+// Scenarios 1-2 are the ones in tests/test_logic.html; the rest cover edges.
+const scenarios = [
+    { name: "Scenario 1: Single Texan ($75k/yr)", user: {
+        income: 75000, income_frequency: 'annual', filing_status: 'single', state: 'TX',
+        housing_cost: 1400, medical_premium: 150, medical_oop_max: 5000,
+        bills: [
+            { name: "Car Ins", amount: 600, frequency: "biannual" },
+            { name: "Netflix", amount: 15.99, frequency: "monthly" }
+        ]
+    }},
+    { name: "Scenario 2: CA High Earner (Bi-Weekly)", user: {
+        income: 4000, income_frequency: 'biweekly', filing_status: 'single', state: 'CA',
+        housing_cost: 2800, medical_premium: 200, medical_oop_max: 3000,
+        bills: []
+    }},
+    { name: "Married New Yorker (Weekly)", user: {
+        income: 3100, income_frequency: 'weekly', filing_status: 'married', state: 'NY',
+        housing_cost: 3200, medical_premium: 640, medical_oop_max: 9000,
+        bills: [
+            { name: "Electricity", amount: 140, frequency: "monthly" },
+            { name: "Car Payment", amount: 1350, frequency: "quarterly" },
+            { name: "Gym", amount: 0, frequency: "monthly" }
+        ]
+    }},
+    { name: "National, no income", user: {
+        income: 0, income_frequency: 'annual', filing_status: 'single', state: 'US',
+        housing_cost: 900, medical_premium: 0, medical_oop_max: 0,
+        bills: [{ name: "Phone", amount: 60, frequency: "monthly" }]
+    }},
+    { name: "Lowercase state, semi-monthly, above top federal cap", user: {
+        income: 50000000, income_frequency: 'semimonthly', filing_status: 'married', state: 'ca',
+        housing_cost: 25000, medical_premium: 1200, medical_oop_max: 18000,
+        bills: [{ name: "Security", amount: 5200, frequency: "annual" }]
+    }},
+    { name: "Unknown frequency falls back to monthly", user: {
+        income: 5200, income_frequency: 'fortnightly', filing_status: 'head', state: 'OR',
+        housing_cost: 1500, medical_premium: 300, medical_oop_max: 2400,
+        bills: [{ name: "Internet", amount: 75, frequency: "sometimes" }]
+    }}
+];
+
+const out = scenarios.map(({ name, user }) => {
+    const res = calculateBudget(user, taxData, geoData);
+    return {
+        name,
+        user,
+        expected: {
+            gross_monthly: res.income.gross_monthly,
+            net_monthly: res.income.net_monthly,
+            tax_monthly: res.taxes.monthly_total,
+            total_fixed: res.spending.total_fixed,
+            discretionary: res.spending.discretionary
+        }
+    };
+});
+
+// The dashboard's memoized calculator must agree with calculateBudget,
+// on a cold memo and on a warm one
+const calculator = createCalculator(taxData, geoData);
+for (const pass of [1, 2]) {
+    scenarios.forEach(({ name, user }) => {
+        const { bill_status, ...res } = calculator.calculate(user);
+        if (JSON.stringify(res) !== JSON.stringify(calculateBudget(user, taxData, geoData))) {
+            throw new Error(`createCalculator disagrees with calculateBudget on "${name}" (pass ${pass})`);
+        }
+    });
+}
+
+// bill_status keeps the original row rule: the amount as entered, not its
+// monthly equivalent, against the state average (TX: car_insurance 116,
+// electricity 122, internet 128). Monthly equivalents would flip bills 1 and 3.
+const rowUser = {
+    income: 60000, income_frequency: 'annual', filing_status: 'single', state: 'TX',
+    housing_cost: 1300, medical_premium: 0, medical_oop_max: 0,
+    bills: [
+        { id: 1, name: "Car Insurance", amount: 600, frequency: "biannual" },
+        { id: 2, name: "Power", key: 'electricity', amount: 100, frequency: "monthly" },
+        { id: 3, name: "Internet", amount: 1200, frequency: "annual" },
+        { id: 4, name: "Gym", amount: 5, frequency: "monthly" }
+    ]
+};
+const rowStatus = calculator.calculate(rowUser).bill_status;
+if (JSON.stringify(rowStatus) !== JSON.stringify({ 1: 'warn', 2: 'good', 3: 'warn', 4: null })) {
+    throw new Error(`bill_status no longer matches the row rule: ${JSON.stringify(rowStatus)}`);
+}
+
+writeFileSync('./tests/fixtures/calc_scenarios.json', JSON.stringify(out, null, 2) + '\n');
+console.log(`Wrote ${out.length} scenarios to tests/fixtures/calc_scenarios.json`);
@@ -0,0 +1,55 @@
+"""
+Checks the precomputed affordability matrix against direct
+budget_engine runs, and the interpolated state ranking.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import budget_engine  # noqa: E402
+import build_affordability  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return budget_engine.load_engine(os.path.join(ROOT, budget_engine.TAX_FILE),
+                                     os.path.join(ROOT, budget_engine.GEO_FILE))
+
+
+@pytest.fixture(scope='module')
+def matrix(engine):
+    return build_affordability.build_matrix(engine, incomes=[30_000, 60_000, 120_000])
+
+
+def test_cells_match_single_budgets(engine, matrix):
+    geo = engine['geo']
+    for h, housing_type in enumerate(matrix['housing_types']):
+        for f, status in enumerate(matrix['filing_statuses']):
+            for code in ['CA', 'TX', 'US']:
+                s = matrix['codes'].index(code)
+                stats = geo['national'] if code == 'US' else geo['states'][code]
+                bills = [[stats.get(k) or geo['national'].get(k) or 0 for k in matrix['basket']]]
+                housing = stats[build_affordability.HOUSING_KEYS[housing_type]]
+                for i, income in enumerate(matrix['incomes']):
+                    res = budget_engine.calculate_budget(engine, income, state=code, filing_status=status,
+                                                         housing_cost=housing, bill_amounts=bills)
+                    assert matrix['discretionary'][h][f][s][i] == round(res['spending']['discretionary'][0], 2)
+                    assert matrix['tax_monthly'][f][s][i] == round(res['taxes']['monthly_total'][0], 2)
+                assert matrix['fixed_costs'][s] == round(sum(bills[0]), 2)
+
+
+def test_rank_states_interpolates(matrix):
+    ranked = build_affordability.rank_states(matrix, 45_000, 'married', 'own')
+    assert len(ranked) == len(matrix['codes']) - 1
+    assert [r[1] for r in ranked] == sorted((r[1] for r in ranked), reverse=True)
+
+    code, value = ranked[0]
+    row = matrix['discretionary'][1][1][matrix['codes'].index(code)]
+    assert value == pytest.approx((row[0] + row[1]) / 2)
+    assert np.isclose(build_affordability.rank_states(matrix, 1e9)[0][1],
+                      max(r[-1] for c, r in zip(matrix['codes'], matrix['discretionary'][0][0]) if c != 'US'))
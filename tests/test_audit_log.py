@@ -0,0 +1,68 @@
+"""
+The JSONL audit log's sidecar index: appends are folded in, in-place
+edits force a rebuild, and rehydration takes the newest entry per missing value.
+"""
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import audit_log  # noqa: E402
+import ingest_data  # noqa: E402
+
+SOURCE_MAP = {"rent": {"frequency": "a", "state_col": "S", "value_col": "V"}}
+
+
+def write_log(path, entries):
+    with open(path, 'w') as f:
+        f.write(''.join(json.dumps(e) + '\n' for e in entries))
+
+
+def latest(index):
+    return {(scope, key): entry["value"] for scope, key, entry in audit_log.iter_latest(index)}
+
+
+def test_index_tracks_appends_and_edits():
+    with tempfile.TemporaryDirectory() as tmp:
+        log, index_path = os.path.join(tmp, "log.jsonl"), os.path.join(tmp, "index.json")
+        write_log(log, [{"scope": "TX", "key": "rent", "value": 1200}])
+        index = audit_log.load_audit_index(log, index_path)
+        assert latest(index)[("TX", "rent")] == 1200
+
+        audit_log.append_entries([{"scope": "TX", "key": "rent", "value": 1300}], index, log, index_path)
+        index = audit_log.load_audit_index(log, index_path)
+        assert latest(index)[("TX", "rent")] == 1300
+
+        # Same size, different bytes: the stale sidecar must not be trusted
+        with open(log, 'r') as f:
+            text = f.read()
+        with open(log, 'w') as f:
+            f.write(text.replace("1300", "1400"))
+        index = audit_log.load_audit_index(log, index_path)
+        assert latest(index)[("TX", "rent")] == 1400
+        assert ("CA", "rent") not in latest(index)
+
+
+def test_rehydration_is_newest_wins_per_missing_value():
+    with tempfile.TemporaryDirectory() as tmp:
+        log, index_path = os.path.join(tmp, "log.jsonl"), os.path.join(tmp, "index.json")
+        write_log(log, [
+            {"scope": "TX", "key": "rent", "value": 1200},
+            {"scope": "TX", "key": "rent", "value": 2400},
+            {"scope": "National", "key": "rent", "value": 12},
+            {"scope": "CA", "key": "rent", "value": 600},
+            {"scope": "TX", "key": "dropped", "value": 5},
+            {"scope": "ZZ", "key": "rent", "value": 7},
+        ])
+        states = {code: {"name": name} for code, name in ingest_data.US_STATES.items()}
+        states["CA"]["rent"] = 99.0
+        data = {"metadata": {}, "national": {}, "states": states}
+        ingest_data.apply_historical_audits(data, audit_log.load_audit_index(log, index_path), SOURCE_MAP)
+
+        # Keys missing from the source map are still restored, as monthly values
+        assert data["states"]["TX"] == {"name": "Texas", "rent": 200.0, "dropped": 5.0}
+        assert data["national"] == {"rent": 1.0}
+        assert data["states"]["CA"]["rent"] == 99.0  # Ingested values are never overwritten
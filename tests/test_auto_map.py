@@ -0,0 +1,83 @@
+"""
+Checks the setup_wizard auto-mapper: on a 1x synthetic workspace it must
+rediscover the repo's own sources_map from headers and samples alone.
+"""
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import auto_map  # noqa: E402
+from generate_data import build_workspace  # noqa: E402
+from geo_resolver import load_resolver  # noqa: E402
+from setup_wizard import WISHLIST  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def profiles(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('workspace'))
+    build_workspace(root, 1)
+    return auto_map.scan_raw_dir(os.path.join(root, 'raw_data'), jobs=2,
+                                 resolver=load_resolver(os.path.join(ROOT, 'config', 'states.json')))
+
+
+def test_proposals_match_the_hand_made_map(profiles):
+    with open(os.path.join(ROOT, 'config', 'sources_map.json')) as f:
+        expected = json.load(f)
+    proposals = auto_map.propose(profiles, WISHLIST)
+    assert set(proposals) == set(expected)
+    for key, config in expected.items():
+        entry = proposals[key]['entry']
+        for field in ('file', 'file_type', 'state_col', 'value_col', 'filter'):
+            assert entry[field] == config[field], (key, field)
+
+
+def test_mapped_keys_are_skipped(profiles):
+    proposals = auto_map.propose(profiles, WISHLIST, skip={'housing_rent', 'electricity'})
+    assert 'housing_rent' not in proposals and 'electricity' not in proposals
+    assert proposals['water']['entry']['value_col'] == 'Water and Sewer'
+
+
+def test_frequency_from_header_or_reference():
+    assert auto_map.guess_frequency('Annual premium', 9000, None)[0] == 'a'
+    assert auto_map.guess_frequency('Rent', 14400, 1200)[0] == 'a'
+    assert auto_map.guess_frequency('Rent', 1250, 1200)[0] == 'm'
+    assert auto_map.guess_frequency('Rent', 1250, None)[0] == 'm'
+
+
+def test_scan_file_finds_state_year_and_values(tmp_path):
+    path = tmp_path / 'childcare_2023.csv'
+    pd.DataFrame({
+        'Region': ['Calif.', 'Texas', 'N.Y.', 'United States'] * 2,
+        'Note': ['x'] * 8,
+        'Study year': [2022] * 4 + [2023] * 4,
+        'Infant center-based childcare price': ['$1,200'] * 8
+    }).to_csv(path, index=False)
+    profile = auto_map.scan_file(str(path), load_resolver(os.path.join(ROOT, 'config', 'states.json')))
+    assert profile['state_col'] == 'Region'
+    assert profile['year_col'] == 'Study year' and profile['year'] == '2023'
+    assert profile['value_cols'] == {'Infant center-based childcare price': 1200.0}
+    proposals = auto_map.propose([profile], WISHLIST)
+    assert list(proposals) == ['childcare']
+    assert proposals['childcare']['entry']['filter'] == {"col": 'Study year', "val": '2023'}
+
+
+def test_scan_reads_only_the_sample(tmp_path):
+    # A row past the sample that would break a full parse must not matter
+    path = tmp_path / 'rent_2021.csv'
+    rows = ''.join(f'Texas,{2000 + i % 20},{1000 + i}\n' for i in range(auto_map.SAMPLE_ROWS))
+    path.write_text('State,Year,Rent\n' + rows + 'Texas,2030,1,extra,cells\n')
+    profile = auto_map.scan_file(str(path), load_resolver(os.path.join(ROOT, 'config', 'states.json')))
+    assert 'error' not in profile
+    assert profile['year_col'] == 'Year' and profile['year'] == '2019'
+
+
+def test_stopwords_keep_meaningful_words():
+    assert {'sales', 'tax'} <= auto_map.tokens('Sales tax rate')
+    assert {'infant', 'care'} <= auto_map.tokens('Infant care, center-based')
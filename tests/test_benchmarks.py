@@ -0,0 +1,30 @@
+"""
+Smoke run of the benchmark suite at 1x: the synthetic sources ingest
+end to end without prompting, and the regression check flags slowdowns.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import run_benchmarks  # noqa: E402
+
+
+def test_suite_runs_headless_at_1x():
+    suite = run_benchmarks.run_suite(scales=[1], repeat=1)
+    results = suite["results"]["1"]
+    assert list(results) == list(run_benchmarks.SCENARIOS)
+    for name, res in results.items():
+        assert res["seconds"] > 0 and res["rows"] > 0, name
+    # 1x sources are small, so the default reader keeps them off pandas
+    assert "process_rows" in results["ingest_data"]["functions"]
+    assert "parse_tax_sheet" in results["ingest_tax"]["functions"]
+    assert results["ingest_data"]["functions"]["write_shards"] > 0
+
+
+def test_compare_flags_only_real_slowdowns():
+    base = {"1": {"ingest_tax": {"seconds": 1.0, "functions": {"read_sheet": 0.5, "parse_tax_sheet": 0.01}}}}
+    now = {"1": {"ingest_tax": {"seconds": 1.1, "functions": {"read_sheet": 1.0, "parse_tax_sheet": 0.03}}}}
+    regressions = run_benchmarks.compare(now, base)
+    assert len(regressions) == 1 and "read_sheet" in regressions[0]
@@ -0,0 +1,104 @@
+"""
+Checks the local budget API: its scalar engine against the js/calc.js
+fixtures, a round trip over HTTP, and table reloads on file change.
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import budget_api  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures', 'calc_scenarios.json')
+
+
+def load_tables(**kwargs):
+    return budget_api.Tables(os.path.join(ROOT, budget_api.TAX_FILE),
+                             os.path.join(ROOT, budget_api.GEO_FILE), **kwargs)
+
+
+def test_budget_matches_calc_js():
+    tables = load_tables()
+    with open(FIXTURES, 'r') as f:
+        scenarios = json.load(f)
+    for sc in scenarios:
+        res = budget_api.budget_result(tables, sc['user'])
+        got = {
+            'gross_monthly': res['income']['gross_monthly'],
+            'net_monthly': res['income']['net_monthly'],
+            'tax_monthly': res['taxes']['monthly_total'],
+            'total_fixed': res['spending']['total_fixed'],
+            'discretionary': res['spending']['discretionary']
+        }
+        assert got == sc['expected'], sc['name']
+    # A second pass is served from the LRU cache
+    for sc in scenarios:
+        budget_api.budget_result(tables, sc['user'])
+    assert tables.tax.cache_info().hits == len(scenarios)
+
+
+async def request(port, method, target, payload=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+                 "Connection: close\r\n\r\n".encode() + body)
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_http_round_trip():
+    async def run():
+        tables = load_tables()
+        server = await budget_api.start_server(tables, port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, single = await request(port, 'GET', '/tax?income=75000&state=tx')
+            assert status == 200
+            assert single == budget_api.tax_result(tables, {"income": 75000, "state": "TX"})
+
+            batch = [{"income": 50000 + i * 1000, "state": "CA", "filing_status": "married"} for i in range(20)]
+            status, out = await request(port, 'POST', '/budget', batch)
+            assert status == 200 and len(out['results']) == 20
+
+            assert (await request(port, 'POST', '/tax', [{"state": "CA"}]))[0] == 400
+            # Non-string keys would be unhashable in the tax cache / lookups: 400, not 500
+            for bad in ({"filing_status": ["married"]}, {"state": {"code": "CA"}},
+                        {"bills": [{"amount": 5, "frequency": ["weekly"]}]}):
+                status, out = await request(port, 'POST', '/budget', {"income": 50000, **bad})
+                assert status == 400 and 'must be a string' in out['error']
+            assert (await request(port, 'GET', '/nope'))[0] == 404
+            status, health = await request(port, 'GET', '/health')
+            assert health['version'] == 1 and health['tax_cache']['misses'] > 0
+        finally:
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+
+def test_reload_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        tax_path = os.path.join(tmp, 'tax_tables.json')
+        geo_path = os.path.join(tmp, 'geo_stats.json')
+        shutil.copy(os.path.join(ROOT, budget_api.TAX_FILE), tax_path)
+        shutil.copy(os.path.join(ROOT, budget_api.GEO_FILE), geo_path)
+        tables = budget_api.Tables(tax_path, geo_path, reload_interval=0)
+        before = budget_api.tax_result(tables, {"income": 80000})
+
+        assert not tables.refresh()
+        with open(tax_path, 'r') as f:
+            data = json.load(f)
+        data['federal']['fica_rate'] = 0.1
+        with open(tax_path, 'w') as f:
+            json.dump(data, f)
+        os.utime(tax_path, ns=(0, 1))
+
+        assert tables.refresh() and tables.version == 2
+        after = budget_api.tax_result(tables, {"income": 80000})
+        assert after['fica_annual'] == 8000 != before['fica_annual']
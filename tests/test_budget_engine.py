@@ -0,0 +1,121 @@
+"""
+Parity tests: scripts/budget_engine.py vs js/calc.js.
+
+Expected values in fixtures/calc_scenarios.json come from the JS engine
+(regenerate with `node tests/make_calc_fixtures.mjs` after data/ changes).
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import budget_engine  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures', 'calc_scenarios.json')
+FIELDS = ('gross_monthly', 'net_monthly', 'tax_monthly', 'total_fixed', 'discretionary')
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return budget_engine.load_engine(os.path.join(ROOT, budget_engine.TAX_FILE),
+                                     os.path.join(ROOT, budget_engine.GEO_FILE))
+
+
+@pytest.fixture(scope='module')
+def scenarios():
+    with open(FIXTURES, 'r') as f:
+        return json.load(f)
+
+
+def run_batch(engine, users):
+    """Runs a list of calc.js-style user inputs through the batch engine in one call."""
+    width = max([len(u['bills']) for u in users] + [1])
+    amounts = np.full((len(users), width), np.nan)
+    freqs = np.full((len(users), width), 'monthly', dtype=object)
+    for i, u in enumerate(users):
+        for j, bill in enumerate(u['bills']):
+            amounts[i, j] = bill['amount']
+            freqs[i, j] = bill['frequency']
+
+    res = budget_engine.calculate_budget(
+        engine,
+        income=[u['income'] for u in users],
+        income_frequency=[u['income_frequency'] for u in users],
+        state=[u['state'] for u in users],
+        filing_status=[u['filing_status'] for u in users],
+        housing_cost=[u['housing_cost'] for u in users],
+        medical_premium=[u['medical_premium'] for u in users],
+        medical_oop_max=[u['medical_oop_max'] for u in users],
+        bill_amounts=amounts,
+        bill_frequencies=freqs.astype(str)
+    )
+    return {
+        'gross_monthly': res['income']['gross_monthly'],
+        'net_monthly': res['income']['net_monthly'],
+        'tax_monthly': res['taxes']['monthly_total'],
+        'total_fixed': res['spending']['total_fixed'],
+        'discretionary': res['spending']['discretionary']
+    }
+
+
+def walk_brackets(taxable, brackets):
+    """Line-for-line port of calculateProgressiveTax."""
+    tax = 0
+    previous_cap = 0
+    for bracket in brackets:
+        if taxable > previous_cap:
+            tax += (min(taxable, bracket['cap']) - previous_cap) * bracket['rate']
+            previous_cap = bracket['cap']
+        else:
+            break
+    return tax
+
+
+def test_each_scenario_matches_calc_js(engine, scenarios):
+    for sc in scenarios:
+        got = run_batch(engine, [sc['user']])
+        for field in FIELDS:
+            assert got[field][0] == sc['expected'][field], (sc['name'], field)
+
+
+def test_batch_matches_calc_js(engine, scenarios):
+    # Same scenarios, shuffled and repeated, in a single vectorized call
+    order = np.random.default_rng(7).permutation(np.tile(np.arange(len(scenarios)), 50))
+    got = run_batch(engine, [scenarios[i]['user'] for i in order])
+    for field in FIELDS:
+        expected = np.array([scenarios[i]['expected'][field] for i in order])
+        np.testing.assert_array_equal(got[field], expected, err_msg=field)
+
+
+def test_progressive_tax_matches_bracket_walk(engine):
+    with open(os.path.join(ROOT, budget_engine.TAX_FILE), 'r') as f:
+        tax_data = json.load(f)
+    jurisdictions = [tax_data['federal']] + list(tax_data['states'].values())
+
+    rng = np.random.default_rng(11)
+    taxable = np.concatenate([[0.0, 1.0], rng.uniform(0, 2e6, 300), rng.lognormal(11, 1.5, 300)])
+    for jid, jur in enumerate(jurisdictions):
+        for sid, status in enumerate(budget_engine.FILING_STATUSES):
+            brackets = jur['brackets'].get(status) or []
+            caps = [b['cap'] for b in brackets]
+            values = np.concatenate([taxable, caps])
+            ids = np.full(len(values), 2 * jid + sid)
+            got = budget_engine.progressive_tax(values, ids, engine['tables'])
+            expected = [walk_brackets(v, brackets) for v in values.tolist()]
+            np.testing.assert_array_equal(got, expected)
+
+
+def test_engine_tables_are_the_shipped_compiled_tables(engine):
+    # The engine and js/calc.js share ingest_tax's compiled tables
+    with open(os.path.join(ROOT, budget_engine.TAX_FILE)) as f:
+        shipped = json.load(f)['federal']['compiled']['single']
+    caps, _, rates, cum = engine['tables'][0]
+    assert caps.tolist() == shipped['caps'] and rates.tolist() == shipped['rates']
+    assert cum.tolist() == [0.0] + shipped['cum']
+    with pytest.raises(ValueError):
+        budget_engine.bracket_arrays([{"cap": 100, "rate": 0.1}, {"cap": 50, "rate": 0.2}])
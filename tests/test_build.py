@@ -0,0 +1,96 @@
+"""
+Build orchestrator on a 1x synthetic workspace: concurrent first build,
+skipping unchanged targets, and rebuilding only what a change reaches.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import build  # noqa: E402
+from generate_data import build_workspace  # noqa: E402
+from output_formats import build_lock, write_text  # noqa: E402
+
+
+@pytest.fixture
+def workspace():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        build_workspace(tmp, 1)
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def test_plan_orders_dependencies_first():
+    assert build.plan(['shards']) == ['tax_tables', 'geo_stats', 'shards']
+    with pytest.raises(ValueError):
+        build.plan(['nope'])
+
+
+def test_build_skips_unchanged_and_follows_changes(workspace):
+    with build_lock():
+        first = build.build(jobs=2)
+    assert first == dict.fromkeys(build.TARGETS, 'built')
+    for path in ('data/geo_stats.json', 'data/tax_tables.json', 'data/shards/core.json', 'data/affordability.json'):
+        assert os.path.exists(path), path
+    assert not [n for n in os.listdir('data') if n.endswith('.tmp')]
+
+    assert build.build(jobs=2) == dict.fromkeys(build.TARGETS, 'skipped')
+
+    # A touched raw file reruns geo, but identical output stops there
+    with open('config/sources_map.json', 'r') as f:
+        config = next(iter(json.load(f).values()))
+    raw_path = os.path.join('raw_data', config['file'])
+    with open(raw_path, 'a') as f:
+        f.write('\n')
+    assert build.build(jobs=1) == {"tax_tables": 'skipped', "geo_stats": 'built',
+                                   "shards": 'skipped', "affordability": 'skipped'}
+
+    # A changed value reaches the derived outputs but not the tax tables
+    df = pd.read_csv(raw_path, dtype=str)
+    df[config['value_col']] = '999'
+    df.to_csv(raw_path, index=False)
+    assert build.build(jobs=1) == {"tax_tables": 'skipped', "geo_stats": 'built',
+                                   "shards": 'built', "affordability": 'built'}
+
+    # A hand-edited output is rebuilt even though its inputs did not change
+    write_text('data/affordability.json', '{}')
+    assert build.build(['affordability'], jobs=1)['affordability'] == 'built'
+
+
+def test_failed_target_blocks_dependents(workspace):
+    os.remove('raw_data/tax_foundation_2025.xlsx')
+    status = build.build(jobs=2)
+    assert status['tax_tables'] == 'failed' and status['geo_stats'] == 'built'
+    assert status['shards'] == status['affordability'] == 'blocked'
+
+
+def test_own_audit_entries_do_not_rebuild(workspace, monkeypatch):
+    import audit_log
+    run_geo = build.TARGETS['geo_stats']['run']
+
+    def run_and_log(options):
+        ok = run_geo(options)
+        entry = {"scope": "national", "key": "rent", "value": 1.0, "citation": "test"}
+        audit_log.append_entries([entry], audit_log.load_audit_index())
+        return ok
+
+    monkeypatch.setitem(build.TARGETS['geo_stats'], 'run', run_and_log)
+    assert build.build(jobs=1)['geo_stats'] == 'built'
+    monkeypatch.setitem(build.TARGETS['geo_stats'], 'run', run_geo)
+    assert build.build(jobs=1) == dict.fromkeys(build.TARGETS, 'skipped')
+
+    # An entry written outside the build is still an input change
+    audit_log.append_entries([{"scope": "national", "key": "rent", "value": 2.0, "citation": "hand"}],
+                             audit_log.load_audit_index())
+    assert build.build(jobs=1)['geo_stats'] == 'built'
@@ -0,0 +1,97 @@
+"""
+Headless gap filling: the gap matrix, the answers template round trip,
+and bulk answers matching what the interactive prompts would store.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import ingest_data  # noqa: E402
+
+SOURCE_MAP = {
+    "rent": {"frequency": "m", "state_col": "S", "value_col": "V", "description": "Rent"},
+    "food": {"frequency": "a", "state_col": "S", "value_col": "V", "description": "Food"},
+    "county_rent": {"frequency": "m", "state_col": "FIPS", "value_col": "V", "geo_level": "county"},
+}
+
+
+def complete_data():
+    states = {code: {"name": name, "rent": 1000.0, "food": 300.0} for code, name in ingest_data.US_STATES.items()}
+    return {"metadata": {}, "national": {"rent": 1100.0, "food": 310.0}, "states": states}
+
+
+def gappy_data():
+    data = complete_data()
+    del data["national"]["food"]
+    del data["states"]["TX"]["rent"]
+    del data["states"]["AK"]["food"]
+    return data
+
+
+def test_gap_matrix_order_and_levels():
+    gaps = ingest_data.find_gaps(gappy_data(), SOURCE_MAP)
+    # National first, then states A-Z; county sources never count as gaps
+    assert list(zip(gaps['scope'], gaps['key'])) == [("National", "food"), ("AK", "food"), ("TX", "rent")]
+    assert ingest_data.find_gaps(complete_data(), SOURCE_MAP).empty
+
+
+def test_answers_match_prompts_and_only_fill_gaps():
+    answers = pd.DataFrame({
+        "scope": ["United States", "ak", "TX", "TX", "CA", "ZZ", "AK"],
+        "key": ["food", "food", "rent", "rent", "rent", "rent", "nope"],
+        "value": ["$3,600", "2400", "900", "950", "1", "1", "1"],
+        "citation": ["USDA", "", "old", "new", "", "", ""],
+    })
+    data, entries = gappy_data(), []
+    assert ingest_data.apply_answers(data, answers, SOURCE_MAP, entries) == 3
+
+    prompted = gappy_data()
+    for scope, key, text in (("National", "food", "3600, USDA"), ("AK", "food", "2400"), ("TX", "rent", "950, new")):
+        raw, _ = ingest_data.parse_manual_input(text)
+        target = prompted["national"] if scope == "National" else prompted["states"][scope]
+        target[key] = ingest_data.calculate_monthly_value(raw, SOURCE_MAP[key]["frequency"])
+    assert data == prompted
+
+    assert [(e["scope"], e["key"], e["value"], e["citation"]) for e in entries] == [
+        ("National", "food", 3600.0, "USDA"),
+        ("AK", "food", 2400.0, "Manual Entry (No citation)"),
+        ("TX", "rent", 950.0, "new"),
+    ]
+    assert ingest_data.find_gaps(data, SOURCE_MAP).empty
+
+
+def test_gap_report_is_an_answers_template():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("gaps.csv", "gaps.json"):
+            path = os.path.join(tmp, name)
+            data = gappy_data()
+            ingest_data.write_gap_report(ingest_data.find_gaps(data, SOURCE_MAP), path, SOURCE_MAP)
+            answers = ingest_data.load_answers(path)
+            assert len(answers) == 3 and set(answers['value']) == {''}
+
+            answers['value'] = '12'
+            assert ingest_data.apply_answers(data, answers, SOURCE_MAP, []) == 3
+            assert data["national"]["food"] == 1.0 and data["states"]["TX"]["rent"] == 12.0
+
+        bad = os.path.join(tmp, "bad.json")
+        with open(bad, 'w') as f:
+            json.dump([{"scope": "TX"}], f)
+        assert ingest_data.load_answers(bad) is None
+
+
+def test_fail_and_skip_modes():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "gaps.csv")
+        assert ingest_data.fill_gaps(gappy_data(), SOURCE_MAP, [], 'fail', gap_report_path=report) is False
+        assert len(pd.read_csv(report)) == 3
+
+        data = gappy_data()
+        assert ingest_data.fill_gaps(data, SOURCE_MAP, [], 'skip', gap_report_path=report) is True
+        assert data == gappy_data()
+        assert ingest_data.fill_gaps(complete_data(), SOURCE_MAP, [], 'fail', gap_report_path=report) is True
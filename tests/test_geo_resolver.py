@@ -0,0 +1,65 @@
+"""
+Checks the shared state resolver: every alias form, column-wise and
+categorical resolution, bulk unresolved counts and the per-cell memo.
+"""
+import collections
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import geo_resolver  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def resolver():
+    return geo_resolver.load_resolver(os.path.join(ROOT, geo_resolver.STATES_FILE))
+
+
+@pytest.mark.parametrize('cell, code', [
+    ('California', 'CA'), ('  california ', 'CA'), ('CA', 'CA'), ('Calif.', 'CA'), ('Calif. (a)', 'CA'),
+    ('Kans.', 'KS'), ('Kan.', 'KS'), ('W.Va.', 'WV'), ('West Virginia*', 'WV'), ('N.Y. (b, c)', 'NY'),
+    ('D.C.', 'DC'), ('Washington DC', 'DC'), ('Washington, D.C.', 'DC'), ('District of Columbia', 'DC'),
+    ('Washington', 'WA'), ('United States', 'US'), ('U.S.', 'US'), ('National', 'US'),
+    ('Nowhere', None), ('', None), (None, None), (42, None)
+])
+def test_alias_forms(resolver, cell, code):
+    assert resolver.resolve(cell) == code
+
+
+def test_every_state_name_and_code_resolves(resolver):
+    for code, name in resolver.states.items():
+        assert resolver.resolve(name) == code
+        assert resolver.resolve(code.lower()) == code
+
+
+def test_column_and_categorical(resolver):
+    cells = pd.Series(['Texas', 'Tex.', None, 'Atlantis', 'US', 'Atlantis', 'Ore.'])
+    unresolved = collections.Counter()
+    codes = resolver.resolve_column(cells, unresolved)
+    assert codes.tolist() == ['TX', 'TX', None, None, 'US', None, 'OR']
+    assert unresolved == {'Atlantis': 2}
+
+    cat = resolver.resolve_categorical(cells)
+    assert list(cat.categories) == resolver.categories
+    assert cat.tolist()[:2] == ['TX', 'TX'] and pd.isna(cat[3])
+
+
+def test_memo_is_shared_across_sources(resolver):
+    assert geo_resolver.load_resolver(os.path.join(ROOT, geo_resolver.STATES_FILE)) is resolver
+    resolver.resolve_column(pd.Series(['Mass.', 'Mass.']))
+    assert resolver._memo['Mass.'] == 'MA'
+
+
+def test_conflicting_alias_is_rejected():
+    with pytest.raises(ValueError):
+        geo_resolver.GeoResolver({'CA': 'California', 'XX': 'Calif.'})
+
+
+def test_without_states_file_codes_and_abbreviations_resolve():
+    bare = geo_resolver.GeoResolver({})
+    assert bare.resolve('Calif.') == 'CA' and bare.resolve('tx') == 'TX' and bare.resolve('Texas') == 'TX'
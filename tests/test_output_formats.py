@@ -0,0 +1,33 @@
+"""
+Round-trips the repo's build outputs through the compact (columnar) layout.
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import output_formats  # noqa: E402
+
+OUTPUTS = (
+    ('data/geo_stats.json', output_formats.pack_geo, output_formats.unpack_geo),
+    ('data/tax_tables.json', output_formats.pack_tax, output_formats.unpack_tax),
+)
+
+
+def test_compact_round_trip(tmp_path):
+    for rel, pack, unpack in OUTPUTS:
+        data = output_formats.load_output(os.path.join(ROOT, rel), unpack)
+        path = str(tmp_path / os.path.basename(rel))
+
+        row = output_formats.write_output(data, path, pack, compact=True)
+        assert row['compact'] < row['pretty']
+        assert os.path.exists(path + '.gz')
+        assert output_formats.load_output(path, unpack) == data
+
+        # A pretty rebuild drops the now-stale compressed siblings
+        output_formats.write_output(data, path, pack)
+        assert not os.path.exists(path + '.gz')
+        with open(path, 'r') as f:
+            assert json.load(f) == data
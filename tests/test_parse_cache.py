@@ -0,0 +1,49 @@
+"""
+The parse cache: hits round-trip the parsed frame exactly, misses only
+parse the selected columns, and edited files are re-parsed.
+"""
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import parse_cache  # noqa: E402
+
+CSV = "State,Rent,Food,Note\nTexas,\"$1,200\",300.5,a\nCA,,410,\nUS,1100,NA,c\n"
+
+
+def test_round_trip_and_column_pruning():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide.csv")
+        with open(path, 'w') as f:
+            f.write(CSV)
+        cache_dir = os.path.join(tmp, "cache")
+        parsed = []
+
+        def reader(p, usecols=None):
+            df = pd.read_csv(p, usecols=usecols)
+            parsed.append(list(df.columns))
+            return df
+
+        usecols = lambda c: c in ("State", "Rent")
+        kwargs = dict(usecols=usecols, cache_dir=cache_dir)
+        first = parse_cache.read_cached(path, reader, "csv:Rent,State", **kwargs)
+        assert parsed == [["State", "Rent"]]  # The miss never parsed Food/Note
+
+        again = parse_cache.read_cached(path, reader, "csv:Rent,State", **kwargs)
+        assert len(parsed) == 1
+        pd.testing.assert_frame_equal(again, first)
+        pd.testing.assert_frame_equal(first, pd.read_csv(path, usecols=usecols))
+
+        # A different selection is a different entry
+        parse_cache.read_cached(path, reader, "csv:Food", usecols=lambda c: c == "Food", cache_dir=cache_dir)
+        assert parsed[-1] == ["Food"]
+
+        with open(path, 'a') as f:
+            f.write("NY,1500,350,d\n")
+        edited = parse_cache.read_cached(path, reader, "csv:Rent,State", **kwargs)
+        assert len(parsed) == 3 and edited["State"].tolist()[-1] == "NY"
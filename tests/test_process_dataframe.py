@@ -0,0 +1,75 @@
+"""
+The vectorized process_dataframe against the original iterrows() loop:
+same values, same national-row handling, same counts, on messy columns.
+"""
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import ingest_data  # noqa: E402
+
+STATE_CELLS = ["Texas", "US", "tx", np.nan, "Atlantis", "United States", " california ", "",
+               "CA", "NATIONAL", "Wyoming", "NY", "ny", "Guam", "Oregon", "TX"]
+VALUE_CELLS = ["$1,234", "1100", np.nan, "50", "900", "", "2,000.50", "7",
+               "abc", " $ 1 200 ", "1_000", "1e3", "-12.5", "8", "nan", "  "]
+
+
+def empty_data():
+    states = {code: {"name": name} for code, name in ingest_data.US_STATES.items()}
+    return {"metadata": {}, "national": {}, "states": states}
+
+
+def row_walk(df, config, final_data):
+    """The pre-vectorization loop, verbatim apart from the function names."""
+    count = 0
+    for _, row in df.iterrows():
+        state_code = ingest_data.normalize_state(str(row[config['state_col']]))
+        val = ingest_data.calculate_monthly_value(row[config['value_col']], config.get('frequency'))
+        if state_code and val is not None:
+            if state_code == 'US':
+                final_data["national"][config['_key_name']] = val
+            elif state_code in final_data["states"]:
+                final_data["states"][state_code][config['_key_name']] = val
+                count += 1
+    return count
+
+
+def assert_same(df, frequency):
+    config = {"state_col": "S", "value_col": "V", "frequency": frequency, "_key_name": "k"}
+    expected, actual = empty_data(), empty_data()
+    assert ingest_data.process_dataframe(df, config, actual) == row_walk(df, config, expected)
+    assert actual == expected
+    return actual
+
+
+@pytest.mark.parametrize("frequency", [None, "m", "a", "annual", "w", " Weekly "])
+def test_mixed_text_columns(frequency):
+    df = pd.DataFrame({"S": STATE_CELLS, "V": VALUE_CELLS})
+    data = assert_same(df, frequency)
+    if frequency is None:
+        # The last row with a parsable value wins; later blank rows don't clear it
+        assert data["national"]["k"] == 1200.0 and data["states"]["TX"]["k"] == 1234.0
+        # float() accepts '1_000', so the vectorized path must too
+        assert data["states"]["WY"]["k"] == 1000.0
+
+
+def test_numeric_and_nan_columns():
+    df = pd.DataFrame({"S": STATE_CELLS, "V": [1.5, np.nan, 3.0, 4.0, 5.0, 6.0, 7.0, math.inf,
+                                             -0.0, 10.0, 11.0, np.nan, 13.0, 14.0, 15.0, 16.0]})
+    assert_same(df, "a")
+    # A numeric state column never maps (str(1.0) is not a state)
+    assert_same(pd.DataFrame({"S": [1.0, 2.0, np.nan], "V": [1, 2, 3]}), "m")
+    assert_same(pd.DataFrame({"S": ["CA", "US"], "V": [True, False]}), "m")
+
+
+def test_empty_frame_and_missing_columns():
+    assert_same(pd.DataFrame({"S": pd.Series([], dtype=object), "V": pd.Series([], dtype=object)}), "m")
+    config = {"state_col": "S", "value_col": "Missing", "_key_name": "k"}
+    assert ingest_data.process_dataframe(pd.DataFrame({"S": ["CA"]}), config, empty_data()) == 0
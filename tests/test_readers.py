@@ -0,0 +1,87 @@
+"""
+Reader backends: which backend reads a file, the stdlib rows matching
+pandas cell for cell, and the ingest scripts starting without pandas.
+"""
+import collections
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import ingest_data  # noqa: E402
+import readers  # noqa: E402
+
+CSV = (
+    "\ufeff Year ,State,Rent,Junk\n"
+    "2023,Texas,\"$1,200\",x\n"
+    "2024,Texas,\"$1,250\",x\n"
+    "2024,tx,NA,x\n"
+    "\n"
+    "2024,Atlantis,900,x\n"
+    "2024,United States,1100\n"
+    "2024,CA,abc,x\n"
+    "2024,,700,x\n"
+    "2024,ca,2000,x\n"
+)
+CONFIG = {"state_col": "State", "value_col": "Rent", "frequency": "m", "_key_name": "rent",
+          "filter": {"col": "Year", "val": "2024"}}
+
+
+def empty_data():
+    states = {code: {"name": name} for code, name in ingest_data.US_STATES.items()}
+    return {"metadata": {}, "national": {}, "states": states}
+
+
+def test_backend_choice(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        small = os.path.join(tmp, "small.csv")
+        with open(small, 'w') as f:
+            f.write(CSV)
+        monkeypatch.setattr(readers, 'has_module', lambda name: True)
+        assert readers.choose_backend(small, 'csv') == 'csv'
+        assert readers.choose_backend(small, 'csv', rows_ok=False) == 'pyarrow'
+        assert readers.choose_backend(small, 'csv', 'pandas') == 'pandas'
+        assert readers.choose_backend(small, 'excel', 'csv') == 'pandas'
+        monkeypatch.setattr(readers, 'SMALL_FILE_BYTES', 10)
+        assert readers.choose_backend(small, 'csv') == 'pyarrow'
+        # Without pyarrow the large-file path falls back to pandas
+        monkeypatch.setattr(readers, 'has_module', lambda name: False)
+        assert readers.choose_backend(small, 'csv') == 'pandas'
+
+
+def test_rows_match_pandas():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rent.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CSV)
+        columns = ["Year", "State", "Rent"]
+        rows = ingest_data.read_source(path, 'csv', columns, backend='csv')
+        df = ingest_data.read_source(path, 'csv', columns, backend='pandas')
+        assert len(rows) == len(df) == 8 and sorted(rows.columns) == sorted(df.columns)
+        assert rows["Rent"][2] is None and pd.isna(df["Rent"][2])
+        assert rows["Rent"][4] == "1100" and rows["State"][6] is None
+
+        results = []
+        for table, process in ((rows, ingest_data.process_rows), (df, ingest_data.process_dataframe)):
+            data, unresolved = empty_data(), collections.Counter()
+            count = process(ingest_data.apply_filter(table, CONFIG), CONFIG, data, unresolved)
+            results.append((count, data, dict(unresolved)))
+        assert results[0] == results[1]
+        count, data, unresolved = results[0]
+        # Later rows win; NA/unparsable values are skipped but still counted as read
+        assert data["states"]["TX"]["rent"] == 1250.0 and data["states"]["CA"]["rent"] == 2000.0
+        assert data["national"]["rent"] == 1100.0 and count == 2
+        assert unresolved == {"Atlantis": 1}
+
+
+def test_cli_starts_without_pandas():
+    probe = ("import sys; sys.argv = ['ingest_data.py']; import ingest_data, ingest_tax; "
+             "print(type(sys.modules['pandas']).__name__ == 'module', ingest_data.US_STATES['TX'])")
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": os.path.join(ROOT, 'scripts')}, check=True)
+    assert out.stdout.split() == ["False", "Texas"]
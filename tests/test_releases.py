@@ -0,0 +1,189 @@
+"""
+Checks content-addressed releases: delta round trips, publishing a new
+release with a delta and manifest chain, unchanged no-ops and pruning.
+"""
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import releases  # noqa: E402
+from output_formats import unpack_geo  # noqa: E402
+
+
+def geo(rent=1500, extra_state=False):
+    data = {
+        "metadata": {"generated_at": "2025-01-01"},
+        "national": {"housing_rent": 1400, "electricity": 150},
+        "states": {
+            "CA": {"name": "California", "housing_rent": rent, "electricity": 200},
+            "TX": {"name": "Texas", "housing_rent": 1200}
+        }
+    }
+    if extra_state:
+        data['states']['NY'] = {"name": "New York", "housing_rent": 2100}
+    return data
+
+
+def write(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def test_diff_apply_round_trip():
+    old = geo()
+    new = geo(rent=1600, extra_state=True)
+    del new['states']['TX']['housing_rent']
+    new['national']['water'] = 60
+    ops = releases.diff_release(old, new)
+    assert {(op['op'], op['scope'], op.get('key')) for op in ops} == {
+        ('replace', 'states/CA', 'housing_rent'), ('add', 'states/NY', None),
+        ('remove', 'states/TX', 'housing_rent'), ('add', 'national', 'water')
+    }
+    assert releases.apply_delta(copy.deepcopy(old), ops) == new
+    assert releases.diff_release(new, new) == []
+
+
+def test_publish_chain_and_no_op(tmp_path):
+    out, release_dir = str(tmp_path / 'geo_stats.json'), str(tmp_path / 'releases')
+    write(out, geo())
+    first = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    assert os.path.exists(os.path.join(release_dir, first['file']))
+    assert first['deltas'] == {} and first['history'] == []
+    assert releases.publish_release('geo_stats', out, unpack_geo, release_dir)['current'] == first['current']
+
+    write(out, geo(rent=1600))
+    second = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    write(out, geo(rent=1600, extra_state=True))
+    third = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+
+    manifest = releases.load_manifest(release_dir)
+    assert manifest['outputs']['geo_stats']['current'] == third['current']
+    assert third['history'] == [second['current'], first['current']]
+    chain = releases.delta_chain(third, first['current'])
+    assert len(chain) == 2
+    assert releases.delta_chain(third, 'unknown') is None
+
+    # A client holding the first release catches up with the deltas alone
+    data = geo()
+    for name in chain:
+        with open(os.path.join(release_dir, name)) as f:
+            releases.apply_delta(data, json.load(f)['ops'])
+    assert data == geo(rent=1600, extra_state=True)
+    # Release files are byte copies of the build output
+    with open(os.path.join(release_dir, third['file']), 'rb') as f, open(out, 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_prune_keeps_recent_releases(tmp_path, monkeypatch):
+    monkeypatch.setattr(releases, 'KEEP_RELEASES', 2)
+    out, release_dir = str(tmp_path / 'geo_stats.json'), str(tmp_path / 'releases')
+    entries = []
+    for rent in (1000, 1100, 1200):
+        write(out, geo(rent=rent))
+        entries.append(releases.publish_release('geo_stats', out, unpack_geo, release_dir))
+
+    latest = entries[-1]
+    assert latest['history'] == [entries[1]['current']]
+    assert list(latest['deltas']) == [entries[1]['current']]
+    files = set(os.listdir(release_dir))
+    assert entries[0]['file'] not in files
+    assert entries[1]['file'] in files and latest['file'] in files
+    assert not any(entries[0]['current'] in name for name in files)
+
+
+def test_delta_that_does_not_reproduce_raises(tmp_path, monkeypatch):
+    out, release_dir = str(tmp_path / 'geo_stats.json'), str(tmp_path / 'releases')
+    write(out, geo())
+    releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    write(out, geo(rent=1600))
+    monkeypatch.setattr(releases, 'diff_release', lambda old, new: [])
+    with pytest.raises(ValueError):
+        releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    assert releases.load_manifest(release_dir)['outputs']['geo_stats']['history'] == []
+
+
+def test_publish_shards_keeps_unchanged_urls(tmp_path):
+    shard_dir, release_dir = tmp_path / 'shards', str(tmp_path / 'releases')
+    shard_dir.mkdir()
+    for name, body in (('core', '{"national": {}}'), ('CA', '{"rent": 1}'), ('TX', '{"rent": 2}')):
+        (shard_dir / f'{name}.json').write_text(body)
+    first = releases.publish_shards(str(shard_dir), release_dir)
+    assert sorted(first['states']) == ['CA', 'TX'] and first['core']['file'].startswith('shards/core.')
+    assert releases.publish_shards(str(shard_dir), release_dir) == first
+
+    (shard_dir / 'CA.json').write_text('{"rent": 3}')
+    second = releases.publish_shards(str(shard_dir), release_dir)
+    assert second['current'] != first['current']
+    assert second['states']['TX'] == first['states']['TX']
+    assert second['states']['CA'] != first['states']['CA']
+    with open(os.path.join(release_dir, second['states']['CA']['file']), 'rb') as f:
+        assert f.read() == b'{"rent": 3}'
+    assert releases.load_manifest(release_dir)['shards'] == second
+
+    # Files from the previous publish stay for clients mid-load; older ones go
+    (shard_dir / 'CA.json').write_text('{"rent": 4}')
+    releases.publish_shards(str(shard_dir), release_dir)
+    files = set(os.listdir(os.path.join(release_dir, 'shards')))
+    assert second['states']['CA']['file'].split('/')[1] in files
+    assert first['states']['CA']['file'].split('/')[1] not in files
+
+
+@pytest.mark.parametrize("value, text", [
+    (1500.0, '1500'), (0.1, '0.1'), (-2.5, '-2.5'), (1e-7, '1e-7'), (1e-6, '0.000001'),
+    (1e16, '10000000000000000'), (1e21, '1e+21'), (1.5e-300, '1.5e-300'), (0.0, '0')
+])
+def test_canonical_numbers_match_javascript(value, text):
+    assert releases.js_number(value) == text
+
+
+def test_data_sha256_checks_patched_documents(tmp_path):
+    out, release_dir = str(tmp_path / 'geo_stats.json'), str(tmp_path / 'releases')
+    write(out, geo())
+    first = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    write(out, geo(rent=1600.5, extra_state=True))
+    second = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+
+    with open(os.path.join(release_dir, second['deltas'][first['current']]['file'])) as f:
+        ops = json.load(f)['ops']
+    assert releases.data_hash(releases.apply_delta(geo(), ops)) == second['data_sha256']
+    # Key order and float spelling don't matter; a wrong value does
+    assert releases.canonical_json({"b": 1.0, "a": [2.50]}) == '{"a":[2.5],"b":1}'
+    assert releases.data_hash(geo(rent=1601)) != releases.data_hash(geo(rent=1600))
+
+
+def test_republish_restores_missing_release_files(tmp_path):
+    # A fresh checkout: the manifest is tracked, the hashed files are not
+    out, release_dir = str(tmp_path / 'geo_stats.json'), str(tmp_path / 'releases')
+    shard_dir = tmp_path / 'shards'
+    shard_dir.mkdir()
+    for name in ('core', 'CA'):
+        (shard_dir / f'{name}.json').write_text(f'{{"name": "{name}"}}')
+    write(out, geo())
+    releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    write(out, geo(rent=1600))
+    entry = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    shards = releases.publish_shards(str(shard_dir), release_dir)
+    for fname in os.listdir(release_dir):
+        if fname != releases.MANIFEST_FILE and not fname.startswith('.'):
+            path = os.path.join(release_dir, fname)
+            if os.path.isdir(path):
+                for inner in os.listdir(path):
+                    os.remove(os.path.join(path, inner))
+            else:
+                os.remove(path)
+
+    again = releases.publish_release('geo_stats', out, unpack_geo, release_dir)
+    assert again['current'] == entry['current'] and again['deltas'] == {}
+    with open(os.path.join(release_dir, again['file']), 'rb') as f, open(out, 'rb') as g:
+        assert f.read() == g.read()
+    assert releases.load_manifest(release_dir)['outputs']['geo_stats']['deltas'] == {}
+
+    assert releases.publish_shards(str(shard_dir), release_dir)['current'] == shards['current']
+    for ref in [shards['core'], *shards['states'].values()]:
+        assert os.path.exists(os.path.join(release_dir, ref['file']))
@@ -0,0 +1,45 @@
+"""
+Checks the run report written by the ingest scripts: stage timings,
+per-source throughput and the history file.
+"""
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import run_report  # noqa: E402
+
+
+def test_report_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reports', 'ingest_data.json')
+        report = run_report.new_report('ingest_data', trace_memory=True)
+        with run_report.stage(report, 'parse'):
+            rows = [list(range(100)) for _ in range(100)]
+        run_report.add_source(report, 'rent', {"read_seconds": 0.5, "rows_read": 1000, "records": 51})
+        run_report.add_source(report, 'reused', {"file": "x.csv", "reused": True, "records": 51})
+        assert run_report.finish_report(report, path) == path
+        del rows
+
+        with open(path, 'r') as f:
+            saved = json.load(f)
+        assert list(saved['stages']) == ['parse']
+        assert saved['stages']['parse']['seconds'] >= 0
+        assert saved['stages']['parse']['tracemalloc_peak_bytes'] > 0
+        assert saved['sources']['rent']['rows_per_sec'] == 2000.0
+        assert 'rows_per_sec' not in saved['sources']['reused']
+        assert saved['seconds'] >= saved['stages']['parse']['seconds']
+        assert '_t0' not in saved
+
+        with open(os.path.join(tmp, 'reports', run_report.HISTORY_FILE), 'r') as f:
+            history = [json.loads(line) for line in f]
+        assert history == [saved]
+
+
+def test_stage_without_report():
+    with run_report.stage(None, 'noop'):
+        pass
+    run_report.add_source(None, 'rent', {"rows_read": 1})
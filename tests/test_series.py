@@ -0,0 +1,55 @@
+"""
+Time-series ingest: one read grouped by year, written as year-indexed arrays.
+"""
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import ingest_data  # noqa: E402
+from output_formats import pack_series, unpack_series  # noqa: E402
+
+CONFIG = {
+    "state_col": "State", "value_col": "Spend", "frequency": "a",
+    "filter": {"col": "Year", "val": "2024"}, "_key_name": "food"
+}
+
+
+def sample_frame():
+    return pd.DataFrame({
+        "State": ["California", "CA", "Texas", "United States", "California", "Nowhere"],
+        "Year": [2023, 2023, 2024, 2024, 2024, 2024],
+        "Spend": ["1,200", "2400", "$600", "1200", None, "5"]
+    })
+
+
+def test_series_groups_by_year_and_later_rows_win():
+    out = ingest_data.series_dataframe(sample_frame(), CONFIG)
+    assert out == {
+        "national": {"2024": 100.0},
+        "states": {"CA": {"2023": 200.0}, "TX": {"2024": 50.0}}
+    }
+
+
+def test_pinned_year_matches_filtered_ingest():
+    df = sample_frame()
+    scratch = {"national": {}, "states": {code: {} for code in ingest_data.US_STATES}}
+    ingest_data.process_dataframe(ingest_data.apply_filter(df, CONFIG), CONFIG, scratch)
+    series = ingest_data.series_dataframe(df, CONFIG)
+    assert scratch["states"]["TX"]["food"] == series["states"]["TX"]["2024"]
+    assert scratch["national"]["food"] == series["national"]["2024"]
+
+
+def test_build_series_arrays_and_round_trip():
+    timeline = ingest_data.build_series({
+        "food": {"national": {"2024": 100.0}, "states": {"CA": {"2023": 200.0}, "TX": {"2024": 50.0}}},
+        "rent": {"national": {"2025": 900.0}, "states": {"CA": {"2025": 2000.0}}},
+    })
+    assert timeline["years"] == ["2023", "2024", "2025"]
+    assert timeline["default_year"] == "2025"
+    assert timeline["national"] == {"food": [None, 100.0, None], "rent": [None, None, 900.0]}
+    assert timeline["states"]["CA"] == {"food": [200.0, None, None], "rent": [None, None, 2000.0]}
+    assert unpack_series(pack_series(timeline)) == timeline
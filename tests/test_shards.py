@@ -0,0 +1,59 @@
+"""
+Checks that the core file plus the per-state shards carry exactly the
+data in geo_stats.json and tax_tables.json, in both output layouts.
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import shards  # noqa: E402
+from output_formats import load_output, unpack_geo, unpack_tax, unpack_jurisdiction, is_compact  # noqa: E402
+
+GEO = os.path.join(ROOT, shards.GEO_FILE)
+TAX = os.path.join(ROOT, shards.TAX_FILE)
+
+
+def reassemble(shard_dir):
+    with open(os.path.join(shard_dir, shards.CORE_FILE), 'r') as f:
+        core = json.load(f)
+    compact = is_compact(core)
+    geo = {"metadata": core['metadata'], "national": core['national'], "states": {}}
+    tax = {"federal": unpack_jurisdiction(core['federal']) if compact else core['federal'], "states": {}}
+    for code in core['states']:
+        with open(os.path.join(shard_dir, f"{code}.json"), 'r') as f:
+            shard = json.load(f)
+        if shard['geo'] is not None:
+            geo['states'][code] = shard['geo']
+        if shard['tax'] is not None:
+            tax['states'][code] = unpack_jurisdiction(shard['tax']) if compact else shard['tax']
+    return geo, tax
+
+
+def test_shards_round_trip(tmp_path):
+    expected_geo = load_output(GEO, unpack_geo)
+    expected_tax = load_output(TAX, unpack_tax)
+    for compact in (False, True):
+        shard_dir = str(tmp_path / f"compact_{compact}")
+        shards.write_shards(GEO, TAX, shard_dir, compact=compact)
+        geo, tax = reassemble(shard_dir)
+        assert geo == expected_geo
+        assert tax == expected_tax
+
+
+def test_stale_shards_are_removed(tmp_path):
+    shard_dir = str(tmp_path)
+    for name in ('ZZ.json', 'ZZ.json.gz'):
+        open(os.path.join(shard_dir, name), 'w').close()
+    shards.write_shards(GEO, TAX, shard_dir)
+    assert not os.path.exists(os.path.join(shard_dir, 'ZZ.json'))
+    assert not os.path.exists(os.path.join(shard_dir, 'ZZ.json.gz'))
+    assert os.path.exists(os.path.join(shard_dir, 'CA.json'))
+
+
+def test_repo_shards_are_current():
+    geo, tax = reassemble(os.path.join(ROOT, shards.SHARD_DIR))
+    assert geo == load_output(GEO, unpack_geo)
+    assert tax == load_output(TAX, unpack_tax)
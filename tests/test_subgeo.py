@@ -0,0 +1,77 @@
+"""
+County/ZIP normalization, region tables and the ZIP -> county -> state
+fallback lookup.
+"""
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import subgeo  # noqa: E402
+
+
+def test_code_normalization():
+    col = pd.Series(['06037', 6037, 6037.0, ' 6037 ', '99001', 'LA County', None, 6037.5])
+    assert subgeo.normalize_region_column(col, 'county').tolist() == [
+        '06037', '06037', '06037', '06037', None, None, None, None]
+
+    col = pd.Series(['02139', 2139, '02139-4307', '123456', 'ZIP', None])
+    assert subgeo.normalize_region_column(col, 'zip').tolist() == [
+        '02139', '02139', '02139', None, None, None]
+
+
+def test_zip3_ranges_are_sorted_and_disjoint():
+    for (s1, e1, _), (s2, _, _) in zip(subgeo.ZIP3_RANGES, subgeo.ZIP3_RANGES[1:]):
+        assert s1 <= e1 < s2
+
+
+def test_region_tables_later_keys_win():
+    tables = subgeo.build_region_tables({
+        'rent_a': {"level": 'county', "metric": 'rent', "codes": ['06037', '25017'], "values": [1.0, 2.0]},
+        'rent_b': {"level": 'county', "metric": 'rent', "codes": ['25017'], "values": [3.0]},
+        'web': {"level": 'county', "metric": 'internet', "codes": ['01001'], "values": [4.0]},
+    })
+    county = tables['county']
+    assert county['codes'] == ['01001', '06037', '25017']
+    assert county['values']['rent'] == [None, 1.0, 3.0]
+    assert county['values']['internet'] == [4.0, None, None]
+
+
+def test_fallback_chain(tmp_path):
+    xw = tmp_path / 'zip_county.csv'
+    pd.DataFrame({'ZIP': ['02139', '02139', '90210'], 'COUNTY': ['25025', '25017', '06037'],
+                  'RES_RATIO': [0.2, 0.8, 1.0]}).to_csv(xw, index=False)
+    index = subgeo.build_region_index(str(xw))
+    tables = subgeo.build_region_tables({
+        'z': {"level": 'zip', "metric": 'rent', "codes": ['90210'], "values": [5000.0]},
+        'c': {"level": 'county', "metric": 'rent', "codes": ['25017'], "values": [2500.0]},
+    })
+    geo = {"national": {"rent": 1400.0}, "states": {"MA": {"rent": 2000.0}, "TX": {"rent": 1300.0}}}
+
+    assert subgeo.zip_to_county(index, '02139') == '25017'  # larger residential share
+    assert subgeo.lookup_metric(tables, index, geo, 'rent', zip_code='90210') == (5000.0, 'zip:90210')
+    assert subgeo.lookup_metric(tables, index, geo, 'rent', zip_code='02139') == (2500.0, 'county:25017')
+    assert subgeo.lookup_metric(tables, index, geo, 'rent', county='25025') == (2000.0, 'state:MA')
+    # Not in the crosswalk: state from the ZIP prefix ranges
+    assert subgeo.lookup_metric(tables, index, geo, 'rent', zip_code='75201') == (1300.0, 'state:TX')
+    assert subgeo.lookup_metric(tables, index, geo, 'rent', zip_code='00000') == (1400.0, 'national')
+    assert subgeo.lookup_metric(tables, index, geo, 'water', zip_code='90210') == (None, None)
+
+
+def test_write_and_load_round_trip(tmp_path):
+    tables = subgeo.build_region_tables({
+        'z': {"level": 'zip', "metric": 'rent', "codes": ['90210', '10001'],
+              "values": [float('nan'), 3.5]},
+    })
+    index = subgeo.build_region_index(None)
+    for compact in (False, True):
+        region_dir = str(tmp_path / str(compact))
+        subgeo.write_regions(tables, index, region_dir, compact=compact)
+        loaded_tables, loaded_index = subgeo.load_regions(region_dir)
+        assert loaded_tables == tables
+        assert loaded_index == index
+    # NaN cells are stored as null
+    assert tables['zip']['values']['rent'] == [3.5, None]
@@ -0,0 +1,123 @@
+"""
+Checks the precompiled cumulative-tax tables in data/tax_tables.json
+against the bracket walk they replace, and the columnar sheet parser
+against the row loop it replaced.
+"""
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import ingest_tax  # noqa: E402
+from output_formats import load_output, unpack_tax  # noqa: E402
+
+
+def load_jurisdictions():
+    tax_data = load_output(os.path.join(ROOT, ingest_tax.OUTPUT_FILE), unpack_tax)
+    return [('federal', tax_data['federal'])] + list(tax_data['states'].items())
+
+
+def test_compiled_tables_are_current():
+    for name, jur in load_jurisdictions():
+        for status, brackets in jur['brackets'].items():
+            assert jur['compiled'][status] == ingest_tax.compile_brackets(brackets), (name, status)
+
+
+def test_lookup_matches_bracket_walk():
+    incomes = np.random.default_rng(3).lognormal(11, 1.5, 500).tolist()
+    for name, jur in load_jurisdictions():
+        for status, brackets in jur['brackets'].items():
+            table = jur['compiled'][status]
+            assert ingest_tax.check_compiled(brackets, table) is None, (name, status)
+            for taxable in incomes:
+                assert ingest_tax.lookup_tax(taxable, table) == ingest_tax.walk_brackets(taxable, brackets)
+
+
+def test_out_of_order_caps_are_not_emitted():
+    final_json = {
+        "federal": {"brackets": {"single": [{"cap": 100, "rate": 0.1}, {"cap": 50, "rate": 0.2}]}},
+        "states": {}
+    }
+    assert ingest_tax.add_compiled_tables(final_json) == 1
+    assert final_json['federal']['compiled'] == {}
+
+
+# The pre-vectorization parser, kept as the reference for parse_tax_sheet
+STATE_MAP = {'Ala.': 'AL', 'Calif.': 'CA', 'Tex.': 'TX', 'N.Y.': 'NY', 'D.C.': 'DC'}
+
+
+def clean_money(val):
+    if pd.isna(val) or str(val).strip().lower() in ['n.a.', 'none', '-']:
+        return 0.0
+    if 'credit' in str(val).lower():
+        return 0.0
+    try:
+        return float(re.sub(r'[^\d.]', '', str(val)))
+    except ValueError:
+        return 0.0
+
+
+def clean_rate(val):
+    if pd.isna(val) or str(val).strip().lower() in ['none', 'n.a.']:
+        return 0.0
+    try:
+        return float(re.sub(r'[^\d.]', '', str(val))) / 100.0
+    except ValueError:
+        return 0.0
+
+
+def process_brackets(rows):
+    rows.sort(key=lambda x: x['threshold'])
+    caps = [r['threshold'] for r in rows[1:]] + [ingest_tax.INFINITY_CAP]
+    return [{"rate": r['rate'], "cap": cap} for r, cap in zip(rows, caps)]
+
+
+def row_loop(df):
+    buffer, current = {}, None
+    for _, row in df.iterrows():
+        raw_state = str(row['State']).strip()
+        if raw_state and raw_state.lower() != 'nan':
+            clean_name = re.sub(r'\s*\(.*\)', '', raw_state).strip()
+            if clean_name in STATE_MAP:
+                current = STATE_MAP[clean_name]
+                buffer[current] = {"std_ded_s": clean_money(row['Std_Ded_Single']),
+                                   "std_ded_m": clean_money(row['Std_Ded_Married']),
+                                   "single_rows": [], "married_rows": []}
+        if current:
+            for status, rate_col, bracket_col in (('single', 'Single_Rate', 'Single_Bracket'),
+                                                  ('married', 'Married_Rate', 'Married_Bracket')):
+                rate, thresh = clean_rate(row[rate_col]), clean_money(row[bracket_col])
+                if rate > 0 or thresh >= 0:
+                    buffer[current][f'{status}_rows'].append({'rate': rate, 'threshold': thresh})
+    return {code: {"deductions": {"single": d['std_ded_s'], "married": d['std_ded_m']},
+                   "brackets": {"single": process_brackets(d['single_rows']),
+                                "married": process_brackets(d['married_rows'])}}
+            for code, d in buffer.items()}
+
+
+def test_columnar_parser_matches_row_loop():
+    nan = np.nan
+    rows = [
+        ("Notes", "x", "x", "1%", "$5", "1%", "$5"),  # Before the first state: ignored
+        ("Ala.", "$3,000", "$7,500", "2.00%", "$0", "2.00%", "$0"),
+        (nan, nan, nan, "5.00%", "$3,000", "5.00%", "$6,000"),
+        (nan, nan, nan, "4.00%", "$500", "4.00%", "$1,000"),
+        ("Calif. (a)", "$5,540", "$11,080", "1.00%", "$0", "1.00%", "$0"),
+        ("See note", nan, nan, "9.30%", "$70,606", "9.30%", "$141,212"),  # Still California
+        ("Tex.", "n.a.", "n.a.", "none", "none", "none", "none"),
+        ("N.Y.", "$100 credit", "-", "4.00%", "$0", "4.00%", "$0"),
+        (nan, nan, nan, nan, nan, "6.85%", "$161,550"),
+        ("Ala.", "$2,500", "$7,500", "2.00%", "$0", "2.00%", "$0"),  # Repeated: last block wins
+        ("D.C.", 4000, 8000, 0.04, 10000, "6.00%", 40000),
+    ]
+    df = pd.DataFrame(rows, columns=['State', 'Std_Ded_Single', 'Std_Ded_Married', 'Single_Rate',
+                                     'Single_Bracket', 'Married_Rate', 'Married_Bracket'])
+    expected = row_loop(df)
+    actual = ingest_tax.parse_tax_sheet(df)
+    assert actual == expected
+    assert list(actual) == list(expected)